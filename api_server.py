@@ -0,0 +1,406 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from category_manager import CategoryManager
+from recurrence import RecurrenceRule
+from task import Task
+from task_manager import TaskManager, filter_tasks
+from task_storage import StorageLocked, TaskStorage
+
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    304: "Not Modified",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class TaskApiServer:
+    """
+    Local HTTP/JSON API over TaskManager, TaskStorage and CategoryManager.
+
+    Endpoints:
+      GET  /tasks?offset=&limit=&date=&category=&q=&completed=   paginated query
+      GET  /tasks/<id>
+      GET  /categories
+      POST /batch   {"ops": [...]}   several mutations, one save
+
+    Every mutation bumps a version number which, prefixed with a nonce drawn
+    at start-up (the count restarts with the process), is the ETag of read
+    responses, so clients sending If-None-Match get a bodyless 304 until
+    something changes. Encoded read responses are cached per URL and version.
+    """
+
+    def __init__(self, manager: TaskManager, storage: TaskStorage, category_manager: CategoryManager,
+                 host: str = "127.0.0.1", port: int = 8765, default_limit: int = 100,
+                 max_limit: int = 1000, cache_size: int = 256) -> None:
+        self.manager = manager
+        self.storage = storage
+        self.category_manager = category_manager
+        self.host = host
+        self.port = port
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+        self.version = 0
+        self.generation = uuid.uuid4().hex[:12]
+        self._cache: "OrderedDict[str, Tuple[int, bytes]]" = OrderedDict()
+        self._cache_size = cache_size
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._save_waiters: List[asyncio.Future] = []
+        self._save_task: Optional[asyncio.Task] = None
+        # (task id, deleted at) of deletes whose tombstones go out with the next save
+        self._deleted: List[Tuple[str, str]] = []
+        self._tasks_dirty = False
+        # Category changes only mark a save as due; the save loop writes them on the executor
+        self.category_manager.defer_saves = True
+
+    # Lifecycle
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port,
+                                                  limit=MAX_HEADER_BYTES, backlog=1024)
+        sock = self._server.sockets[0] if self._server.sockets else None
+        if sock is not None:
+            self.port = sock.getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.generation}-v{self.version}"'
+
+    # Connection handling
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._write(writer, 413, {"error": "headers too large"}, keep_alive=False)
+                    break
+                try:
+                    method, target, version, headers = self._parse_head(head)
+                except ApiError as e:
+                    await self._write(writer, e.status, {"error": e.message}, keep_alive=False)
+                    break
+
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    await self._write(writer, 400, {"error": "invalid Content-Length"}, keep_alive=False)
+                    break
+                if length > MAX_BODY_BYTES:
+                    await self._write(writer, 413, {"error": "body too large"}, keep_alive=False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = headers.get("connection", "").lower() != "close" and version == "HTTP/1.1"
+                status, payload, extra = await self._dispatch(method, target, headers, body)
+                await self._write(writer, status, payload, keep_alive, extra)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            try:
+                writer.close()
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    @staticmethod
+    def _parse_head(head: bytes):
+        try:
+            lines = head.decode("latin-1").split("\r\n")
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise ApiError(400, "malformed request line")
+        headers: Dict[str, str] = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, version, headers
+
+    async def _write(self, writer: asyncio.StreamWriter, status: int, payload, keep_alive: bool,
+                     extra: Optional[Dict[str, str]] = None) -> None:
+        if isinstance(payload, bytes):
+            body = payload
+        elif payload is None:
+            body = b""
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        lines = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+                 "Content-Type: application/json; charset=utf-8",
+                 f"Content-Length: {len(body)}",
+                 f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+        for name, value in (extra or {}).items():
+            lines.append(f"{name}: {value}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    # Routing
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str], body: bytes):
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        try:
+            if path not in ("/tasks", "/categories", "/batch") and not path.startswith("/tasks/"):
+                raise ApiError(404, "not found")
+            if method == "GET" and path != "/batch":
+                if headers.get("if-none-match") == self.etag:
+                    return 304, None, {"ETag": self.etag}
+                return 200, self._cached_read(target, path, parse_qs(url.query)), {"ETag": self.etag}
+            if method == "POST" and path == "/batch":
+                try:
+                    data = json.loads(body or b"{}")
+                except ValueError:
+                    raise ApiError(400, "invalid JSON body")
+                result = await self._apply_batch(data.get("ops", []) if isinstance(data, dict) else [])
+                return 200, result, {"ETag": self.etag}
+            raise ApiError(405, "method not allowed")
+        except ApiError as e:
+            return e.status, {"error": e.message}, None
+        except Exception as e:
+            return 500, {"error": str(e)}, None
+
+    def _cached_read(self, target: str, path: str, query: Dict[str, List[str]]) -> bytes:
+        hit = self._cache.get(target)
+        if hit is not None and hit[0] == self.version:
+            self._cache.move_to_end(target)
+            return hit[1]
+        body = json.dumps(self._read(path, query), ensure_ascii=False).encode("utf-8")
+        self._cache[target] = (self.version, body)
+        self._cache.move_to_end(target)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return body
+
+    def _read(self, path: str, query: Dict[str, List[str]]):
+        if path == "/tasks":
+            return self._list_tasks(query)
+        if path == "/categories":
+            return {"categories": self.category_manager.get_task_categories()}
+        if path.startswith("/tasks/"):
+            task = self._find(path[len("/tasks/"):])
+            if task is None:
+                raise ApiError(404, "task not found")
+            return task.to_dict()
+        raise ApiError(404, "not found")
+
+    def _list_tasks(self, query: Dict[str, List[str]]):
+        def arg(name: str, default: str = "") -> str:
+            return query.get(name, [default])[0]
+
+        try:
+            offset = max(0, int(arg("offset", "0")))
+            limit = min(self.max_limit, max(1, int(arg("limit", str(self.default_limit)))))
+        except ValueError:
+            raise ApiError(400, "offset and limit must be integers")
+        tasks = filter_tasks(self.manager.get_all_tasks(), arg("date") or None,
+                             arg("category") or None, arg("q"))
+        completed = arg("completed").lower()
+        if completed in ("true", "false"):
+            want = completed == "true"
+            tasks = [t for t in tasks if bool(t.completed) == want]
+        page = tasks[offset:offset + limit]
+        next_offset = offset + limit if offset + limit < len(tasks) else None
+        return {"items": [t.to_dict() for t in page], "offset": offset, "limit": limit,
+                "total": len(tasks), "next_offset": next_offset}
+
+    def _find(self, task_id: str) -> Optional[Task]:
+        for t in self.manager.get_all_tasks():
+            if t.id == task_id:
+                return t
+        return None
+
+    # Mutations
+    async def _apply_batch(self, ops: List[Dict]):
+        if not isinstance(ops, list) or not ops:
+            raise ApiError(400, "ops must be a non-empty list")
+        results = []
+        tasks_changed = False
+        for op in ops:
+            try:
+                result, changed = self._apply_op(op)
+            except ApiError as e:
+                result, changed = {"ok": False, "error": e.message}, False
+            results.append(result)
+            tasks_changed = tasks_changed or changed
+        if any(r.get("ok") for r in results):
+            self.version += 1
+        self._tasks_dirty = self._tasks_dirty or tasks_changed
+        if tasks_changed or self.category_manager.save_pending:
+            await self._save()
+        return {"results": results, "version": self.version}
+
+    async def _save(self) -> None:
+        """
+        Group commit: wait until a save that started after this call has finished.
+        Batches arriving while a save is running share the next one.
+        """
+        waiter = asyncio.get_running_loop().create_future()
+        self._save_waiters.append(waiter)
+        if self._save_task is None or self._save_task.done():
+            self._save_task = asyncio.ensure_future(self._save_loop())
+        await waiter
+
+    async def _save_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._save_waiters:
+            waiters, self._save_waiters = self._save_waiters, []
+            snapshot = self.manager.snapshot() if self._tasks_dirty else None
+            deleted, self._deleted = self._deleted, []
+            categories = self.category_manager.get_state() if self.category_manager.save_pending else None
+            self._tasks_dirty = self.category_manager.save_pending = False
+            try:
+                await loop.run_in_executor(None, self._write_files, snapshot, deleted, categories)
+            except Exception as e:
+                # Still due: the next save writes them again
+                self._tasks_dirty = self._tasks_dirty or snapshot is not None
+                self.category_manager.save_pending = self.category_manager.save_pending or categories is not None
+                for w in waiters:
+                    if not w.done():
+                        w.set_exception(e)
+                continue
+            for w in waiters:
+                if not w.done():
+                    w.set_result(None)
+
+    def _write_files(self, snapshot, deleted: List[Tuple[str, str]], categories: Optional[List[str]]) -> None:
+        # Runs on the executor; tombstones are added here so only this thread touches the storage
+        for task_id, deleted_at in deleted:
+            self.storage.add_tombstone(task_id, deleted_at)
+        if snapshot is not None:
+            self.storage.save_tasks(snapshot)
+        if categories is not None and self.category_manager.filename:
+            self.category_manager.write(categories)
+
+    def _apply_op(self, op: Dict):
+        """Apply one mutation; returns (result, tasks_changed)."""
+        if not isinstance(op, dict):
+            raise ApiError(400, "op must be an object")
+        kind = op.get("op")
+        if kind == "add":
+            title = str(op.get("title", "")).strip()
+            if not title:
+                raise ApiError(400, "title is required")
+            try:
+                recurrence = RecurrenceRule.from_dict(op.get("recurrence"))
+            except (KeyError, TypeError, ValueError):
+                raise ApiError(400, "invalid recurrence")
+            # Built complete so TaskAdded carries every field
+            task = self.manager.add_task(Task(title, category=op.get("category") or "Personal",
+                                              due_date=op.get("due_date"), recurrence=recurrence))
+            return {"ok": True, "id": task.id}, True
+        if kind == "delete":
+            task = self._require(op)
+            self.manager.delete_task(task.id)
+            self._deleted.append((task.id, datetime.now().isoformat()))
+            return {"ok": True, "id": task.id}, True
+        if kind == "done":
+            task = self._require(op)
+            self.manager.mark_task_done(task.id)
+            return {"ok": True, "id": task.id}, True
+        if kind == "update":
+            task = self._require(op)
+            fields = op.get("fields") or {}
+            if not isinstance(fields, dict):
+                raise ApiError(400, "fields must be an object")
+            changes = {name: fields[name] for name in ("title", "category", "due_date") if name in fields}
+            if "title" in changes:
+                changes["title"] = str(changes["title"] or "").strip()
+                if not changes["title"]:
+                    raise ApiError(400, "title is required")
+            # Through the manager: the task is copied on write and TaskUpdated reaches the indexes
+            changed = self.manager.update_task(task.id, **changes)
+            return {"ok": True, "id": task.id}, bool(changed)
+        if kind == "add_category":
+            return {"ok": self.category_manager.add_category(op.get("name", ""))}, False
+        if kind == "rename_category":
+            ok = self.category_manager.rename_category(op.get("old", ""), op.get("new", ""), self.manager)
+            return {"ok": ok}, ok
+        if kind == "delete_category":
+            ok = self.category_manager.delete_category(op.get("name", ""), op.get("replacement", "Personal"),
+                                                       self.manager)
+            return {"ok": ok}, ok
+        raise ApiError(400, f"unknown op: {kind}")
+
+    def _require(self, op: Dict) -> Task:
+        task = self._find(str(op.get("id", "")))
+        if task is None:
+            raise ApiError(404, "task not found")
+        return task
+
+
+def build_server(host: str = "127.0.0.1", port: int = 8765, tasks_file: str = "tasks.json",
+                 categories_file: str = "categories.json") -> TaskApiServer:
+    storage = TaskStorage(tasks_file)
+    # The app writes the same file; only one of them may run at a time
+    storage.acquire_lock()
+    manager = TaskManager()
+    manager.tasks = storage.load_tasks()
+    return TaskApiServer(manager, storage, CategoryManager(categories_file), host, port)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON API for the task list")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--tasks", default="tasks.json")
+    parser.add_argument("--categories", default="categories.json")
+    args = parser.parse_args(argv)
+
+    try:
+        server = build_server(args.host, args.port, args.tasks, args.categories)
+    except StorageLocked as e:
+        raise SystemExit(f"error: {e}")
+
+    async def run():
+        await server.start()
+        print(f"Serving on http://{server.host}:{server.port}")
+        await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
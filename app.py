@@ -2,27 +2,66 @@ import tkinter as tk
 from tkinter import messagebox, ttk
 from datetime import datetime
 from tkcalendar import DateEntry
-import csv
+import json
+import os
+import threading
+import time
 import winsound
 
-from task_manager import TaskManager
-from task_storage import TaskStorage
+from archive import TaskArchive
+from duplicates import DuplicateIndex, merge_duplicates
+from events import CATEGORY_EVENTS, TASK_EVENTS, EventBus, TaskRemoved, TasksReplaced, TaskUpdated
+from history import TaskHistory
+from tags import parse_query
+from task import Task
+from task_exporter import IncrementalExporter
+from task_manager import TaskCounts, TaskManager, filter_tasks
+from task_storage import StorageLocked, TaskStorage
+from task_store import TaskStore
 from category_manager import CategoryManager
-from dialogs import AddCategoryDialog, DeleteCategoryDialog, RenameCategoryDialog, EditTaskDialog
+from dialogs import (AddCategoryDialog, DeleteCategoryDialog, DuplicatesDialog, HistoryDialog, ProgressDialog,
+                     RenameCategoryDialog, EditTaskDialog, NotificationPanel)
+from notifications import NotificationCenter
+from profiling import profiler, timed
+from recurrence import Occurrence, RecurrenceRule
+from watchdog import watchdog
 
 
 class TaskManagerApp:
     def __init__(self) -> None:
         # Core services
+        self.events = EventBus()
         self.storage = TaskStorage()
-        self.manager = TaskManager()
+        try:
+            # The API server writes the same file; only one of them may run at a time
+            self.storage.acquire_lock()
+        except StorageLocked as e:
+            messagebox.showerror("Task File In Use", str(e))
+            raise SystemExit(1)
+        self.manager = TaskManager(self.events)
         self.manager.tasks = self.storage.load_tasks()
-        self.category_manager = CategoryManager()
+        self.category_manager = CategoryManager(events=self.events)
         self.category_manager.load()
+        self.archive = TaskArchive(max_age_days=int(os.environ.get("TODO_ARCHIVE_DAYS", "90") or 0))
+        # Autosave: the task file is written once per batch of change events
+        self.store = TaskStore(self.manager, self.storage, self.category_manager, autosave=True,
+                               archive=self.archive)
+        self.counts = TaskCounts(self.manager)
+        live = self.archive.archive_completed(self.manager.tasks)
+        if len(live) != len(self.manager.tasks):
+            self.manager.tasks = live
+        # Built on a helper thread so a large list does not hold up start-up
+        self.duplicates = DuplicateIndex(self.manager, background=True)
+        self.exporter = IncrementalExporter(self.storage)
+        self.history = TaskHistory(self.manager, self.category_manager,
+                                   depth=int(os.environ.get("TODO_HISTORY_DEPTH", "50") or 1))
 
         # State
         self.LOG_FILE = "activity.log"
         self.current_tasks = []
+        # Worker thread of a running duplicate scan
+        self._duplicate_scan = None
+        self._view = ("today", None, "")
 
         # Tk root
         self.window = tk.Tk()
@@ -30,6 +69,8 @@ class TaskManagerApp:
         self.window.resizable(True, True)
         self.window.configure(bg="#f0f0f0")
         self.window.bind("<Escape>", lambda e: self.window.destroy())
+        self.window.bind("<Control-z>", lambda e: self.undo())
+        self.window.bind("<Control-y>", lambda e: self.redo())
 
         # Center window
         screen_width = self.window.winfo_screenwidth()
@@ -65,10 +106,35 @@ class TaskManagerApp:
                   bg="#622180", fg="white", font=("Segoe UI", 11)).pack(pady=4, padx=8)
         tk.Button(self.button_frame, text="Export to CSV", width=20, command=self.export_to_csv,
                   bg="#ff9800", fg="white", font=("Segoe UI", 11)).pack(pady=4, padx=8)
+        tk.Button(self.button_frame, text="Export Changes", width=20, command=self.export_changes,
+                  bg="#F57C00", fg="white", font=("Segoe UI", 11)).pack(pady=4, padx=8)
 
         # Stats button
         tk.Button(self.button_frame, text="Task Stats", width=20, command=self.show_stats,
                   bg="#607D8B", fg="white", font=("Segoe UI", 11)).pack(pady=4, padx=8)
+        tk.Button(self.button_frame, text="Reminders", width=20, command=self.show_reminders,
+                  bg="#795548", fg="white", font=("Segoe UI", 11)).pack(pady=4, padx=8)
+        tk.Button(self.button_frame, text="Find Duplicates", width=20, command=self.find_duplicates,
+                  bg="#00796B", fg="white", font=("Segoe UI", 11)).pack(pady=4, padx=8)
+
+        # Bulk edits apply the category / due date chosen in the input row to the selection
+        selection_frame = tk.LabelFrame(self.button_frame, text="Selection", bg="#e0e0e0",
+                                        font=("Segoe UI", 10, "bold"), relief="groove", borderwidth=3)
+        selection_frame.pack(pady=(4, 0), padx=8, fill="x")
+        tk.Button(selection_frame, text="Set Category", width=20, command=self.set_category,
+                  bg="#5D4037", fg="white", font=("Segoe UI", 10)).pack(pady=(6, 2))
+        tk.Button(selection_frame, text="Set Due Date", width=20, command=self.set_due_date,
+                  bg="#455A64", fg="white", font=("Segoe UI", 10)).pack(pady=(0, 6))
+
+        history_frame = tk.LabelFrame(self.button_frame, text="History", bg="#e0e0e0",
+                                      font=("Segoe UI", 10, "bold"), relief="groove", borderwidth=3)
+        history_frame.pack(pady=(4, 0), padx=8, fill="x")
+        tk.Button(history_frame, text="Undo", width=9, command=self.undo,
+                  bg="#757575", fg="white", font=("Segoe UI", 10)).pack(side="left", pady=6, padx=(6, 2))
+        tk.Button(history_frame, text="Redo", width=9, command=self.redo,
+                  bg="#757575", fg="white", font=("Segoe UI", 10)).pack(side="left", pady=6, padx=(2, 2))
+        tk.Button(history_frame, text="...", width=3, command=self.show_history,
+                  bg="#9E9E9E", fg="white", font=("Segoe UI", 10)).pack(side="left", pady=6, padx=(2, 6))
 
         # Category group
         manage_cat_frame = tk.LabelFrame(self.button_frame, text="Categories", bg="#e0e0e0",
@@ -102,6 +168,10 @@ class TaskManagerApp:
         tk.Label(input_frame, text="Due:", bg="#f0f0f0", font=("Segoe UI", 10)).pack(side="left", padx=(4,0))
         self.due_picker = DateEntry(input_frame, width=12, font=("Segoe UI", 11), date_pattern='yyyy-mm-dd')
         self.due_picker.pack(side="left", padx=(0, 6))
+        self.repeat_combo = ttk.Combobox(input_frame, values=["Once", "Daily", "Weekly", "Monthly"],
+                                         state="readonly", font=("Segoe UI", 11), width=9)
+        self.repeat_combo.set("Once")
+        self.repeat_combo.pack(side="left", padx=(0, 6))
 
         # Filters row
         filter_frame = tk.Frame(self.right_frame, bg="#f0f0f0")
@@ -121,12 +191,13 @@ class TaskManagerApp:
         # List + scrollbar
         list_frame = tk.Frame(self.right_frame, bg="#f0f0f0")
         list_frame.pack(fill="both", expand=True)
-        self.task_listbox = tk.Listbox(list_frame, width=60, height=20, font=("Segoe UI", 12))
+        self.task_listbox = tk.Listbox(list_frame, width=60, height=20, font=("Segoe UI", 12), selectmode=tk.EXTENDED)
         self.task_listbox.pack(side="left", fill="both", expand=True)
         scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.task_listbox.yview)
         scrollbar.pack(side="right", fill="y")
         self.task_listbox.configure(yscrollcommand=scrollbar.set)
         self.task_listbox.bind("<Double-Button-1>", self.edit_task)
+        self.task_listbox.bind("<Control-a>", lambda e: self.task_listbox.selection_set(0, tk.END))
 
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
@@ -138,27 +209,50 @@ class TaskManagerApp:
         self.rebuild_category_options()
         self.refresh_listbox("today")
         # periodic reminder check
-        self._notified_ids = set()
+        self.notifications = NotificationCenter()
+        self._reminder_panel = None
         self.window.after(30000, self._check_due_tasks)
 
+        # From here on, change events are coalesced and delivered once per UI tick
+        self.events.scheduler = self.window.after_idle
+        self.events.subscribe(self._on_view_events)
+        self.events.subscribe(self._on_reminder_events, TASK_EVENTS)
+        watchdog.start(self.window.after)
+
     def _check_due_tasks(self) -> None:
         try:
-            today = datetime.now().strftime("%Y-%m-%d")
-            for t in self.manager.get_all_tasks():
-                if getattr(t, 'completed', False):
-                    continue
-                due = getattr(t, 'due_date', None)
-                if due and due <= today and t.id not in self._notified_ids:
-                    try:
-                        winsound.Beep(1200, 250)
-                        winsound.Beep(900, 250)
-                    except Exception:
-                        pass
-                    messagebox.showinfo("Task Reminder", f"'{t.title}' is due ({due}).")
-                    self._notified_ids.add(t.id)
+            items = self.notifications.pending(self.manager.get_all_tasks())
+            fresh = self.notifications.unannounced(items)
+            if fresh and self.notifications.may_announce():
+                self.notifications.mark_announced(k for k, _ in fresh)
+                try:
+                    winsound.Beep(1200, 250)
+                    winsound.Beep(900, 250)
+                except Exception:
+                    pass
+                self.show_reminders(items)
+            elif self._reminder_panel is not None:
+                self._reminder_panel.update(items)
         finally:
             self.window.after(30000, self._check_due_tasks)
 
+    def show_reminders(self, items=None) -> None:
+        if items is None:
+            items = self.notifications.pending(self.manager.get_all_tasks())
+        if self._reminder_panel is None:
+            self._reminder_panel = NotificationPanel(self.window, self.notifications, self._on_reminders_closed)
+        self._reminder_panel.show(items)
+
+    def _on_reminders_closed(self) -> None:
+        self._reminder_panel = None
+
+    def _on_reminder_events(self, events) -> None:
+        if self._reminder_panel is None:
+            return
+        relevant = {"due_date", "completed", "recurrence", "completed_occurrences"}
+        if any(not isinstance(e, TaskUpdated) or e.fields & relevant for e in events):
+            self._reminder_panel.update(self.notifications.pending(self.manager.get_all_tasks()))
+
     # ---------- Helpers ----------
     def log_action(self, action: str, task_title: str = "") -> None:
         try:
@@ -189,6 +283,11 @@ class TaskManagerApp:
         except Exception:
             pass
 
+    def _archived_not_live(self, archived):
+        # An interrupted archive run can leave a task in both places; the live copy wins
+        live_ids = {t.id for t in self.manager.get_all_tasks()}
+        return [t for t in archived if t.id not in live_ids]
+
     def rebuild_category_options(self) -> None:
         # Sync combos with current categories
         task_cats = self.category_manager.get_task_categories()
@@ -208,99 +307,215 @@ class TaskManagerApp:
             pass
 
     # ---------- Actions ----------
+    @timed("refresh_listbox")
     def refresh_listbox(self, date_filter=None, category_filter=None, search_term="") -> None:
+        self._view = (date_filter, category_filter, search_term)
         self.task_listbox.delete(0, tk.END)
-        tasks = list(self.manager.get_all_tasks())
+        tasks = self.manager.get_all_tasks()
+        tags, match_any, _ = parse_query(search_term)
+        if tags:
+            # Live tasks are narrowed through the tag index instead of parsing every title
+            tasks = self.manager.tags.filter(tasks, tags, match_any)
+        tasks = list(tasks)
 
-        if date_filter == "today":
-            today = datetime.now().strftime("%Y-%m-%d")
-            tasks = [t for t in tasks if t.created_at.split("T")[0] == today]
-        elif isinstance(date_filter, str):
-            tasks = [t for t in tasks if t.created_at.split("T")[0] == date_filter]
+        # Archived tasks are only read when the view reaches back into their range
+        if date_filter is None:
+            tasks += self._archived_not_live(self.archive.load_all())
+        elif isinstance(date_filter, str) and date_filter != "today":
+            tasks += self._archived_not_live(self.archive.load_range(date_filter, date_filter))
 
-        if category_filter and category_filter != "All":
-            tasks = [t for t in tasks if t.category == category_filter]
-
-        if search_term.strip():
-            tasks = [t for t in tasks if search_term.lower() in t.title.lower()]
+        tasks = filter_tasks(tasks, date_filter, category_filter, search_term)
 
         self.current_tasks = tasks
-        for task in tasks:
+        if tasks:
+            self.task_listbox.insert(tk.END, *[self._display(task) for task in tasks])
+        self._update_status()
+
+    @staticmethod
+    def _display(task) -> str:
+        overdue = False
+        try:
+            if getattr(task, 'due_date', None) and not task.completed:
+                overdue = datetime.now().strftime("%Y-%m-%d") > task.due_date
+        except Exception:
             overdue = False
-            try:
-                if getattr(task, 'due_date', None) and not task.completed:
-                    overdue = datetime.now().strftime("%Y-%m-%d") > task.due_date
-            except Exception:
-                overdue = False
-            prefix = "⏰ " if overdue else ""
-            display = f"{prefix}✔️ {task.title} ({task.category})" if task.completed else f"{prefix}{task.title} ({task.category})"
-            self.task_listbox.insert(tk.END, display)
+        prefix = "⏰ " if overdue else ""
+        if isinstance(task, Occurrence) or getattr(task, 'recurrence', None):
+            prefix += "🔁 "
+        return f"{prefix}✔️ {task.title} ({task.category})" if task.completed else f"{prefix}{task.title} ({task.category})"
 
+    def _update_status(self) -> None:
         try:
-            all_tasks = self.manager.get_all_tasks()
-            total_count = len(all_tasks)
-            completed_count = sum(1 for t in all_tasks if getattr(t, 'completed', False))
+            archived_count = self.archive.count()
+            total_count = self.counts.total + archived_count
+            completed_count = self.counts.completed + archived_count
             pending_count = total_count - completed_count
             self.status_var.set(
-                f"Showing {len(tasks)} of {total_count} | Completed {completed_count} | Pending {pending_count}"
+                f"Showing {len(self.current_tasks)} of {total_count} | Completed {completed_count} | Pending {pending_count}"
             )
         except Exception:
             pass
 
+    @timed("update_listbox")
+    def _on_view_events(self, events) -> None:
+        """Patch only the rows touched by a batch of change events."""
+        if any(isinstance(e, CATEGORY_EVENTS) for e in events):
+            self.rebuild_category_options()
+        if any(isinstance(e, TasksReplaced) for e in events):
+            self.refresh_listbox(*self._view)
+            return
+        changed = {e.task.id: e for e in events if isinstance(e, TASK_EVENTS)}
+        if len(changed) > 50:
+            self._redraw_rows(changed)
+            return
+        for e in events:
+            if not isinstance(e, TASK_EVENTS):
+                continue
+            task_id = e.task.id
+            positions = [i for i, row in enumerate(self.current_tasks) if row.id == task_id]
+            for i in reversed(positions):
+                self.task_listbox.delete(i)
+                del self.current_tasks[i]
+            if isinstance(e, TaskRemoved):
+                continue
+            rows = filter_tasks([e.task], *self._view)
+            at = positions[0] if positions else len(self.current_tasks)
+            for offset, row in enumerate(rows):
+                self.current_tasks.insert(at + offset, row)
+                self.task_listbox.insert(at + offset, self._display(row))
+        self._update_status()
+
+    def _redraw_rows(self, changed) -> None:
+        # Large batches: rebuild the row list in one pass and redraw with one Tcl call
+        rows, shown = [], set()
+        for row in self.current_tasks:
+            e = changed.get(row.id)
+            if e is None:
+                rows.append(row)
+            elif row.id not in shown:
+                shown.add(row.id)
+                if not isinstance(e, TaskRemoved):
+                    rows.extend(filter_tasks([e.task], *self._view))
+        for task_id, e in changed.items():
+            if task_id not in shown and not isinstance(e, TaskRemoved):
+                rows.extend(filter_tasks([e.task], *self._view))
+        self.current_tasks = rows
+        self.task_listbox.delete(0, tk.END)
+        if rows:
+            self.task_listbox.insert(tk.END, *[self._display(row) for row in rows])
+        self._update_status()
+
     def add_task(self) -> None:
         title = self.entry.get().strip()
         category = self.category_combo.get()
         if not title:
             messagebox.showwarning("Empty Task", "Please enter a task.")
             return
-        task = self.manager.add_task(title, category)
         try:
-            task.due_date = self.due_picker.get_date().strftime("%Y-%m-%d")
+            due_date = self.due_picker.get_date().strftime("%Y-%m-%d")
         except Exception:
-            task.due_date = None
-        self.storage.save_tasks(self.manager.get_all_tasks())
+            due_date = None
+        repeat = self.repeat_combo.get()
+        recurrence = RecurrenceRule(repeat.lower()) if repeat and repeat != "Once" else None
+        exact, near = self.duplicates.find(title)
+        matches = exact + [t for _, t in near]
+        if matches:
+            listed = "\n".join(f"• {t.title} ({t.category})" for t in matches[:5])
+            more = f"\n…and {len(matches) - 5} more" if len(matches) > 5 else ""
+            if not messagebox.askyesno("Possible Duplicate",
+                                       f"Similar open tasks already exist:\n{listed}{more}\n\nAdd '{title}' anyway?"):
+                return
+        # Saving and the list view follow from the TaskAdded event
+        self.manager.add_task(Task(title, category=category, due_date=due_date, recurrence=recurrence))
         self.entry.delete(0, tk.END)
-        self.refresh_listbox("today")
         self.log_action("Task Added:", title)
         self.play_beep()
 
+    def _selected_rows(self, action: str):
+        """Selected live rows; archived rows are read-only and left out."""
+        indices = self.task_listbox.curselection()
+        if not indices:
+            messagebox.showwarning("No Selection", f"Please select a task to {action}.")
+            return []
+        rows = [self.current_tasks[i] for i in indices]
+        live_ids = {t.id for t in self.manager.get_all_tasks()}
+        live = [row for row in rows if row.id in live_ids]
+        if len(live) < len(rows):
+            messagebox.showinfo("Archived Task", "Archived tasks are read-only." +
+                                (f" {len(rows) - len(live)} selected task(s) were skipped." if live else ""))
+        return live
+
+    def _log_tasks(self, single: str, batched: str, rows, **details) -> None:
+        """One activity entry per action: the plain form for one task, a JSON batch otherwise."""
+        if len(rows) == 1 and not details:
+            self.log_action(single, rows[0].title)
+        elif rows:
+            self.log_action(batched, json.dumps({**details, "titles": [row.title for row in rows]}, ensure_ascii=False))
+
     def delete_task(self) -> None:
-        selected = self.task_listbox.curselection()
-        if not selected:
-            messagebox.showwarning("No Selection", "Please select a task to delete.")
+        rows = self._selected_rows("delete")
+        if not rows:
             return
-        index = selected[0]
-        task = self.current_tasks[index]
-        self.manager.delete_task(task.id)
-        self.storage.save_tasks(self.manager.get_all_tasks())
-        self.refresh_listbox("today")
-        self.log_action("Task Deleted:", task.title)
+        recurring = [row for row in rows if isinstance(row, Occurrence)]
+        if recurring:
+            question = (f"Delete every occurrence of '{recurring[0].title}'?" if len(recurring) == 1
+                        else f"Delete every occurrence of {len(recurring)} recurring tasks?")
+            if not messagebox.askyesno("Recurring Task", question):
+                return
+        elif len(rows) > 1 and not messagebox.askyesno("Delete Tasks", f"Delete {len(rows)} tasks?"):
+            return
+        # One transaction: one save, one batch of change events, one view update
+        with self.store.transaction():
+            removed = self.manager.delete_tasks([row.id for row in rows])
+        self._log_tasks("Task Deleted:", "Tasks Deleted:", removed)
 
     def mark_done(self) -> None:
-        selected = self.task_listbox.curselection()
-        if not selected:
-            messagebox.showwarning("No Selection", "Please select a task to mark as done.")
+        rows = self._selected_rows("mark as done")
+        if not rows:
             return
-        index = selected[0]
-        task = self.current_tasks[index]
-        self.manager.mark_task_done(task.id)
-        self.storage.save_tasks(self.manager.get_all_tasks())
-        self.refresh_listbox("today")
-        self.log_action("Task Completed:", task.title)
+        with self.store.transaction():
+            self.manager.complete_occurrences([(row.id, row.date) for row in rows if isinstance(row, Occurrence)])
+            self.manager.mark_tasks_done([row.id for row in rows if not isinstance(row, Occurrence)])
+        self._log_tasks("Task Completed:", "Tasks Completed:", rows)
         self.play_beep()
 
+    def set_category(self) -> None:
+        rows = self._selected_rows("re-categorize")
+        category = self.category_combo.get()
+        if not rows or not category:
+            return
+        with self.store.transaction():
+            changed = self.manager.update_tasks([row.id for row in rows], category=category)
+        self._log_tasks("", "Tasks Recategorized:", changed, category=category)
+
+    def set_due_date(self) -> None:
+        rows = self._selected_rows("reschedule")
+        if not rows:
+            return
+        # A recurring task's due date anchors its series, so it is not moved in bulk
+        rows = [row for row in rows if getattr(row, "recurrence", None) is None]
+        if not rows:
+            messagebox.showinfo("Recurring Task", "Recurring tasks keep their schedule; edit them one at a time.")
+            return
+        try:
+            due_date = self.due_picker.get_date().strftime("%Y-%m-%d")
+        except Exception:
+            return
+        with self.store.transaction():
+            changed = self.manager.update_tasks([row.id for row in rows], due_date=due_date)
+        self._log_tasks("", "Tasks Rescheduled:", changed, due_date=due_date)
+
     def edit_task(self, event=None) -> None:
-        selected = self.task_listbox.curselection()
-        if not selected:
-            messagebox.showwarning("No Selection", "Please select a task to edit.")
+        rows = self._selected_rows("edit")
+        if not rows:
             return
-        index = selected[0]
-        task = self.current_tasks[index]
+        task = rows[0]
+        if isinstance(task, Occurrence):
+            task = task.task
 
-        def on_saved(_task):
-            self.storage.save_tasks(self.manager.get_all_tasks())
-            self.refresh_listbox("today", self.category_filter_combo.get(), self.search_entry.get().strip())
-            self.log_action("Task Edited:", _task.title)
+        def on_saved(_task, fields):
+            self.manager.update_task(_task.id, **fields)
+            self.log_action("Task Edited:", fields.get("title", _task.title))
             self.play_beep()
 
         EditTaskDialog(self.window, task, self.category_manager, on_saved)
@@ -320,23 +535,104 @@ class TaskManagerApp:
 
     def search_tasks(self, event=None) -> None:
         term = self.search_entry.get().strip()
-        self.refresh_listbox(date_filter="today", category_filter=self.category_filter_combo.get(), search_term=term)
+        # Tag searches ("#car @work", "#car | #home") look at every date, plain text only at today
+        date_filter = None if parse_query(term)[0] else "today"
+        self.refresh_listbox(date_filter=date_filter, category_filter=self.category_filter_combo.get(), search_term=term)
         self.log_action("Search:", term)
 
+    def find_duplicates(self) -> None:
+        """Scan for duplicate groups on a worker thread, with a progress dialog that can cancel it."""
+        if self._duplicate_scan is not None:
+            return
+        dialog = ProgressDialog(self.window, "Find Duplicates", "Looking for duplicate tasks…")
+        progress = [0, 0]
+        result = {}
+
+        def report(done, total):
+            progress[:] = [done, total]
+
+        def scan():
+            started = time.perf_counter()
+            try:
+                result["groups"] = self.duplicates.groups(report, lambda: dialog.cancelled)
+            except Exception as e:
+                result["error"] = e
+            if profiler.enabled:
+                profiler.record("find_duplicates", time.perf_counter() - started)
+
+        def poll():
+            if self._duplicate_scan.is_alive():
+                dialog.set_progress(progress[0], progress[1], f"Checked {progress[0]} of {progress[1]} titles…"
+                                    if progress[1] else "")
+                self.window.after(100, poll)
+                return
+            self._duplicate_scan = None
+            dialog.close()
+            if "error" in result:
+                messagebox.showerror("Duplicates", f"Finding duplicates failed:\n{result['error']}")
+            elif result.get("groups") is not None:
+                self._show_duplicates(result["groups"])
+
+        self._duplicate_scan = threading.Thread(target=scan, name="duplicate-scan", daemon=True)
+        self._duplicate_scan.start()
+        self.window.after(100, poll)
+
+    def _show_duplicates(self, groups) -> None:
+        if not groups:
+            messagebox.showinfo("Duplicates", "No duplicate open tasks found.")
+            return
+
+        def on_merge(selected):
+            # One transaction: a single save and one batch of change events
+            with self.store.transaction():
+                kept = merge_duplicates(self.manager, selected)
+            removed = sum(len(g) for g in selected) - len(kept)
+            self.log_action("Duplicates Merged:", f"{removed} tasks into {len(kept)}")
+
+        DuplicatesDialog(self.window, groups, on_merge)
+
+    @timed("undo")
+    def undo(self) -> None:
+        version = self.history.undo()
+        if version is None:
+            self.play_beep()
+            return
+        self.rebuild_category_options()
+        self.log_action("Undo:", version.label)
+
+    @timed("redo")
+    def redo(self) -> None:
+        version = self.history.redo()
+        if version is None:
+            self.play_beep()
+            return
+        self.rebuild_category_options()
+        self.log_action("Redo:", version.label)
+
+    def show_history(self) -> None:
+        HistoryDialog(self.window, self.history)
+
+    @timed("export_to_csv")
     def export_to_csv(self) -> None:
-        filename = f"tasks_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-        with open(filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.writer(f)
-            writer.writerow(["ID", "Title", "Category", "Completed", "Created At", "Done At"])
-            for task in self.manager.get_all_tasks():
-                writer.writerow([task.id, task.title, task.category, task.completed, task.created_at, task.done_at])
+        # A full export is also the new baseline for Export Changes
+        filename = self.exporter.compact(self.manager.get_all_tasks())
         messagebox.showinfo("Exported", f"Tasks exported to {filename}")
         self.log_action("Tasks Exported:", filename)
 
+    @timed("export_changes")
+    def export_changes(self) -> None:
+        filename, counts = self.exporter.export(self.manager.get_all_tasks())
+        if filename is None:
+            messagebox.showinfo("Export Changes", "No changes since the last export.")
+            return
+        summary = ", ".join(f"{n} {change}" for change, n in sorted(counts.items()))
+        messagebox.showinfo("Exported", f"Changes exported to {filename}\n{summary}")
+        self.log_action("Changes Exported:", filename)
+
     def show_stats(self) -> None:
-        all_tasks = list(self.manager.get_all_tasks())
-        total_count = len(all_tasks)
-        completed_count = sum(1 for t in all_tasks if getattr(t, 'completed', False))
+        archived_count = self.archive.count()
+        total_count = self.counts.total + archived_count
+        completed_count = self.counts.completed + archived_count
         pending_count = total_count - completed_count
 
         # همچنین آمار نمایشی (فیلتر فعلی)
@@ -358,17 +654,48 @@ class TaskManagerApp:
         tk.Label(frame, text=f"Total: {total_count}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=1, column=0, sticky="w")
         tk.Label(frame, text=f"Completed: {completed_count}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=2, column=0, sticky="w")
         tk.Label(frame, text=f"Pending: {pending_count}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=3, column=0, sticky="w")
+        archived_text = f"Archived: {archived_count}"
+        by_category = sorted(self.archive.category_counts().items(), key=lambda kv: (-kv[1], kv[0]))
+        if by_category:
+            archived_text += " (" + ", ".join(f"{cat} {n}" for cat, n in by_category) + ")"
+        tk.Label(frame, text=archived_text, bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=4, column=0, sticky="w")
 
         sep = tk.Label(frame, text="", bg="#f7f7f7")
-        sep.grid(row=4, column=0, pady=(6, 6))
+        sep.grid(row=5, column=0, pady=(6, 6))
 
         header2 = tk.Label(frame, text="Current View", bg="#f7f7f7", font=("Segoe UI", 11, "bold"))
-        header2.grid(row=5, column=0, sticky="w")
-        tk.Label(frame, text=f"Shown: {visible_count}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=6, column=0, sticky="w")
-        tk.Label(frame, text=f"Completed: {visible_completed}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=7, column=0, sticky="w")
-        tk.Label(frame, text=f"Pending: {visible_pending}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=8, column=0, sticky="w")
-
-        tk.Button(frame, text="Close", command=dlg.destroy, bg="#ddd", fg="#333", width=10).grid(row=9, column=0, sticky="e", pady=(10,0))
+        header2.grid(row=6, column=0, sticky="w")
+        tk.Label(frame, text=f"Shown: {visible_count}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=7, column=0, sticky="w")
+        tk.Label(frame, text=f"Completed: {visible_completed}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=8, column=0, sticky="w")
+        tk.Label(frame, text=f"Pending: {visible_pending}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=9, column=0, sticky="w")
+
+        row = 10
+        tag_counts = list(self.manager.tags.counts().items())
+        if tag_counts:
+            tk.Label(frame, text="", bg="#f7f7f7").grid(row=row, column=0, pady=(6, 6))
+            tk.Label(frame, text="Tags", bg="#f7f7f7", font=("Segoe UI", 11, "bold")).grid(row=row + 1, column=0, sticky="w")
+            row += 2
+            shown = tag_counts[:15]
+            for tag, n in shown:
+                tk.Label(frame, text=f"{tag}: {n}", bg="#f7f7f7", font=("Segoe UI", 10)).grid(row=row, column=0, sticky="w")
+                row += 1
+            if len(tag_counts) > len(shown):
+                tk.Label(frame, text=f"… and {len(tag_counts) - len(shown)} more", bg="#f7f7f7",
+                         font=("Segoe UI", 9)).grid(row=row, column=0, sticky="w")
+                row += 1
+
+        if profiler.enabled:
+            tk.Label(frame, text="", bg="#f7f7f7").grid(row=row, column=0, pady=(6, 6))
+            tk.Label(frame, text="Performance (ms)", bg="#f7f7f7", font=("Segoe UI", 11, "bold")).grid(
+                row=row + 1, column=0, sticky="w")
+            row += 2
+            for name, s in profiler.report().items():
+                text = (f"{name}: n={s['count']}  total={s['total_ms']:.1f}  p50={s['p50_ms']:.2f}  "
+                        f"p95={s['p95_ms']:.2f}  p99={s['p99_ms']:.2f}")
+                tk.Label(frame, text=text, bg="#f7f7f7", font=("Consolas", 9)).grid(row=row, column=0, sticky="w")
+                row += 1
+
+        tk.Button(frame, text="Close", command=dlg.destroy, bg="#ddd", fg="#333", width=10).grid(row=row, column=0, sticky="e", pady=(10,0))
 
         # Center over main
         try:
@@ -388,7 +715,6 @@ class TaskManagerApp:
     # ---------- Category dialogs ----------
     def add_new_category(self) -> None:
         def on_added(name: str):
-            self.rebuild_category_options()
             try:
                 self.category_combo.set(name)
             except Exception:
@@ -401,24 +727,18 @@ class TaskManagerApp:
             messagebox.showinfo("No Categories", "There are no user categories to delete.")
             return
         def on_deleted(cat: str, replacement: str):
-            self.storage.save_tasks(self.manager.get_all_tasks())
-            self.rebuild_category_options()
-            self.refresh_listbox("today", self.category_filter_combo.get(), self.search_entry.get().strip())
             self.log_action("Category Deleted:", f"{cat} -> {replacement}")
 
-        DeleteCategoryDialog(self.window, self.category_manager, self.manager.get_all_tasks(), on_deleted)
+        DeleteCategoryDialog(self.window, self.category_manager, self.manager, on_deleted, self.store)
 
     def edit_category_dialog(self) -> None:
         if not self.category_manager.get_task_categories():
             messagebox.showinfo("No Categories", "There are no user categories to rename.")
             return
         def on_renamed(old: str, new: str):
-            self.storage.save_tasks(self.manager.get_all_tasks())
-            self.rebuild_category_options()
-            self.refresh_listbox("today", self.category_filter_combo.get(), self.search_entry.get().strip())
             self.log_action("Category Renamed:", f"{old} -> {new}")
 
-        RenameCategoryDialog(self.window, self.category_manager, self.manager.get_all_tasks(), on_renamed)
+        RenameCategoryDialog(self.window, self.category_manager, self.manager, on_renamed, self.store)
 
     # ---------- Run ----------
     def run(self) -> None:
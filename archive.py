@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from task import Task
+
+
+class TaskArchive:
+    """
+    Cold storage for completed tasks that have been done for a while.
+
+    Archived tasks are written to gzip-compressed, append-only JSON-lines
+    segments. A small index keeps per-segment summaries (counts, date ranges,
+    per-category counts) so stats never need to open a segment, and views only
+    decompress the segments whose date range they actually reach into.
+    Archived ids are also appended to a plain list so membership checks don't
+    need the segments either.
+    """
+
+    INDEX_NAME = "index.json"
+    IDS_NAME = "ids.txt"
+
+    def __init__(self, directory: str = "archive", max_age_days: int = 90) -> None:
+        self.directory = directory
+        self.max_age_days = max_age_days
+        self._segments: List[Dict] = []
+        self._loaded: Dict[str, List[Task]] = {}
+        # task id -> updated_at of the archived copy, loaded on first use
+        self._ids: Optional[Dict[str, str]] = None
+        self._load_index()
+
+    # Index
+    def _index_path(self) -> str:
+        return os.path.join(self.directory, self.INDEX_NAME)
+
+    def _load_index(self) -> None:
+        path = self._index_path()
+        if not os.path.exists(path):
+            self._segments = []
+            return
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._segments = json.load(f).get("segments", [])
+        except Exception:
+            self._segments = []
+
+    def _save_index(self) -> None:
+        path = self._index_path()
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"segments": self._segments}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    # Archiving
+    def is_due(self, task, cutoff: str) -> bool:
+        done_at = getattr(task, "done_at", None)
+        return bool(getattr(task, "completed", False) and done_at and done_at < cutoff)
+
+    def archive_completed(self, tasks: List[Task], now: Optional[datetime] = None) -> List[Task]:
+        """
+        Move completed tasks older than `max_age_days` into a new segment.
+        Returns the tasks that stay live (the input list when nothing moved).
+        """
+        if not self.max_age_days or self.max_age_days <= 0:
+            return tasks
+        cutoff = ((now or datetime.now()) - timedelta(days=self.max_age_days)).isoformat()
+        old = [t for t in tasks if self.is_due(t, cutoff)]
+        if not old:
+            return tasks
+        self._write_segment(old)
+        moved = {t.id for t in old}
+        return [t for t in tasks if t.id not in moved]
+
+    def archive_tasks(self, tasks: List[Task]) -> None:
+        """Move the given tasks into a new segment whatever their age (sync uses this once a peer archived them)."""
+        if tasks:
+            self._write_segment(tasks)
+
+    def _write_segment(self, tasks: List[Task]) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        number = max((s["number"] for s in self._segments), default=0) + 1
+        name = f"segment_{number:05d}.jsonl.gz"
+        with gzip.open(os.path.join(self.directory, name), "wt", encoding="utf-8") as f:
+            for t in tasks:
+                f.write(json.dumps(t.to_dict(), ensure_ascii=False))
+                f.write("\n")
+        categories: Dict[str, int] = {}
+        for t in tasks:
+            categories[t.category] = categories.get(t.category, 0) + 1
+        created = [t.created_at.split("T")[0] for t in tasks]
+        self._segments.append({
+            "number": number,
+            "file": name,
+            "count": len(tasks),
+            "first_created": min(created),
+            "last_created": max(created),
+            "categories": categories,
+        })
+        self._save_index()
+        self._append_ids(tasks)
+
+    # Lazy loading
+    def _read_segment(self, segment: Dict) -> List[Task]:
+        name = segment["file"]
+        if name not in self._loaded:
+            tasks = []
+            try:
+                with gzip.open(os.path.join(self.directory, name), "rt", encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            tasks.append(Task.from_dict(json.loads(line)))
+            except Exception:
+                tasks = []
+            self._loaded[name] = tasks
+        return self._loaded[name]
+
+    def load_all(self) -> List[Task]:
+        tasks: List[Task] = []
+        for segment in self._segments:
+            tasks.extend(self._read_segment(segment))
+        return tasks
+
+    def load_range(self, start: str, end: str) -> List[Task]:
+        """Archived tasks created between `start` and `end` (YYYY-MM-DD, inclusive)."""
+        tasks: List[Task] = []
+        for segment in self._segments:
+            if segment["last_created"] < start or segment["first_created"] > end:
+                continue
+            for t in self._read_segment(segment):
+                if start <= t.created_at.split("T")[0] <= end:
+                    tasks.append(t)
+        return tasks
+
+    # Archived ids
+    def _ids_path(self) -> str:
+        return os.path.join(self.directory, self.IDS_NAME)
+
+    def _append_ids(self, tasks) -> None:
+        # One "id<TAB>updated_at" line per archived task
+        entries = [(t.id, t.updated_at or "") for t in tasks]
+        if self._ids is not None:
+            self._ids.update(entries)
+        with open(self._ids_path(), "a", encoding="utf-8") as f:
+            f.writelines(f"{task_id}\t{updated_at}\n" for task_id, updated_at in entries)
+
+    def _load_ids(self) -> Dict[str, str]:
+        if self._ids is None:
+            path = self._ids_path()
+            if os.path.exists(path) or not self._segments:
+                self._ids = {}
+                try:
+                    with open(path, "r", encoding="utf-8") as f:
+                        for line in f:
+                            # Lists written before updated_at was kept hold the bare id
+                            task_id, _, updated_at = line.strip().partition("\t")
+                            if task_id:
+                                self._ids[task_id] = updated_at
+                except OSError:
+                    pass
+            else:
+                # Archives written before the id list existed: build it once from the segments
+                self._ids = {}
+                self._append_ids(self.load_all())
+        return self._ids
+
+    def is_archived(self, task_id: str) -> bool:
+        return task_id in self._load_ids()
+
+    def archived_at(self, task_id: str) -> Optional[str]:
+        """updated_at of the archived copy of a task ("" if unknown), or None if it is not archived."""
+        return self._load_ids().get(task_id)
+
+    # Precomputed stats
+    def count(self) -> int:
+        return sum(s["count"] for s in self._segments)
+
+    def category_counts(self) -> Dict[str, int]:
+        totals: Dict[str, int] = {}
+        for segment in self._segments:
+            for cat, n in segment.get("categories", {}).items():
+                totals[cat] = totals.get(cat, 0) + n
+        return totals
@@ -4,16 +4,25 @@ import json
 import os
 from typing import List, Optional
 
+from events import CategoryAdded, CategoryRemoved, CategoryRenamed, TaskUpdated
+from profiling import timed
+
 
 class CategoryManager:
     """
     Simple category manager with optional JSON persistence.
+    Changes are announced on `events` (an EventBus) when one is given.
     """
 
-    def __init__(self, filename: Optional[str] = "categories.json", defaults: Optional[List[str]] = None) -> None:
+    def __init__(self, filename: Optional[str] = "categories.json", defaults: Optional[List[str]] = None,
+                 events=None) -> None:
         self.filename = filename
+        self.events = events
         self._defaults = defaults or ["Personal", "Work", "School"]
         self._user_categories: List[str] = []
+        # While defer_saves is set (inside a transaction), save() only records that a write is due
+        self.defer_saves = False
+        self.save_pending = False
         if self.filename:
             self.load()
         else:
@@ -39,11 +48,28 @@ class CategoryManager:
     def save(self) -> None:
         if not self.filename:
             return
+        if self.defer_saves:
+            self.save_pending = True
+            return
+        if self.write(self._user_categories):
+            self.save_pending = False
+
+    def write(self, categories: List[str]) -> bool:
+        """Write a category list to the file; safe off the owning thread given a copy from get_state()."""
+        tmp = self.filename + ".tmp"
         try:
-            with open(self.filename, "w", encoding="utf-8") as f:
-                json.dump({"categories": self._user_categories}, f, ensure_ascii=False, indent=2)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"categories": categories}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.filename)
+            return True
         except Exception:
-            pass
+            return False
+
+    def get_state(self) -> List[str]:
+        return list(self._user_categories)
+
+    def restore_state(self, categories: List[str]) -> None:
+        self._user_categories = list(categories)
 
     # Accessors
     def get_all_categories(self) -> List[str]:
@@ -67,6 +93,7 @@ class CategoryManager:
         self._user_categories.append(name)
         self._user_categories.sort()
         self.save()
+        self._emit(CategoryAdded(name))
         return True
 
     def remove_category(self, name: str) -> bool:
@@ -76,11 +103,31 @@ class CategoryManager:
         try:
             self._user_categories.remove(name)
             self.save()
+            self._emit(CategoryRemoved(name))
             return True
         except ValueError:
             return False
 
-    def rename_category(self, old: str, new: str, tasks: Optional[List[object]] = None) -> bool:
+    def _recategorize(self, tasks, old: str, new: str) -> None:
+        """
+        Move tasks in category `old` to `new`. Given a TaskManager, the change
+        goes through it (copy-on-write, one event per task); a plain list of
+        tasks is changed in place.
+        """
+        if hasattr(tasks, "update_tasks"):
+            tasks.update_tasks([t.id for t in tasks.get_all_tasks() if getattr(t, "category", None) == old],
+                               category=new)
+            return
+        for t in tasks:
+            try:
+                if getattr(t, "category", None) == old:
+                    setattr(t, "category", new)
+                    self._emit(TaskUpdated(t, ("category",)))
+            except Exception:
+                continue
+
+    @timed("rename_category")
+    def rename_category(self, old: str, new: str, tasks=None) -> bool:
         old = self._clean(old)
         new = self._clean(new)
         if not old or not new or new.lower() == "all":
@@ -88,12 +135,7 @@ class CategoryManager:
         if new in self._user_categories and new != old:
             return False
         if tasks:
-            for t in tasks:
-                try:
-                    if getattr(t, "category", None) == old:
-                        setattr(t, "category", new)
-                except Exception:
-                    continue
+            self._recategorize(tasks, old, new)
         try:
             idx = self._user_categories.index(old)
             self._user_categories[idx] = new
@@ -102,20 +144,16 @@ class CategoryManager:
                 self._user_categories.append(new)
         self._user_categories.sort()
         self.save()
+        self._emit(CategoryRenamed(old, new))
         return True
 
-    def delete_category(self, name: str, replacement: str = "", tasks: Optional[List[object]] = None) -> bool:
+    def delete_category(self, name: str, replacement: str = "", tasks=None) -> bool:
         name = self._clean(name)
         replacement = self._clean(replacement)
         if not name or name.lower() == "all":
             return False
         if tasks:
-            for t in tasks:
-                try:
-                    if getattr(t, "category", None) == name:
-                        setattr(t, "category", replacement)
-                except Exception:
-                    continue
+            self._recategorize(tasks, name, replacement)
         try:
             self._user_categories.remove(name)
         except ValueError:
@@ -124,12 +162,19 @@ class CategoryManager:
             self._user_categories.append(replacement)
         self._user_categories.sort()
         self.save()
+        self._emit(CategoryRemoved(name, replacement))
         return True
 
     # Utilities
     def clear_categories(self) -> None:
-        self._user_categories = []
+        removed, self._user_categories = self._user_categories, []
         self.save()
+        for name in removed:
+            self._emit(CategoryRemoved(name))
+
+    def _emit(self, event) -> None:
+        if self.events is not None:
+            self.events.emit(event)
 
     @staticmethod
     def _clean(val: Optional[str]) -> str:
@@ -1,8 +1,13 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from contextlib import nullcontext
 from datetime import datetime
 
 
+def _transaction(store):
+    return store.transaction() if store is not None else nullcontext()
+
+
 class _BaseDialog:
     def __init__(self, parent: tk.Tk, title: str) -> None:
         self.parent = parent
@@ -69,11 +74,12 @@ class AddCategoryDialog(_BaseDialog):
 
 
 class DeleteCategoryDialog(_BaseDialog):
-    def __init__(self, parent: tk.Tk, category_manager, tasks, on_deleted) -> None:
+    def __init__(self, parent: tk.Tk, category_manager, tasks, on_deleted, store=None) -> None:
         super().__init__(parent, "Delete Category")
         self.category_manager = category_manager
         self.tasks = tasks
         self.on_deleted = on_deleted
+        self.store = store
 
         cats = self.category_manager.get_task_categories()
         if not cats:
@@ -123,22 +129,24 @@ class DeleteCategoryDialog(_BaseDialog):
         if not cat:
             messagebox.showwarning("Select Category", "Please select a category to delete.")
             return
-        if not replacement:
-            if "Personal" not in self.category_manager.get_task_categories():
-                self.category_manager.add_category("Personal")
-            replacement = "Personal"
-        self.category_manager.delete_category(cat, replacement, self.tasks)
-        if callable(self.on_deleted):
-            self.on_deleted(cat, replacement)
+        with _transaction(self.store):
+            if not replacement:
+                if "Personal" not in self.category_manager.get_task_categories():
+                    self.category_manager.add_category("Personal")
+                replacement = "Personal"
+            self.category_manager.delete_category(cat, replacement, self.tasks)
+            if callable(self.on_deleted):
+                self.on_deleted(cat, replacement)
         self.dlg.destroy()
 
 
 class RenameCategoryDialog(_BaseDialog):
-    def __init__(self, parent: tk.Tk, category_manager, tasks, on_renamed) -> None:
+    def __init__(self, parent: tk.Tk, category_manager, tasks, on_renamed, store=None) -> None:
         super().__init__(parent, "Rename Category")
         self.category_manager = category_manager
         self.tasks = tasks
         self.on_renamed = on_renamed
+        self.store = store
 
         cats = self.category_manager.get_task_categories()
         if not cats:
@@ -185,9 +193,11 @@ class RenameCategoryDialog(_BaseDialog):
         if new.lower() == "all" or new in self.category_manager.get_all_categories():
             messagebox.showwarning("Invalid Category", "This category name is not allowed or already exists.")
             return
-        self.category_manager.rename_category(old, new, self.tasks)
-        if callable(self.on_renamed):
-            self.on_renamed(old, new)
+        # Category file and task file are committed together
+        with _transaction(self.store):
+            self.category_manager.rename_category(old, new, self.tasks)
+            if callable(self.on_renamed):
+                self.on_renamed(old, new)
         self.dlg.destroy()
 
 
@@ -256,24 +266,256 @@ class EditTaskDialog(_BaseDialog):
         new_category = self.category_var.get()
         new_completed = self.completed_var.get()
 
-        changed = False
-        if self.task.title != new_title:
-            self.task.title = new_title
-            changed = True
-        if self.task.category != new_category:
-            self.task.category = new_category
-            changed = True
-        if new_completed and not self.task.completed:
-            self.task.completed = True
-            self.task.done_at = datetime.now().isoformat()
-            changed = True
-        elif not new_completed and self.task.completed:
-            self.task.completed = False
-            self.task.done_at = None
-            changed = True
-
-        if changed and callable(self.on_saved):
-            self.on_saved(self.task)
+        # The dialog only collects the changes; on_saved applies them through the manager
+        fields = {}
+        if new_title != self.task.title:
+            fields["title"] = new_title
+        if new_category != self.task.category:
+            fields["category"] = new_category
+        if new_completed != bool(self.task.completed):
+            fields["completed"] = new_completed
+            fields["done_at"] = datetime.now().isoformat() if new_completed else None
+
+        if fields and callable(self.on_saved):
+            self.on_saved(self.task, fields)
         self.dlg.destroy()
 
 
+class ProgressDialog(_BaseDialog):
+    """Modal progress bar for work running on another thread; Cancel sets `cancelled`."""
+
+    def __init__(self, parent: tk.Tk, title: str, message: str) -> None:
+        super().__init__(parent, title)
+        self.cancelled = False
+
+        frame = tk.Frame(self.dlg, bg="#f7f7f7", padx=16, pady=14)
+        frame.pack(fill="both", expand=True)
+        self.message_var = tk.StringVar(value=message)
+        tk.Label(frame, textvariable=self.message_var, bg="#f7f7f7", font=("Segoe UI", 10)).pack(anchor="w")
+        self.bar = ttk.Progressbar(frame, length=280, mode="indeterminate")
+        self.bar.pack(fill="x", pady=(8, 0))
+        self.bar.start(15)
+        tk.Button(frame, text="Cancel", command=self.cancel, bg="#ddd", fg="#333", font=("Segoe UI", 10), width=10).pack(anchor="e", pady=(10, 0))
+
+        self.dlg.protocol("WM_DELETE_WINDOW", self.cancel)
+        self.dlg.bind("<Escape>", lambda e: self.cancel())
+        self.center()
+
+    def set_progress(self, done: int, total: int, message: str = "") -> None:
+        if total <= 0:
+            return
+        if self.bar["mode"] != "determinate":
+            self.bar.stop()
+            self.bar.configure(mode="determinate", maximum=total)
+        self.bar["value"] = done
+        if message:
+            self.message_var.set(message)
+
+    def cancel(self) -> None:
+        self.cancelled = True
+        self.message_var.set("Cancelling…")
+
+    def close(self) -> None:
+        try:
+            self.dlg.destroy()
+        except Exception:
+            pass
+
+
+class DuplicatesDialog(_BaseDialog):
+    """Lists duplicate groups; merging keeps the oldest task of each group."""
+
+    def __init__(self, parent: tk.Tk, groups, on_merge) -> None:
+        super().__init__(parent, "Duplicate Tasks")
+        self.groups = list(groups)
+        self.on_merge = on_merge
+
+        frame = tk.Frame(self.dlg, bg="#f7f7f7", padx=12, pady=10)
+        frame.pack(fill="both", expand=True)
+
+        self.header_var = tk.StringVar()
+        tk.Label(frame, textvariable=self.header_var, bg="#f7f7f7", font=("Segoe UI", 10, "bold")).pack(anchor="w")
+
+        list_frame = tk.Frame(frame, bg="#f7f7f7")
+        list_frame.pack(fill="both", expand=True, pady=(6, 0))
+        self.listbox = tk.Listbox(list_frame, width=70, height=14, selectmode=tk.EXTENDED, font=("Segoe UI", 10))
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+
+        btns = tk.Frame(frame, bg="#f7f7f7")
+        btns.pack(fill="x", pady=(10, 0))
+        tk.Button(btns, text="Close", command=self.dlg.destroy, bg="#ddd", fg="#333", font=("Segoe UI", 10), width=12).pack(side="right", padx=(6, 0))
+        tk.Button(btns, text="Merge All", command=self._merge_all, bg="#8B0000", fg="white", font=("Segoe UI", 10), width=12).pack(side="right", padx=(6, 0))
+        tk.Button(btns, text="Merge Selected", command=self._merge_selected, bg="#4CAF50", fg="white", font=("Segoe UI", 10), width=12).pack(side="right")
+
+        self._fill()
+        self.dlg.bind("<Escape>", lambda e: self.dlg.destroy())
+        self.center()
+
+    @staticmethod
+    def _describe(group) -> str:
+        keep, *others = group
+        titles = ", ".join(t.title for t in others[:3]) + (" …" if len(others) > 3 else "")
+        return f"{keep.title} ({keep.category}) ← {titles}"
+
+    def _fill(self) -> None:
+        self.header_var.set(f"{len(self.groups)} group(s), {sum(len(g) for g in self.groups)} task(s)")
+        self.listbox.delete(0, tk.END)
+        if self.groups:
+            self.listbox.insert(tk.END, *[self._describe(g) for g in self.groups])
+
+    def _merge(self, indices) -> None:
+        if not indices:
+            return
+        selected = [self.groups[i] for i in indices]
+        if callable(self.on_merge):
+            self.on_merge(selected)
+        chosen = set(indices)
+        self.groups = [g for i, g in enumerate(self.groups) if i not in chosen]
+        self._fill()
+
+    def _merge_selected(self) -> None:
+        self._merge(self.listbox.curselection())
+
+    def _merge_all(self) -> None:
+        if self.groups and messagebox.askyesno("Merge All", f"Merge all {len(self.groups)} duplicate groups?", parent=self.dlg):
+            self._merge(range(len(self.groups)))
+
+
+class HistoryDialog(_BaseDialog):
+    """Recent versions on the left; the tasks as they were at the selected version on the right."""
+
+    def __init__(self, parent: tk.Tk, history) -> None:
+        super().__init__(parent, "History")
+        self.history = history
+        self.versions = list(reversed(history.versions()))
+
+        frame = tk.Frame(self.dlg, bg="#f7f7f7", padx=12, pady=10)
+        frame.pack(fill="both", expand=True)
+
+        self.versions_list = tk.Listbox(frame, width=36, height=16, exportselection=False, font=("Segoe UI", 10))
+        self.versions_list.grid(row=0, column=0, sticky="ns")
+        self.tasks_list = tk.Listbox(frame, width=60, height=16, font=("Segoe UI", 10))
+        self.tasks_list.grid(row=0, column=1, sticky="nsew", padx=(8, 0))
+        scrollbar = tk.Scrollbar(frame, orient="vertical", command=self.tasks_list.yview)
+        scrollbar.grid(row=0, column=2, sticky="ns")
+        self.tasks_list.configure(yscrollcommand=scrollbar.set)
+
+        self.status_var = tk.StringVar()
+        tk.Label(frame, textvariable=self.status_var, bg="#f7f7f7", font=("Segoe UI", 9)).grid(row=1, column=0, columnspan=2, sticky="w", pady=(6, 0))
+        tk.Button(frame, text="Close", command=self.dlg.destroy, bg="#ddd", fg="#333", font=("Segoe UI", 10), width=12).grid(row=1, column=1, columnspan=2, sticky="e", pady=(6, 0))
+
+        for i, version in enumerate(self.versions):
+            suffix = " (current)" if i == 0 else ""
+            self.versions_list.insert(tk.END, f"{version.created[11:]}  {version.label}{suffix}")
+        self.versions_list.bind("<<ListboxSelect>>", self._show)
+        if self.versions:
+            self.versions_list.selection_set(0)
+            self._show()
+        self.dlg.bind("<Escape>", lambda e: self.dlg.destroy())
+        self.center()
+
+    def _show(self, event=None) -> None:
+        picked = self.versions_list.curselection()
+        if not picked:
+            return
+        version = self.versions[picked[0]]
+        tasks = self.history.tasks_at(version.number)
+        self.tasks_list.delete(0, tk.END)
+        rows = [f"{'[x]' if t.completed else '[ ]'} {t.title} ({t.category})" + (f" due {t.due_date}" if t.due_date else "")
+                for t in tasks]
+        if rows:
+            self.tasks_list.insert(tk.END, *rows)
+        self.status_var.set(f"Version {version.number}: {len(tasks)} task(s)")
+
+
+class NotificationPanel:
+    """
+    Non-modal summary of due tasks. Stays open while the main window is
+    used; its list is refreshed in place on each reminder check.
+    """
+
+    def __init__(self, parent: tk.Tk, center, on_close=None) -> None:
+        self.parent = parent
+        self.center = center
+        self.on_close = on_close
+        self.keys = []
+
+        self.dlg = tk.Toplevel(parent)
+        self.dlg.title("Reminders")
+        self.dlg.transient(parent)
+        self.dlg.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = tk.Frame(self.dlg, bg="#f7f7f7", padx=12, pady=10)
+        frame.pack(fill="both", expand=True)
+
+        self.header_var = tk.StringVar()
+        tk.Label(frame, textvariable=self.header_var, bg="#f7f7f7", font=("Segoe UI", 10, "bold")).pack(anchor="w")
+
+        list_frame = tk.Frame(frame, bg="#f7f7f7")
+        list_frame.pack(fill="both", expand=True, pady=(6, 0))
+        self.listbox = tk.Listbox(list_frame, width=60, height=12, selectmode=tk.EXTENDED, font=("Segoe UI", 10))
+        self.listbox.pack(side="left", fill="both", expand=True)
+        scrollbar = tk.Scrollbar(list_frame, orient="vertical", command=self.listbox.yview)
+        scrollbar.pack(side="right", fill="y")
+        self.listbox.configure(yscrollcommand=scrollbar.set)
+
+        btns = tk.Frame(frame, bg="#f7f7f7")
+        btns.pack(fill="x", pady=(10, 0))
+        tk.Button(btns, text="Close", command=self.close, bg="#ddd", fg="#333", font=("Segoe UI", 10), width=10).pack(side="right", padx=(6, 0))
+        tk.Button(btns, text="Dismiss All", command=self._dismiss_all, bg="#8B0000", fg="white", font=("Segoe UI", 10), width=10).pack(side="right", padx=(6, 0))
+        tk.Button(btns, text="Dismiss", command=self._dismiss, bg="#f44336", fg="white", font=("Segoe UI", 10), width=10).pack(side="right", padx=(6, 0))
+        tk.Button(btns, text="Snooze 1h", command=self._snooze, bg="#2196F3", fg="white", font=("Segoe UI", 10), width=10).pack(side="right")
+
+        self.dlg.bind("<Escape>", lambda e: self.close())
+
+    def show(self, items) -> None:
+        """Replace the list with `items` ((key, task) pairs) and bring the panel up."""
+        self.update(items)
+        try:
+            self.dlg.deiconify()
+            self.dlg.lift()
+        except Exception:
+            pass
+
+    def update(self, items) -> None:
+        self.keys = [k for k, _ in items]
+        self.header_var.set(f"{len(items)} task(s) due")
+        self.listbox.delete(0, tk.END)
+        # One Tcl call for the whole list keeps thousands of rows cheap
+        if items:
+            self.listbox.insert(tk.END, *[self.center.describe(item) for _, item in items])
+
+    def _remove(self, indices) -> None:
+        for i in sorted(indices, reverse=True):
+            self.listbox.delete(i)
+            del self.keys[i]
+        self.header_var.set(f"{len(self.keys)} task(s) due")
+
+    def _snooze(self) -> None:
+        indices = self.listbox.curselection()
+        if indices:
+            self.center.snooze([self.keys[i] for i in indices], minutes=60)
+            self._remove(indices)
+
+    def _dismiss(self) -> None:
+        indices = self.listbox.curselection()
+        if indices:
+            self.center.dismiss([self.keys[i] for i in indices])
+            self._remove(indices)
+
+    def _dismiss_all(self) -> None:
+        if self.keys:
+            self.center.dismiss(self.keys)
+            self.update([])
+
+    def close(self) -> None:
+        try:
+            self.dlg.destroy()
+        except Exception:
+            pass
+        if callable(self.on_close):
+            self.on_close()
+
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import re
+import threading
+import time
+from itertools import combinations, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+from events import TaskAdded, TaskRemoved, TasksReplaced, TaskUpdated
+
+_WORD = re.compile(r"\w+")
+# Bottom-k MinHash: a title is sketched by the SKETCH_SIZE smallest hashes
+# of its character shingles, and every pair of sketch values is one LSH
+# bucket key. Titles with a Jaccard similarity of about 0.6 or more share at
+# least two sketch values, and so a bucket, almost always; unrelated titles
+# rarely do, so candidates stay a small multiple of the number of titles.
+# Keys come from Python's salted str hash, so the index lives in memory only.
+SKETCH_SIZE = 4
+SHINGLE_SIZE = 3
+# groups() reports progress and checks for cancellation every this many titles
+PROGRESS_EVERY = 1000
+# groups() compares a title with at most this many titles from each of its
+# buckets; a bucket that large holds a common pair of shingles, not duplicates
+BUCKET_CAP = 64
+
+
+def normalize_title(title: str) -> str:
+    """Case-folded words joined by single spaces: "Buy  food! " -> "buy food"."""
+    return " ".join(_WORD.findall(str(title).casefold()))
+
+
+def shingles(norm: str, k: int = SHINGLE_SIZE) -> Set[str]:
+    """Character k-grams of a normalized title, padded so short titles still have a few."""
+    padded = f" {norm} "
+    if len(padded) <= k:
+        return {padded}
+    return {padded[i:i + k] for i in range(len(padded) - k + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    common = len(a & b)
+    return common / (len(a) + len(b) - common)
+
+
+def shingle_hashes(norm: str) -> Set[int]:
+    """Hashes of the title's character shingles (see shingles()); Jaccard works the same on these."""
+    padded = f" {norm} "
+    return {hash(padded[i:i + SHINGLE_SIZE]) for i in range(max(1, len(padded) - SHINGLE_SIZE + 1))}
+
+
+def band_keys(norm: str, hashes: Optional[Set[int]] = None) -> List[int]:
+    """
+    LSH bucket keys of a normalized title: one per pair of values in its
+    sketch (the SKETCH_SIZE smallest shingle hashes).
+    """
+    low = sorted(shingle_hashes(norm) if hashes is None else hashes)[:SKETCH_SIZE]
+    if len(low) == 1:
+        return [hash((low[0],))]
+    return [hash(pair) for pair in combinations(low, 2)]
+
+
+class DuplicateIndex:
+    """
+    Finds duplicate open tasks without comparing every pair.
+
+    Exact duplicates share a normalized title (a dict lookup). Near
+    duplicates are found through MinHash/LSH buckets over distinct
+    normalized titles, then confirmed with the real Jaccard similarity of
+    their shingles. Completed tasks are not indexed.
+
+    With a manager, the index follows its change events. With `background`
+    the index is built on a helper thread from the manager's snapshot (at
+    start and after TasksReplaced); until then find() reports nothing and
+    groups() waits. Events that arrive meanwhile, or while groups() scans
+    on another thread, are queued and applied afterwards, so a scan never
+    sees the index change under it.
+    """
+
+    def __init__(self, manager=None, threshold: float = 0.6, background: bool = False) -> None:
+        self.threshold = threshold
+        self.manager = manager
+        self.background = background
+        self._norm_of: Dict[str, str] = {}
+        self._tasks: Dict[str, List] = {}
+        # LSH buckets; most hold one title, which is stored bare to save a set per key
+        self._buckets: Dict[int, Union[str, Set[str]]] = {}
+        # The index is only written with the lock held, and never while a scan is running
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._scanning = False
+        self._backlog: List = []
+        self._build_number = 0
+        if manager is not None:
+            self._start_build(manager.get_all_tasks())
+            manager.events.subscribe(self._on_events, (TaskAdded, TaskRemoved, TaskUpdated, TasksReplaced))
+        else:
+            self._ready.set()
+
+    def __len__(self) -> int:
+        return len(self._norm_of)
+
+    # Maintenance
+    def rebuild(self, tasks: Iterable) -> None:
+        self._norm_of.clear()
+        self._tasks.clear()
+        self._buckets.clear()
+        # Group by normalized title first so each distinct title is sketched once
+        for task in tasks:
+            if getattr(task, "completed", False):
+                continue
+            norm = normalize_title(task.title)
+            self._norm_of[task.id] = norm
+            self._tasks.setdefault(norm, []).append(task)
+        for norm in self._tasks:
+            self._index(norm)
+
+    def _start_build(self, tasks) -> None:
+        if not self.background:
+            self.rebuild(tasks)
+            self._ready.set()
+            return
+        self._ready.clear()
+        self._backlog = []
+        self._build_number += 1
+        threading.Thread(target=self._build, args=(tuple(tasks), self._build_number),
+                         name="duplicate-index", daemon=True).start()
+
+    def _build(self, tasks, number: int) -> None:
+        fresh = DuplicateIndex(threshold=self.threshold)
+        fresh.rebuild(tasks)
+        with self._lock:
+            if number != self._build_number:
+                return  # a newer build replaced this one
+            self._norm_of, self._tasks, self._buckets = fresh._norm_of, fresh._tasks, fresh._buckets
+            self._ready.set()
+            self._drain()
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wait for a background build to finish; returns whether it has."""
+        return self._ready.wait(timeout)
+
+    def _index(self, norm: str) -> None:
+        buckets = self._buckets
+        for key in band_keys(norm):
+            bucket = buckets.get(key)
+            if bucket is None:
+                buckets[key] = norm
+            elif isinstance(bucket, str):
+                buckets[key] = {bucket, norm}
+            else:
+                bucket.add(norm)
+
+    def _unindex(self, norm: str) -> None:
+        buckets = self._buckets
+        for key in band_keys(norm):
+            bucket = buckets.get(key)
+            if bucket is None:
+                continue
+            if isinstance(bucket, str):
+                if bucket == norm:
+                    del buckets[key]
+                continue
+            bucket.discard(norm)
+            if len(bucket) == 1:
+                buckets[key] = next(iter(bucket))
+
+    def _bucket(self, key: int) -> Iterable[str]:
+        bucket = self._buckets.get(key, ())
+        return (bucket,) if isinstance(bucket, str) else bucket
+
+    def add(self, task) -> None:
+        if getattr(task, "completed", False):
+            return
+        if task.id in self._norm_of:
+            self.remove(task)
+        norm = normalize_title(task.title)
+        self._norm_of[task.id] = norm
+        group = self._tasks.get(norm)
+        if group is None:
+            group = self._tasks[norm] = []
+            self._index(norm)
+        group.append(task)
+
+    def remove(self, task) -> None:
+        norm = self._norm_of.pop(task.id, None)
+        if norm is None:
+            return
+        group = [t for t in self._tasks[norm] if t.id != task.id]
+        if group:
+            self._tasks[norm] = group
+            return
+        del self._tasks[norm]
+        self._unindex(norm)
+
+    def _replace(self, task) -> None:
+        # Edits publish a new task object; keep listing the current one
+        norm = self._norm_of.get(task.id)
+        if norm is None:
+            return
+        group = self._tasks[norm]
+        for i, t in enumerate(group):
+            if t.id == task.id:
+                group[i] = task
+
+    def _on_events(self, events) -> None:
+        with self._lock:
+            if self._scanning or not self._ready.is_set():
+                self._backlog.extend(events)
+                return
+            self._drain()
+            self._apply(events)
+
+    def _drain(self) -> None:
+        backlog, self._backlog = self._backlog, []
+        if backlog:
+            self._apply(backlog)
+
+    def _apply(self, events) -> None:
+        if any(isinstance(e, TasksReplaced) for e in events):
+            self._start_build(self.manager.get_all_tasks())
+            return
+        for e in events:
+            if isinstance(e, TaskRemoved):
+                self.remove(e.task)
+            elif isinstance(e, TaskAdded) or e.fields & {"title", "completed"}:
+                self.remove(e.task)
+                self.add(e.task)
+            else:
+                self._replace(e.task)
+
+    # Queries
+    def _candidates(self, norm: str, cap: Optional[int] = None) -> Set[str]:
+        found: Set[str] = set()
+        for key in band_keys(norm):
+            found.update(islice(self._bucket(key), cap))
+        found.discard(norm)
+        return found
+
+    def _matches(self, norm: str, own: Set[int], candidates: Iterable[str],
+                 hashes: Optional[Dict[str, Set[int]]] = None) -> Iterator[Tuple[float, str]]:
+        """(similarity, title) for the candidates at or above the threshold; `hashes` caches shingle hashes."""
+        threshold = self.threshold
+        size = len(own)
+        for other in candidates:
+            if hashes is None:
+                theirs = shingle_hashes(other)
+            else:
+                theirs = hashes.get(other)
+                if theirs is None:
+                    theirs = hashes[other] = shingle_hashes(other)
+            # Jaccard can not exceed the size ratio; most false candidates stop here
+            if min(size, len(theirs)) < threshold * max(size, len(theirs)):
+                continue
+            score = jaccard(own, theirs)
+            if score >= threshold:
+                yield score, other
+
+    def find(self, title: str, exclude_id: Optional[str] = None) -> Tuple[List, List[Tuple[float, object]]]:
+        """
+        Open tasks that duplicate `title`: (exact matches, [(similarity, task)]
+        near matches, most similar first). Empty while a background build runs.
+        """
+        with self._lock:
+            if not self._ready.is_set():
+                return [], []
+            if not self._scanning:
+                self._drain()
+            return self._find(title, exclude_id)
+
+    def _find(self, title: str, exclude_id: Optional[str]) -> Tuple[List, List[Tuple[float, object]]]:
+        norm = normalize_title(title)
+        exact = [t for t in self._tasks.get(norm, ()) if t.id != exclude_id]
+        near = []
+        for score, other in self._matches(norm, shingle_hashes(norm), self._candidates(norm)):
+            near.extend((score, t) for t in self._tasks[other] if t.id != exclude_id)
+        near.sort(key=lambda pair: -pair[0])
+        return exact, near
+
+    def groups(self, progress: Optional[Callable[[int, int], None]] = None,
+               cancelled: Optional[Callable[[], bool]] = None) -> Optional[List[List]]:
+        """
+        Duplicate groups (two or more tasks each), oldest task first.
+        Each title is checked against the titles sharing one of its buckets,
+        at most BUCKET_CAP from each, so the pass stays linear in the number
+        of distinct titles.
+
+        Safe to call from a worker thread: every PROGRESS_EVERY titles it calls
+        progress(done, total), and returns None as soon as cancelled() is true.
+        """
+        while True:
+            with self._lock:
+                if self._ready.is_set() and not self._scanning:
+                    self._drain()
+                    # Draining a TasksReplaced starts a new build
+                    if self._ready.is_set():
+                        self._scanning = True
+                        break
+            if cancelled is not None and cancelled():
+                return None
+            time.sleep(0.05)
+        try:
+            return self._groups(progress, cancelled)
+        finally:
+            with self._lock:
+                self._scanning = False
+
+    def _groups(self, progress, cancelled) -> Optional[List[List]]:
+        total = len(self._tasks)
+        parent = {norm: norm for norm in self._tasks}
+
+        def root(n: str) -> str:
+            while parent[n] != n:
+                parent[n] = parent[parent[n]]
+                n = parent[n]
+            return n
+
+        hashes: Dict[str, Set[int]] = {}
+        for done, norm in enumerate(self._tasks, 1):
+            if done % PROGRESS_EVERY == 0:
+                if cancelled is not None and cancelled():
+                    return None
+                if progress is not None:
+                    progress(done, total)
+            own = hashes.get(norm)
+            if own is None:
+                own = hashes[norm] = shingle_hashes(norm)
+            # Titles already in this title's group need no check
+            candidates = [c for c in self._candidates(norm, BUCKET_CAP) if root(c) != root(norm)]
+            for _, other in self._matches(norm, own, candidates, hashes):
+                if root(other) != root(norm):
+                    parent[root(norm)] = root(other)
+
+        merged: Dict[str, List] = {}
+        for norm, tasks in self._tasks.items():
+            merged.setdefault(root(norm), []).extend(tasks)
+        return [sorted(g, key=lambda t: t.created_at) for g in merged.values() if len(g) > 1]
+
+
+def merge_duplicates(manager, groups: List[List]) -> List:
+    """
+    Merge each duplicate group into its oldest task: it keeps its own fields
+    and takes the earliest due date of the group if it has none. The other
+    tasks are removed in one step. Returns the kept tasks.
+    """
+    kept, removed = [], []
+    for group in groups:
+        if len(group) < 2:
+            continue
+        keep, *others = sorted(group, key=lambda t: t.created_at)
+        if not keep.due_date:
+            due_dates = sorted(t.due_date for t in others if t.due_date)
+            if due_dates:
+                keep = (manager.update_tasks([keep.id], due_date=due_dates[0]) or [keep])[0]
+        kept.append(keep)
+        removed.extend(t.id for t in others)
+    manager.delete_tasks(removed)
+    return kept
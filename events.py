@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import threading
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+ALL_FIELDS = frozenset(("title", "category", "completed", "created_at", "done_at", "due_date",
+                        "recurrence", "completed_occurrences"))
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeEvent:
+    """Base class; `seq` is assigned by the bus and grows with every emit."""
+
+    kind = "change"
+
+    def __init__(self) -> None:
+        self.seq = 0
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{k}={v!r}" for k, v in self.__dict__.items() if k != "seq")
+        return f"{type(self).__name__}({fields})"
+
+
+class TaskAdded(ChangeEvent):
+    kind = "task_added"
+
+    def __init__(self, task) -> None:
+        super().__init__()
+        self.task = task
+
+
+class TaskRemoved(ChangeEvent):
+    kind = "task_removed"
+
+    def __init__(self, task) -> None:
+        super().__init__()
+        self.task = task
+
+
+class TaskUpdated(ChangeEvent):
+    kind = "task_updated"
+
+    def __init__(self, task, fields: Iterable[str]) -> None:
+        super().__init__()
+        self.task = task
+        self.fields: FrozenSet[str] = frozenset(fields)
+
+
+class TasksReplaced(ChangeEvent):
+    """The whole task list was swapped (load, clear, rollback); rebuild from scratch."""
+
+    kind = "tasks_replaced"
+
+
+class CategoryAdded(ChangeEvent):
+    kind = "category_added"
+
+    def __init__(self, name: str) -> None:
+        super().__init__()
+        self.name = name
+
+
+class CategoryRemoved(ChangeEvent):
+    kind = "category_removed"
+
+    def __init__(self, name: str, replacement: Optional[str] = None) -> None:
+        super().__init__()
+        self.name = name
+        self.replacement = replacement
+
+
+class CategoryRenamed(ChangeEvent):
+    kind = "category_renamed"
+
+    def __init__(self, old: str, new: str) -> None:
+        super().__init__()
+        self.old = old
+        self.new = new
+
+
+TASK_EVENTS = (TaskAdded, TaskRemoved, TaskUpdated, TasksReplaced)
+CATEGORY_EVENTS = (CategoryAdded, CategoryRemoved, CategoryRenamed)
+
+
+def coalesce(events: List[ChangeEvent]) -> List[ChangeEvent]:
+    """
+    Merge a burst of events into the smallest equivalent batch:
+    add+update -> add, add+remove -> nothing, update+update -> one update
+    with the union of fields, update+remove -> remove, remove+add -> update.
+    A TasksReplaced drops every earlier task event.
+    """
+    out: List[Optional[ChangeEvent]] = []
+    by_task: Dict[str, int] = {}
+    for ev in events:
+        if isinstance(ev, TasksReplaced):
+            out = [e for e in out if e is not None and not isinstance(e, TASK_EVENTS)]
+            by_task = {}
+            out.append(ev)
+            continue
+        if not isinstance(ev, (TaskAdded, TaskRemoved, TaskUpdated)):
+            out.append(ev)
+            continue
+        key = ev.task.id
+        idx = by_task.get(key)
+        prev = out[idx] if idx is not None else None
+        if prev is None:
+            by_task[key] = len(out)
+            out.append(ev)
+            continue
+        merged: Optional[ChangeEvent]
+        if isinstance(prev, TaskAdded):
+            merged = None if isinstance(ev, TaskRemoved) else TaskAdded(ev.task)
+        elif isinstance(prev, TaskUpdated):
+            if isinstance(ev, TaskUpdated):
+                merged = TaskUpdated(ev.task, prev.fields | ev.fields)
+            elif isinstance(ev, TaskRemoved):
+                merged = ev
+            else:
+                merged = TaskUpdated(ev.task, ALL_FIELDS)
+        else:
+            merged = TaskUpdated(ev.task, ALL_FIELDS) if isinstance(ev, TaskAdded) else ev
+        if merged is not None:
+            merged.seq = ev.seq
+            out[idx] = merged
+        else:
+            out[idx] = None
+            del by_task[key]
+    return [e for e in out if e is not None]
+
+
+class EventBus:
+    """
+    Delivers change events to subscribers in coalesced batches.
+
+    Without a scheduler every emit is delivered at once. With one (the app
+    passes Tk's after_idle), emits are queued and flushed once per UI tick.
+    hold()/release() queue events across a transaction; release(discard=True)
+    drops them on rollback. A handler that raises is logged and skipped; the
+    rest of the subscribers still get the batch.
+    """
+
+    def __init__(self, scheduler: Optional[Callable[[Callable[[], None]], None]] = None) -> None:
+        self.scheduler = scheduler
+        self._subscribers: List[Tuple[Callable[[List[ChangeEvent]], None], Optional[Tuple[type, ...]]]] = []
+        self._pending: List[ChangeEvent] = []
+        self._lock = threading.RLock()
+        self._seq = itertools.count(1)
+        self.last_seq = 0
+        self._held = 0
+        self._scheduled = False
+
+    def subscribe(self, handler: Callable[[List[ChangeEvent]], None],
+                  kinds: Optional[Iterable[type]] = None) -> Callable[[], None]:
+        """Register `handler(events)`; `kinds` limits it to those event classes. Returns an unsubscribe function."""
+        entry = (handler, tuple(kinds) if kinds else None)
+        self._subscribers.append(entry)
+
+        def unsubscribe() -> None:
+            if entry in self._subscribers:
+                self._subscribers.remove(entry)
+        return unsubscribe
+
+    def emit(self, event: ChangeEvent) -> None:
+        with self._lock:
+            event.seq = self.last_seq = next(self._seq)
+            self._pending.append(event)
+            if self._held:
+                return
+        self._schedule()
+
+    def hold(self) -> None:
+        with self._lock:
+            self._held += 1
+
+    def release(self, discard: bool = False) -> None:
+        with self._lock:
+            self._held = max(0, self._held - 1)
+            if discard:
+                self._pending = []
+            if self._held or not self._pending:
+                return
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self.scheduler is None:
+            self.flush()
+            return
+        with self._lock:
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self.scheduler(self.flush)
+
+    def flush(self) -> None:
+        with self._lock:
+            self._scheduled = False
+            if self._held or not self._pending:
+                return
+            batch, self._pending = coalesce(self._pending), []
+        for handler, kinds in list(self._subscribers):
+            events = batch if kinds is None else [e for e in batch if isinstance(e, kinds)]
+            if not events:
+                continue
+            # One failing subscriber must not cost the others their batch
+            try:
+                handler(events)
+            except Exception:
+                logger.exception("change event handler %r failed", handler)
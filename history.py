@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from typing import Deque, List, NamedTuple, Optional
+
+from events import ALL_FIELDS, CATEGORY_EVENTS, TaskAdded, TaskRemoved, TasksReplaced, TaskUpdated
+from persistent import PersistentMap
+from task import Task
+
+
+class Version(NamedTuple):
+    number: int
+    label: str
+    created: str
+    # The manager's snapshot (slot -> task) as published at this version
+    entries: PersistentMap
+    categories: tuple
+
+
+def _describe(events) -> str:
+    if any(isinstance(e, TasksReplaced) for e in events):
+        return "Reloaded tasks"
+    tasks = [e for e in events if isinstance(e, (TaskAdded, TaskRemoved, TaskUpdated))]
+    kinds = {type(e) for e in tasks}
+    if not tasks:
+        return "Changed categories"
+    verb = {TaskAdded: "Added", TaskRemoved: "Deleted", TaskUpdated: "Edited"}[kinds.pop()] if len(kinds) == 1 else "Changed"
+    return f"{verb} '{tasks[0].task.title}'" if len(tasks) == 1 else f"{verb} {len(tasks)} tasks"
+
+
+class TaskHistory:
+    """
+    Undo/redo and point-in-time views for a TaskManager.
+
+    Every delivered batch of change events becomes one version, holding
+    the manager's snapshot at that point: a PersistentMap of slot -> task
+    that shares all unchanged subtrees with the versions around it, so
+    recording a version costs nothing beyond a reference. The manager never
+    changes a published task, so holding it is enough.
+
+    At most `depth` undo steps are kept; older versions are dropped and their
+    unshared nodes freed. Undo and redo diff the current snapshot against
+    the target version, skipping shared subtrees, and put back only the
+    slots that differ (TaskManager.restore), as copies with a fresh
+    updated_at so sync treats the undo as the newest change. Their cost
+    follows the size of the change, not the number of tasks.
+    """
+
+    def __init__(self, manager, category_manager=None, depth: int = 50) -> None:
+        self.manager = manager
+        self.category_manager = category_manager
+        self.events = manager.events
+        self.depth = max(1, depth)
+        self._undo: Deque[Version] = deque(maxlen=self.depth + 1)
+        self._redo: List[Version] = []
+        # Events up to this seq were emitted by undo/redo themselves
+        self._skip_seq = 0
+        self._undo.append(self._version("Opened", self._categories()))
+        self.events.subscribe(self._on_events)
+
+    # Recording
+    def _categories(self) -> tuple:
+        return tuple(self.category_manager.get_state()) if self.category_manager is not None else ()
+
+    def _version(self, label: str, categories: tuple) -> Version:
+        return Version(self.manager.version, label, datetime.now().isoformat(timespec="seconds"),
+                       self.manager.entries, categories)
+
+    def _on_events(self, events) -> None:
+        events = [e for e in events if e.seq > self._skip_seq]
+        if not events:
+            return
+        current = self._undo[-1]
+        categories = self._categories() if any(isinstance(e, CATEGORY_EVENTS) for e in events) else current.categories
+        self._undo.append(self._version(_describe(events), categories))
+        self._redo.clear()
+
+    # Undo / redo
+    def can_undo(self) -> bool:
+        return len(self._undo) > 1
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def undo(self) -> Optional[Version]:
+        """Step back one version; returns the version that was undone."""
+        # Changes still waiting for delivery are recorded first, so they are what gets undone
+        self.events.flush()
+        if not self.can_undo():
+            return None
+        undone = self._undo.pop()
+        self._redo.append(undone)
+        self._undo[-1] = self._undo[-1]._replace(entries=self._apply(undone, self._undo[-1]))
+        return undone
+
+    def redo(self) -> Optional[Version]:
+        """Re-apply the last undone version; returns it."""
+        self.events.flush()
+        if not self._redo:
+            return None
+        target = self._redo.pop()
+        current = self._undo[-1]
+        self._undo.append(target._replace(entries=self._apply(current, target)))
+        return target
+
+    def _apply(self, current: Version, target: Version) -> PersistentMap:
+        """Put the target version's tasks back; returns the manager's snapshot afterwards."""
+        slots = []
+        changes = []
+        now = datetime.now().isoformat()
+        self.events.hold()
+        try:
+            with self.manager.lock:
+                for slot, have, want in self.manager.entries.diff(target.entries):
+                    if want is None:
+                        slots.append((slot, None))
+                        changes.append(TaskRemoved(have))
+                        continue
+                    fields = list(ALL_FIELDS)
+                    if have is not None and have.id == want.id:
+                        old, new = have.get_state(), want.get_state()
+                        fields = [name for name in ALL_FIELDS if old.get(name) != new.get(name)]
+                        if not fields:
+                            continue
+                    elif have is not None:
+                        # A replaced list reused the slot for another task
+                        changes.append(TaskRemoved(have))
+                        have = None
+                    task = want.copy()
+                    task.updated_at = now
+                    slots.append((slot, task))
+                    changes.append(TaskAdded(task) if have is None else TaskUpdated(task, fields))
+                self.manager.restore(slots, changes)
+                entries = self.manager.entries
+            if self.category_manager is not None and target.categories != current.categories:
+                self.category_manager.restore_state(list(target.categories))
+                self.category_manager.save()
+            self._skip_seq = self.events.last_seq
+        finally:
+            self.events.release()
+        return entries
+
+    # Point-in-time views
+    def versions(self) -> List[Version]:
+        """Versions that can be viewed, oldest first; the last one is the current state."""
+        return list(self._undo)
+
+    def at(self, number: int) -> Optional[Version]:
+        """The newest kept version recorded at or before TaskManager version `number`."""
+        found = None
+        for version in self._undo:
+            if version.number <= number:
+                found = version
+        return found
+
+    def tasks_at(self, number: int) -> List[Task]:
+        """Detached copies of the tasks as of a version (empty if it is older than the history)."""
+        version = self.at(number)
+        if version is None:
+            return []
+        return [task.copy() for task in version.entries.values()]
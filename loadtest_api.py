@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+from api_server import TaskApiServer
+from category_manager import CategoryManager
+from profiling import summarize
+from task import Task
+from task_manager import TaskManager
+from task_storage import TaskStorage
+
+
+class HttpClient:
+    """Minimal keep-alive HTTP/1.1 client for the load test."""
+
+    def __init__(self, host: str, port: int) -> None:
+        self.host = host
+        self.port = port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self) -> None:
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method: str, path: str, body: Optional[Dict] = None,
+                      headers: Optional[Dict[str, str]] = None) -> Tuple[int, Dict[str, str], bytes]:
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(payload)}"]
+        for name, value in (headers or {}).items():
+            lines.append(f"{name}: {value}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        status = int(status_line.split(" ")[1])
+        resp_headers = {}
+        for line in header_lines:
+            if line:
+                name, _, value = line.partition(":")
+                resp_headers[name.strip().lower()] = value.strip()
+        length = int(resp_headers.get("content-length", "0"))
+        data = await self.reader.readexactly(length) if length else b""
+        return status, resp_headers, data
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except Exception:
+                pass
+
+
+async def run_client(host: str, port: int, requests: int, write_ratio: float,
+                     latencies: List[float], statuses: Dict[int, int], rng: random.Random) -> None:
+    client = HttpClient(host, port)
+    await client.connect()
+    etags: Dict[str, str] = {}
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            if rng.random() < write_ratio:
+                ops = [{"op": "add", "title": f"load {rng.random():.6f}", "category": "Work"}]
+                status, _, _ = await client.request("POST", "/batch", {"ops": ops})
+            else:
+                path = f"/tasks?offset={rng.randrange(0, 10) * 50}&limit=50"
+                headers = {"If-None-Match": etags[path]} if path in etags else None
+                status, resp_headers, _ = await client.request("GET", path, headers=headers)
+                if "etag" in resp_headers:
+                    etags[path] = resp_headers["etag"]
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        await client.close()
+
+
+async def run_load(host: str, port: int, clients: int, requests: int, write_ratio: float, seed: int = 1):
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    rng = random.Random(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(host, port, requests, write_ratio, latencies, statuses,
+                                      random.Random(rng.random())) for _ in range(clients)))
+    elapsed = time.perf_counter() - start
+    report = summarize(latencies)
+    report["elapsed_s"] = elapsed
+    report["requests_per_s"] = len(latencies) / elapsed if elapsed else 0.0
+    report["statuses"] = statuses
+    return report
+
+
+async def run_local(tasks: int, clients: int, requests: int, write_ratio: float):
+    """Start an in-process server over a temporary data set and load it."""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = TaskStorage(os.path.join(tmp, "tasks.json"))
+        manager = TaskManager()
+        for i in range(tasks):
+            manager.add_task(Task(f"task {i}", category="Work" if i % 2 else "Personal"))
+        storage.save_tasks(manager.get_all_tasks())
+        server = TaskApiServer(manager, storage, CategoryManager(os.path.join(tmp, "categories.json")), port=0)
+        await server.start()
+        try:
+            return await run_load(server.host, server.port, clients, requests, write_ratio)
+        finally:
+            await server.close()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Load test for the local task API")
+    parser.add_argument("--host", default=None, help="target an already running server instead of a local one")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=50, help="requests per client")
+    parser.add_argument("--write-ratio", type=float, default=0.05)
+    parser.add_argument("--tasks", type=int, default=5000, help="data set size for the local server")
+    args = parser.parse_args(argv)
+
+    if args.host:
+        report = asyncio.run(run_load(args.host, args.port, args.clients, args.requests, args.write_ratio))
+    else:
+        report = asyncio.run(run_local(args.tasks, args.clients, args.requests, args.write_ratio))
+    print(f"requests:   {report['count']} in {report['elapsed_s']:.2f}s")
+    print(f"throughput: {report['requests_per_s']:.0f} req/s")
+    print(f"latency:    p50={report['p50_ms']:.2f}ms  p95={report['p95_ms']:.2f}ms  p99={report['p99_ms']:.2f}ms")
+    print(f"statuses:   {report['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
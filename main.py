@@ -1,7 +1,28 @@
-from app import TaskManagerApp
+import argparse
 
+from profiling import profiler
+from watchdog import DEFAULT_THRESHOLD_MS, watchdog
 
-if __name__ == "__main__":
-    TaskManagerApp().run()
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="To-Do Task Manager")
+    parser.add_argument("--profile", action="store_true",
+                        help="time hot paths and dump the stats to JSON on exit")
+    parser.add_argument("--profile-out", default=None, help="where to write the timing stats")
+    parser.add_argument("--profile-action", default=None,
+                        help="run a cProfile session around this action (e.g. refresh_listbox)")
+    parser.add_argument("--watchdog", nargs="?", type=float, const=DEFAULT_THRESHOLD_MS, default=None, metavar="MS",
+                        help="report main-loop stalls longer than MS milliseconds (default %(const)s)")
+    parser.add_argument("--watchdog-out", default=None, help="where to append stall reports (JSON lines)")
+    return parser.parse_args(argv)
 
 
+if __name__ == "__main__":
+    args = parse_args()
+    if args.profile or args.profile_action:
+        profiler.enable(args.profile_out, args.profile_action)
+    if args.watchdog is not None:
+        watchdog.enable(args.watchdog, args.watchdog_out)
+
+    from app import TaskManagerApp
+    TaskManagerApp().run()
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from recurrence import Occurrence
+
+
+class NotificationCenter:
+    """
+    Decides which due tasks to announce, and remembers what was already
+    announced, dismissed or snoozed across restarts (in a small JSON file).
+
+    Items are keyed by "<task id>|<due date>", so moving a task's due date or
+    reaching the next occurrence of a recurring task announces it again.
+    """
+
+    def __init__(self, filename: Optional[str] = "notifications.json", min_interval: float = 60.0,
+                 lookback_days: int = 7) -> None:
+        self.filename = filename
+        self.min_interval = min_interval
+        self.lookback_days = lookback_days
+        self._announced: Dict[str, str] = {}
+        self._dismissed: Dict[str, str] = {}
+        self._snoozed: Dict[str, str] = {}
+        self._last_announce = 0.0
+        self.load()
+
+    # Persistence
+    def load(self) -> None:
+        if not self.filename or not os.path.exists(self.filename):
+            return
+        try:
+            with open(self.filename, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._announced = dict(data.get("announced", {}))
+            self._dismissed = dict(data.get("dismissed", {}))
+            self._snoozed = dict(data.get("snoozed", {}))
+        except Exception:
+            pass
+
+    def save(self) -> None:
+        if not self.filename:
+            return
+        tmp = self.filename + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"announced": self._announced, "dismissed": self._dismissed,
+                           "snoozed": self._snoozed}, f, ensure_ascii=False)
+            os.replace(tmp, self.filename)
+        except Exception:
+            pass
+
+    # Queries
+    @staticmethod
+    def key(item) -> str:
+        return f"{item.id}|{item.due_date}"
+
+    def collect_due(self, tasks: Iterable, now: Optional[datetime] = None) -> List[Tuple[str, object]]:
+        """All open tasks (and recent occurrences of recurring tasks) due on or before today."""
+        now = now or datetime.now()
+        today = now.strftime("%Y-%m-%d")
+        since = (now - timedelta(days=self.lookback_days)).strftime("%Y-%m-%d")
+        due = []
+        for t in tasks:
+            if getattr(t, "completed", False):
+                continue
+            if getattr(t, "recurrence", None) is not None:
+                for occ in t.occurrences(since, today):
+                    if not occ.completed:
+                        due.append((self.key(occ), occ))
+            elif getattr(t, "due_date", None) and t.due_date <= today:
+                due.append((self.key(t), t))
+        return due
+
+    def pending(self, tasks: Iterable, now: Optional[datetime] = None) -> List[Tuple[str, object]]:
+        """Due items that are neither dismissed nor currently snoozed."""
+        now = now or datetime.now()
+        stamp = now.isoformat()
+        due = self.collect_due(tasks, now)
+        self._prune({k for k, _ in due})
+        return [(k, item) for k, item in due
+                if k not in self._dismissed and self._snoozed.get(k, "") <= stamp]
+
+    def unannounced(self, items: List[Tuple[str, object]]) -> List[Tuple[str, object]]:
+        return [(k, item) for k, item in items if k not in self._announced]
+
+    def may_announce(self, now: Optional[float] = None) -> bool:
+        """Rate limit: at most one announcement per `min_interval` seconds."""
+        now = time.monotonic() if now is None else now
+        return now - self._last_announce >= self.min_interval or not self._last_announce
+
+    # Mutations
+    def mark_announced(self, keys: Iterable[str], now: Optional[float] = None) -> None:
+        stamp = datetime.now().isoformat()
+        for k in keys:
+            self._announced[k] = stamp
+        self._last_announce = time.monotonic() if now is None else now
+        self.save()
+
+    def dismiss(self, keys: Iterable[str]) -> None:
+        stamp = datetime.now().isoformat()
+        for k in keys:
+            self._dismissed[k] = stamp
+            self._snoozed.pop(k, None)
+        self.save()
+
+    def snooze(self, keys: Iterable[str], minutes: int = 60, now: Optional[datetime] = None) -> None:
+        until = ((now or datetime.now()) + timedelta(minutes=minutes)).isoformat()
+        for k in keys:
+            self._snoozed[k] = until
+            # Announce again once the snooze runs out
+            self._announced.pop(k, None)
+        self.save()
+
+    def _prune(self, due_keys) -> None:
+        # Forget items that are no longer due (done, deleted, rescheduled) so the state stays small
+        changed = False
+        for store in (self._announced, self._dismissed, self._snoozed):
+            stale = [k for k in store if k not in due_keys]
+            for k in stale:
+                del store[k]
+            changed = changed or bool(stale)
+        if changed:
+            self.save()
+
+    @staticmethod
+    def describe(item) -> str:
+        prefix = "🔁 " if isinstance(item, Occurrence) else ""
+        return f"{prefix}{item.title} ({item.category}) — due {item.due_date}"
@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+from typing import Any, Iterator, Optional, Tuple
+
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+_EMPTY: Tuple[Any, ...] = (None,) * WIDTH
+
+
+def _set(node, shift: int, key: int, value):
+    node = node or _EMPTY
+    i = (key >> shift) & MASK
+    if shift == 0:
+        return node[:i] + (value,) + node[i + 1:], node[i] is None
+    child, added = _set(node[i], shift - BITS, key, value)
+    return node[:i] + (child,) + node[i + 1:], added
+
+
+def _delete(node, shift: int, key: int):
+    if node is None:
+        return None, False
+    i = (key >> shift) & MASK
+    if shift == 0:
+        if node[i] is None:
+            return node, False
+        child, removed = None, True
+    else:
+        child, removed = _delete(node[i], shift - BITS, key)
+        if not removed:
+            return node, False
+    node = node[:i] + (child,) + node[i + 1:]
+    # Empty nodes are pruned so equal maps share as much structure as possible
+    return (None if all(e is None for e in node) else node), True
+
+
+def _items(node, shift: int, base: int):
+    if node is None:
+        return
+    for i, entry in enumerate(node):
+        if entry is None:
+            continue
+        key = base | (i << shift)
+        if shift == 0:
+            yield key, entry
+        else:
+            yield from _items(entry, shift - BITS, key)
+
+
+def _diff(a, b, shift: int, base: int):
+    if a is b:
+        return
+    a = a or _EMPTY
+    b = b or _EMPTY
+    for i in range(WIDTH):
+        x, y = a[i], b[i]
+        if x is y:
+            continue
+        key = base | (i << shift)
+        if shift == 0:
+            yield key, x, y
+        elif x is None:
+            for k, v in _items(y, shift - BITS, key):
+                yield k, None, v
+        elif y is None:
+            for k, v in _items(x, shift - BITS, key):
+                yield k, v, None
+        else:
+            yield from _diff(x, y, shift - BITS, key)
+
+
+class PersistentMap:
+    """
+    Immutable map from non-negative ints to values (never None), stored as a
+    32-way radix trie of tuples. set() and delete() copy only the path to
+    one leaf, O(log32 n) time and memory, and share everything else with
+    the original, so keeping many versions around is cheap.
+
+    Iteration is in key order. diff() skips shared subtrees, so comparing
+    two versions costs time in proportion to what changed between them.
+    """
+
+    __slots__ = ("_root", "_shift", "_count")
+
+    def __init__(self, root=None, shift: int = 0, count: int = 0) -> None:
+        self._root = root
+        self._shift = shift
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: int) -> bool:
+        return self.get(key) is not None
+
+    def __iter__(self) -> Iterator[int]:
+        return (k for k, _ in self.items())
+
+    def get(self, key: int, default=None):
+        if key < 0 or key >> (self._shift + BITS):
+            return default
+        node, shift = self._root, self._shift
+        while node is not None:
+            node = node[(key >> shift) & MASK]
+            if shift == 0:
+                break
+            shift -= BITS
+        return default if node is None else node
+
+    def set(self, key: int, value) -> "PersistentMap":
+        if value is None:
+            raise ValueError("PersistentMap values can not be None")
+        if key < 0:
+            raise KeyError(key)
+        root, shift = self._root, self._shift
+        while key >> (shift + BITS):
+            # Grow a level: the old root becomes child 0 and stays shared
+            root = None if root is None else (root,) + _EMPTY[1:]
+            shift += BITS
+        root, added = _set(root, shift, key, value)
+        return PersistentMap(root, shift, self._count + added)
+
+    def delete(self, key: int) -> "PersistentMap":
+        if key < 0 or key >> (self._shift + BITS):
+            return self
+        root, removed = _delete(self._root, self._shift, key)
+        if not removed:
+            return self
+        return PersistentMap(root, self._shift, self._count - 1)
+
+    def items(self) -> Iterator[Tuple[int, Any]]:
+        return _items(self._root, self._shift, 0)
+
+    def values(self) -> Iterator[Any]:
+        return (v for _, v in self.items())
+
+    def diff(self, other: "PersistentMap") -> Iterator[Tuple[int, Optional[Any], Optional[Any]]]:
+        """(key, value here, value in other) for every key whose value differs; None marks a missing key."""
+        a, b = self._root, other._root
+        shift = max(self._shift, other._shift)
+        for s in range(self._shift, shift, BITS):
+            a = None if a is None else (a,) + _EMPTY[1:]
+        for s in range(other._shift, shift, BITS):
+            b = None if b is None else (b,) + _EMPTY[1:]
+        return _diff(a, b, shift, 0)
+
+    @classmethod
+    def from_items(cls, items) -> "PersistentMap":
+        result = cls()
+        for key, value in items:
+            result = result.set(key, value)
+        return result
+
+    @classmethod
+    def from_sequence(cls, values) -> "PersistentMap":
+        """Map i -> values[i], built bottom-up in one pass instead of one set() per value."""
+        level = list(values)
+        count = len(level)
+        if not count:
+            return cls()
+        if any(v is None for v in level):
+            raise ValueError("PersistentMap values can not be None")
+        shift = 0
+        while True:
+            level = [tuple(level[i:i + WIDTH]) + _EMPTY[min(WIDTH, len(level) - i):] for i in range(0, len(level), WIDTH)]
+            if len(level) == 1:
+                return cls(level[0], shift, count)
+            shift += BITS
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import atexit
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional
+
+
+ENV_FLAG = "TODO_PROFILE"
+ENV_OUTPUT = "TODO_PROFILE_OUT"
+ENV_ACTION = "TODO_PROFILE_ACTION"
+DEFAULT_OUTPUT = "profile_stats.json"
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = int(round(pct / 100.0 * (len(sorted_values) - 1)))
+    return sorted_values[max(0, min(rank, len(sorted_values) - 1))]
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """count/total/p50/p95/p99 (milliseconds) for a list of durations in seconds."""
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "total_ms": sum(ordered) * 1000.0,
+        "p50_ms": percentile(ordered, 50) * 1000.0,
+        "p95_ms": percentile(ordered, 95) * 1000.0,
+        "p99_ms": percentile(ordered, 99) * 1000.0,
+    }
+
+
+class TimerStats:
+    """
+    Running counters for one instrumented path.
+    Keeps the most recent samples only, so memory stays bounded.
+    """
+
+    __slots__ = ("count", "total", "samples")
+
+    def __init__(self, max_samples: int = 10000) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=max_samples)
+
+    def add(self, elapsed: float) -> None:
+        self.count += 1
+        self.total += elapsed
+        self.samples.append(elapsed)
+
+    def summary(self) -> Dict[str, float]:
+        data = summarize(list(self.samples))
+        # count and total cover every call, not only the retained samples
+        data["count"] = self.count
+        data["total_ms"] = self.total * 1000.0
+        return data
+
+
+class Profiler:
+    """
+    Opt-in timers for the app's hot paths.
+    When disabled, an instrumented call costs one attribute check.
+    """
+
+    def __init__(self, enabled: bool = False, max_samples: int = 10000) -> None:
+        self.enabled = enabled
+        self.max_samples = max_samples
+        self.output: Optional[str] = None
+        self.profile_action: Optional[str] = None
+        self._stats: Dict[str, TimerStats] = {}
+        self._lock = threading.Lock()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._cprofile_active = False
+        self._atexit_registered = False
+
+    # Configuration
+    def enable(self, output: Optional[str] = None, profile_action: Optional[str] = None) -> None:
+        self.enabled = True
+        if output:
+            self.output = output
+        if profile_action:
+            self.profile_action = profile_action
+        if not self._atexit_registered:
+            atexit.register(self.dump)
+            self._atexit_registered = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats = {}
+        self._cprofile = None
+
+    # Recording
+    def record(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = TimerStats(self.max_samples)
+            stats.add(elapsed)
+
+    def timed(self, name: str) -> Callable:
+        """Decorator that times every call of the wrapped function under `name`."""
+        def decorate(func: Callable) -> Callable:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                if self.profile_action == name and not self._cprofile_active:
+                    return self._run_profiled(name, func, args, kwargs)
+                start = time.perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.record(name, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def _run_profiled(self, name: str, func: Callable, args, kwargs):
+        # All calls of the chosen action accumulate into one cProfile session
+        if self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+        self._cprofile_active = True
+        start = time.perf_counter()
+        try:
+            self._cprofile.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._cprofile.disable()
+        finally:
+            self._cprofile_active = False
+            self.record(name, time.perf_counter() - start)
+
+    # Reporting
+    def report(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            items = list(self._stats.items())
+        return {name: stats.summary() for name, stats in sorted(items)}
+
+    def dump(self, path: Optional[str] = None) -> Optional[str]:
+        """Write the report as JSON (and the cProfile session, if any). Returns the JSON path."""
+        if not self.enabled and not self._stats:
+            return None
+        path = path or self.output or DEFAULT_OUTPUT
+        try:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(self.report(), f, indent=2)
+        except Exception:
+            return None
+        if self._cprofile is not None and self.profile_action:
+            try:
+                self._cprofile.dump_stats(f"profile_{self.profile_action}.prof")
+            except Exception:
+                pass
+        return path
+
+
+profiler = Profiler()
+if os.environ.get(ENV_FLAG, "") not in ("", "0"):
+    profiler.enable(os.environ.get(ENV_OUTPUT), os.environ.get(ENV_ACTION))
+
+
+def timed(name: str) -> Callable:
+    return profiler.timed(name)
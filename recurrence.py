@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import calendar
+from datetime import date, timedelta
+from typing import Dict, Iterator, List, Optional
+
+
+def parse_date(value) -> Optional[date]:
+    if value is None or value == "":
+        return None
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value).split("T")[0])
+
+
+class RecurrenceRule:
+    """
+    How a task repeats: daily, weekly on given weekdays (0 = Monday) or
+    monthly on the start date's day, every `interval` periods, optionally
+    bounded by an `until` date or a total `count` of occurrences.
+    """
+
+    FREQUENCIES = ("daily", "weekly", "monthly")
+
+    def __init__(self, freq: str, interval: int = 1, weekdays: Optional[List[int]] = None,
+                 until=None, count: Optional[int] = None) -> None:
+        if freq not in self.FREQUENCIES:
+            raise ValueError(f"unknown frequency: {freq}")
+        self.freq = freq
+        self.interval = max(1, int(interval or 1))
+        self.weekdays = sorted(set(weekdays)) if weekdays else None
+        self.until = parse_date(until)
+        self.count = int(count) if count else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "freq": self.freq,
+            "interval": self.interval,
+            "weekdays": self.weekdays,
+            "until": self.until.isoformat() if self.until else None,
+            "count": self.count,
+        }
+
+    @staticmethod
+    def from_dict(data: Optional[Dict]) -> Optional["RecurrenceRule"]:
+        if not data:
+            return None
+        return RecurrenceRule(
+            freq=data["freq"],
+            interval=data.get("interval", 1),
+            weekdays=data.get("weekdays"),
+            until=data.get("until"),
+            count=data.get("count"),
+        )
+
+    # Generation
+    def occurrences(self, start, window_start, window_end) -> Iterator[date]:
+        """
+        Lazily yield occurrence dates of a series starting at `start` that fall
+        inside [window_start, window_end]. Nothing outside the window is built,
+        except that a `count` bound has to be walked from the start.
+        """
+        start = parse_date(start)
+        window_start = max(parse_date(window_start), start)
+        window_end = parse_date(window_end)
+        if self.until and self.until < window_end:
+            window_end = self.until
+        if window_end < window_start:
+            return
+        for day in self._iter(start, None if self.count else window_start):
+            if day > window_end:
+                return
+            if day >= window_start:
+                yield day
+
+    def _iter(self, start: date, skip_to: Optional[date]) -> Iterator[date]:
+        # Without a count bound, jump straight to the period containing `skip_to`
+        produced = 0
+        if self.freq == "daily":
+            period = 0
+            if skip_to is not None:
+                period = max(0, (skip_to - start).days // self.interval)
+            while True:
+                yield start + timedelta(days=period * self.interval)
+                produced += 1
+                if self.count and produced >= self.count:
+                    return
+                period += 1
+        elif self.freq == "weekly":
+            weekdays = self.weekdays or [start.weekday()]
+            week_start = start - timedelta(days=start.weekday())
+            period = 0
+            if skip_to is not None:
+                period = max(0, (skip_to - week_start).days // 7 // self.interval)
+            while True:
+                base = week_start + timedelta(weeks=period * self.interval)
+                for wd in weekdays:
+                    day = base + timedelta(days=wd)
+                    if day < start:
+                        continue
+                    yield day
+                    produced += 1
+                    if self.count and produced >= self.count:
+                        return
+                period += 1
+        else:
+            period = 0
+            if skip_to is not None:
+                months = (skip_to.year - start.year) * 12 + skip_to.month - start.month
+                period = max(0, months // self.interval)
+            while True:
+                month_index = start.month - 1 + period * self.interval
+                year, month = start.year + month_index // 12, month_index % 12 + 1
+                # Months without the start's day (e.g. the 31st) are skipped
+                if start.day <= calendar.monthrange(year, month)[1]:
+                    yield date(year, month, start.day)
+                    produced += 1
+                    if self.count and produced >= self.count:
+                        return
+                period += 1
+
+
+class Occurrence:
+    """
+    One generated instance of a recurring task on a given date.
+    Reads through to the series; only its completion is tracked separately.
+    """
+
+    __slots__ = ("task", "date")
+
+    def __init__(self, task, day: date) -> None:
+        self.task = task
+        self.date = day.isoformat()
+
+    @property
+    def id(self) -> str:
+        return self.task.id
+
+    @property
+    def title(self) -> str:
+        return self.task.title
+
+    @property
+    def category(self) -> str:
+        return self.task.category
+
+    @property
+    def created_at(self) -> str:
+        return self.task.created_at
+
+    @property
+    def due_date(self) -> str:
+        return self.date
+
+    @property
+    def completed(self) -> bool:
+        return self.date in self.task.completed_occurrences
+
+    @property
+    def done_at(self) -> None:
+        return None
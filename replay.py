@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from category_manager import CategoryManager
+from duplicates import DuplicateIndex, merge_duplicates
+from events import CATEGORY_EVENTS, TASK_EVENTS, EventBus, TaskRemoved, TasksReplaced
+from profiling import summarize
+from tags import parse_query
+from task import Task
+from task_exporter import IncrementalExporter
+from task_manager import TaskManager, filter_tasks
+from task_storage import TaskStorage
+from task_store import TaskStore
+
+_LINE = re.compile(r"^\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\] ([^:]+):\s?(.*)$")
+
+# Batched entries carry a JSON object with the affected "titles" (and the new category / due date)
+BATCH_ACTIONS = ("Tasks Deleted", "Tasks Completed", "Tasks Recategorized", "Tasks Rescheduled")
+ACTIONS = ("Task Added", "Task Deleted", "Task Completed", "Task Edited", "Filter", "Filter by Date",
+           "Search", "Category Renamed", "Category Deleted", "Tasks Exported", "Changes Exported",
+           "Duplicates Merged") + BATCH_ACTIONS
+
+
+class LogEntry(NamedTuple):
+    timestamp: datetime
+    action: str
+    arg: str
+
+
+def parse_log(lines: Iterable[str]) -> Tuple[List[LogEntry], int]:
+    """Parse activity.log lines; returns (entries, number of lines that were not recognised)."""
+    entries: List[LogEntry] = []
+    skipped = 0
+    for line in lines:
+        line = line.rstrip("\n")
+        if not line.strip():
+            continue
+        m = _LINE.match(line)
+        if not m or m.group(2) not in ACTIONS:
+            skipped += 1
+            continue
+        entries.append(LogEntry(datetime.strptime(m.group(1), "%Y-%m-%d %H:%M:%S"), m.group(2), m.group(3).strip()))
+    return entries, skipped
+
+
+def seed_tasks(manager: TaskManager, count: int, entries: List[LogEntry], seed: int = 1) -> None:
+    """Fill the manager with `count` synthetic tasks spread over the days and categories the trace touches."""
+    rng = random.Random(seed)
+    days = sorted({e.timestamp.date() for e in entries}) or [datetime.now().date()]
+    first, last = days[0] - timedelta(days=30), days[-1]
+    span = (last - first).days + 1
+    categories = ["Personal", "Work", "School"]
+    for e in entries:
+        if e.action in ("Category Renamed", "Category Deleted"):
+            categories.extend(part.strip() for part in e.arg.split("->") if part.strip())
+    categories = sorted(set(categories))
+    tasks = []
+    for i in range(count):
+        created = datetime.combine(first + timedelta(days=rng.randrange(span)), datetime.min.time())
+        created += timedelta(seconds=rng.randrange(86400))
+        task = Task(f"task {i}", category=rng.choice(categories), created_at=created.isoformat(),
+                    due_date=created.strftime("%Y-%m-%d"))
+        if rng.random() < 0.3:
+            task.mark_done()
+        tasks.append(task)
+    manager.tasks = tasks
+
+
+class Replayer:
+    """
+    Replays activity.log entries headlessly against TaskManager, TaskStorage
+    and CategoryManager, wired the way the app wires them: an event bus
+    delivering to an autosaving TaskStore and to a list view that is patched
+    per change. Each entry is timed from the call until its events are handled.
+
+    Titles in the trace are matched to live tasks where possible; otherwise a
+    random task stands in. "Today" means the day of the log entry, so the
+    trace sees the same data it saw when it was recorded.
+    """
+
+    def __init__(self, directory: str, seed: int = 1) -> None:
+        self.directory = directory
+        self.rng = random.Random(seed)
+        self.events = EventBus()
+        self.manager = TaskManager(self.events)
+        self.storage = TaskStorage(os.path.join(directory, "tasks.json"))
+        self.category_manager = CategoryManager(os.path.join(directory, "categories.json"), events=self.events)
+        self.store = TaskStore(self.manager, self.storage, self.category_manager, autosave=True)
+        self.view: Tuple[Optional[str], Optional[str], str] = (None, None, "")
+        self.rows: List[object] = []
+        self.samples: Dict[str, List[float]] = {}
+        self.events.subscribe(self._on_view_events)
+        self.duplicates = DuplicateIndex(self.manager)
+        self.exporter = IncrementalExporter(self.storage, os.path.join(directory, "export_state.json"))
+
+    # View, as the app keeps it
+    def _show(self, date_filter, category_filter=None, search_term="") -> None:
+        self.view = (date_filter, category_filter, search_term)
+        self.rows = filter_tasks(self.manager.get_all_tasks(), *self.view)
+
+    def _on_view_events(self, events) -> None:
+        if any(isinstance(e, TasksReplaced) or isinstance(e, CATEGORY_EVENTS) for e in events):
+            self._show(*self.view)
+            return
+        changed = {e.task.id: e for e in events if isinstance(e, TASK_EVENTS)}
+        self.rows = [row for row in self.rows if row.id not in changed]
+        for e in changed.values():
+            if not isinstance(e, TaskRemoved):
+                self.rows.extend(filter_tasks([e.task], *self.view))
+
+    # Replay
+    def _find(self, title: str):
+        tasks = self.manager.get_all_tasks()
+        for t in tasks:
+            if t.title == title:
+                return t
+        return self.rng.choice(tasks) if tasks else None
+
+    def _find_many(self, titles: List[str]) -> List:
+        by_title: Dict[str, object] = {}
+        for t in self.manager.get_all_tasks():
+            by_title.setdefault(t.title, t)
+        found = {}
+        for title in titles:
+            task = by_title.get(title) or self._find(title)
+            if task is not None:
+                found[task.id] = task
+        return list(found.values())
+
+    def _ensure_category(self, name: str) -> None:
+        if name and name not in self.category_manager.get_categories():
+            self.category_manager.add_category(name)
+
+    def prepare(self, entry: LogEntry):
+        """Untimed set-up for an entry; returns the callable that performs it."""
+        day = entry.timestamp.strftime("%Y-%m-%d")
+        action, arg = entry.action, entry.arg
+        if action == "Task Added":
+            task = Task(arg, category=self.rng.choice(self.category_manager.get_categories()),
+                        created_at=entry.timestamp.isoformat(), due_date=day)
+            return lambda: self._add(task)
+        if action in ("Task Deleted", "Task Completed", "Task Edited"):
+            task = self._find(arg)
+            if task is None:
+                return None
+            if action == "Task Deleted":
+                return lambda: self.manager.delete_task(task.id)
+            if action == "Task Completed":
+                return lambda: self.manager.mark_task_done(task.id)
+            # The log records the title after editing
+            return lambda: self.manager.update_task(task.id, title=arg)
+        if action in BATCH_ACTIONS:
+            try:
+                details = json.loads(arg)
+            except ValueError:
+                details = {}
+            ids = [t.id for t in self._find_many(details.get("titles", []))]
+            if action == "Tasks Deleted":
+                return lambda: self._in_batch(self.manager.delete_tasks, ids)
+            if action == "Tasks Completed":
+                return lambda: self._in_batch(self.manager.mark_tasks_done, ids)
+            if action == "Tasks Recategorized":
+                self._ensure_category(details.get("category", ""))
+                return lambda: self._in_batch(self.manager.update_tasks, ids, category=details.get("category"))
+            return lambda: self._in_batch(self.manager.update_tasks, ids, due_date=details.get("due_date"))
+        if action == "Filter":
+            date_filter = None if arg == "All Tasks" else day
+            return lambda: self._show(date_filter)
+        if action == "Filter by Date":
+            return lambda: self._show(arg)
+        if action == "Search":
+            # Like the app: tag searches look at every date, plain text only at the logged day
+            date_filter = None if parse_query(arg)[0] else day
+            return lambda: self._show(date_filter, None, arg)
+        if action in ("Category Renamed", "Category Deleted"):
+            old, _, new = (part.strip() for part in arg.partition("->"))
+            self._ensure_category(old)
+            if action == "Category Renamed":
+                return lambda: self._in_transaction(self.category_manager.rename_category, old, new)
+            return lambda: self._in_transaction(self.category_manager.delete_category, old, new)
+        if action == "Duplicates Merged":
+            return self._merge_duplicates
+        if action == "Tasks Exported":
+            path = os.path.join(self.directory, "export.csv")
+            return lambda: self.exporter.compact(self.manager.get_all_tasks(), path)
+        if action == "Changes Exported":
+            path = os.path.join(self.directory, "changes.csv")
+            return lambda: self.exporter.export(self.manager.get_all_tasks(), path)
+        return None
+
+    def _add(self, task) -> None:
+        # The app checks for duplicates before every add
+        self.duplicates.find(task.title)
+        self.manager.add_task(task)
+
+    def _in_transaction(self, change, *args) -> None:
+        with self.store.transaction():
+            change(*args, self.manager)
+            self.store.save()
+
+    def _in_batch(self, change, *args, **fields) -> None:
+        with self.store.transaction():
+            change(*args, **fields)
+
+    def _merge_duplicates(self) -> None:
+        groups = self.duplicates.groups()
+        with self.store.transaction():
+            merge_duplicates(self.manager, groups)
+
+    def run(self, entries: List[LogEntry], speed: float = 0.0) -> Dict[str, Dict[str, float]]:
+        """
+        Replay entries in order. speed > 0 keeps the recorded gaps, divided by
+        `speed` (speed=60 plays an hour in a minute); 0 replays back to back.
+        """
+        previous: Optional[datetime] = None
+        for entry in entries:
+            if speed > 0 and previous is not None:
+                gap = (entry.timestamp - previous).total_seconds() / speed
+                if gap > 0:
+                    time.sleep(gap)
+            previous = entry.timestamp
+            action = self.prepare(entry)
+            if action is None:
+                continue
+            start = time.perf_counter()
+            action()
+            self.samples.setdefault(entry.action, []).append(time.perf_counter() - start)
+        return self.report()
+
+    def report(self) -> Dict[str, Dict[str, float]]:
+        return {name: summarize(samples) for name, samples in sorted(self.samples.items())}
+
+
+def replay(entries: List[LogEntry], tasks: int = 1000, repeat: int = 1, speed: float = 0.0,
+           seed: int = 1) -> Dict[str, Dict[str, float]]:
+    """Replay a trace over a temporary data set of `tasks` seeded tasks."""
+    with tempfile.TemporaryDirectory() as tmp:
+        replayer = Replayer(tmp, seed)
+        seed_tasks(replayer.manager, tasks, entries, seed)
+        for _ in range(repeat):
+            replayer.run(entries, speed)
+        return replayer.report()
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Replay activity.log against the task model and report latencies")
+    parser.add_argument("log", nargs="?", default="activity.log")
+    parser.add_argument("--tasks", type=int, default=1000, help="synthetic tasks loaded before the replay")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the trace this many times")
+    parser.add_argument("--speed", type=float, default=0.0,
+                        help="speed-up over the recorded timing (0 = no waiting between actions)")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args(argv)
+
+    with open(args.log, "r", encoding="utf-8") as f:
+        entries, skipped = parse_log(f)
+    report = replay(entries, args.tasks, args.repeat, args.speed, args.seed)
+
+    print(f"replayed {len(entries)} entries x{args.repeat} over {args.tasks} tasks ({skipped} lines skipped)")
+    print(f"{'action':<18}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'total ms':>11}")
+    for name, stats in report.items():
+        print(f"{name:<18}{stats['count']:>7}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}"
+              f"{stats['p99_ms']:>10.2f}{stats['total_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from archive import TaskArchive
+from task import Task
+from task_storage import TaskStorage
+
+FANOUT = 16
+DEPTH = 3  # FANOUT ** DEPTH = 4096 leaves, a few dozen records each at 100k tasks
+
+
+def record_digest(task: Task) -> bytes:
+    return hashlib.sha1(json.dumps(task.to_dict(), sort_keys=True).encode("utf-8")).digest()
+
+
+def tombstone_digest(deleted_at: str) -> bytes:
+    return hashlib.sha1(b"deleted:" + deleted_at.encode("utf-8")).digest()
+
+
+def _leaf(task_id: str) -> int:
+    return int.from_bytes(hashlib.sha1(task_id.encode("utf-8")).digest()[:2], "big") % FANOUT ** DEPTH
+
+
+class HashTree:
+    """
+    Merkle tree over (task id, record digest) pairs. Ids are spread over
+    FANOUT ** DEPTH leaves by a hash of the id; each inner node hashes its
+    children. Two trees are compared top-down and only subtrees whose hashes
+    differ are opened, so finding what changed between two large, mostly
+    equal stores touches a few leaves, not every record.
+    """
+
+    def __init__(self, records: Dict[str, bytes]) -> None:
+        leaves: Dict[int, Dict[str, bytes]] = {}
+        for task_id, digest in records.items():
+            leaves.setdefault(_leaf(task_id), {})[task_id] = digest
+        self.leaves = leaves
+        level = {i: hashlib.sha1(b"".join(k.encode("utf-8") + b"\0" + v for k, v in sorted(leaf.items()))).digest()
+                 for i, leaf in leaves.items()}
+        # levels[d] maps node index at depth d to its hash; empty subtrees are absent
+        self.levels: List[Dict[int, bytes]] = [level]
+        for _ in range(DEPTH):
+            children: Dict[int, List[Tuple[int, bytes]]] = {}
+            for i, digest in level.items():
+                children.setdefault(i // FANOUT, []).append((i, digest))
+            level = {i: hashlib.sha1(b"".join(i.to_bytes(2, "big") + d for i, d in sorted(kids))).digest()
+                     for i, kids in children.items()}
+            self.levels.insert(0, level)
+
+    @property
+    def root(self) -> Optional[bytes]:
+        return self.levels[0].get(0)
+
+    def diff(self, other: "HashTree") -> Iterator[str]:
+        """Ids whose record differs between the two trees, or that only one of them has."""
+        stack = [(0, 0)]
+        while stack:
+            depth, i = stack.pop()
+            if self.levels[depth].get(i) == other.levels[depth].get(i):
+                continue
+            if depth < DEPTH:
+                stack.extend((depth + 1, i * FANOUT + k) for k in range(FANOUT))
+                continue
+            mine, theirs = self.leaves.get(i, {}), other.leaves.get(i, {})
+            for task_id in mine.keys() | theirs.keys():
+                if mine.get(task_id) != theirs.get(task_id):
+                    yield task_id
+
+
+class Conflict(NamedTuple):
+    task_id: str
+    title: str
+    winner: str  # "a" or "b"
+    a_changed: str
+    b_changed: str
+
+
+class SyncReport(NamedTuple):
+    compared: int
+    to_a: int
+    to_b: int
+    conflicts: List[Conflict]
+
+
+class _Side:
+    """One store as sync sees it: live tasks and tombstones keyed by id, plus their hash tree."""
+
+    def __init__(self, storage: TaskStorage, archive: TaskArchive) -> None:
+        self.storage = storage
+        self.archive = archive
+        self.tasks = storage.load_tasks()
+        self.by_id = {t.id: t for t in self.tasks}
+        self.tombstones = storage.tombstones
+        records = {tid: tombstone_digest(at) for tid, at in self.tombstones.items() if tid not in self.by_id}
+        records.update((t.id, record_digest(t)) for t in self.tasks)
+        self.tree = HashTree(records)
+        self.to_archive: List[Task] = []
+        self.changed = False
+
+    def changed_at(self, task_id: str) -> Optional[str]:
+        task = self.by_id.get(task_id)
+        if task is not None:
+            return task.updated_at
+        return self.tombstones.get(task_id)
+
+    def archived_at(self, task_id: str) -> Optional[str]:
+        """updated_at of the archived copy if this side moved the task to its archive, else None."""
+        if task_id in self.by_id or task_id in self.tombstones:
+            return None
+        return self.archive.archived_at(task_id)
+
+    def take(self, task_id: str, source: "_Side") -> None:
+        """Make this side's record for task_id match the source's."""
+        task = source.by_id.get(task_id)
+        if task is None:
+            # A delete of a task this side never had (or already forgot) needs no tombstone here
+            if task_id not in self.by_id and task_id not in self.tombstones:
+                return
+            self.by_id.pop(task_id, None)
+            self.storage.add_tombstone(task_id, source.tombstones[task_id])
+        else:
+            self.by_id[task_id] = Task.from_dict(task.to_dict())
+        self.changed = True
+
+    def archive_live(self, task_id: str) -> None:
+        """The peer archived task_id: move this side's live copy to its own archive too, without a tombstone."""
+        self.to_archive.append(self.by_id.pop(task_id))
+        self.changed = True
+
+    def save(self, order: List[str]) -> None:
+        if not self.changed:
+            return
+        # Archive before dropping from the live file, so a crash in between can't lose a task
+        self.archive.archive_tasks(self.to_archive)
+        # Keep this side's order; tasks new to it go at the end in the source's order
+        seen = set()
+        tasks = []
+        for task_id in [t.id for t in self.tasks] + order:
+            if task_id in self.by_id and task_id not in seen:
+                seen.add(task_id)
+                tasks.append(self.by_id[task_id])
+        self.storage.save_tasks(tasks)
+
+
+def _state_file(storage: TaskStorage) -> str:
+    return os.path.splitext(storage.filename)[0] + ".sync.json"
+
+
+def _sync_state(storage: TaskStorage) -> Dict[str, str]:
+    """peer path -> start time of the last completed sync with it."""
+    try:
+        with open(_state_file(storage), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _last_sync(storage: TaskStorage, peer: TaskStorage) -> Optional[str]:
+    return _sync_state(storage).get(os.path.abspath(peer.filename))
+
+
+def _record_sync(storage: TaskStorage, peer: TaskStorage, when: str) -> None:
+    state = _sync_state(storage)
+    state[os.path.abspath(peer.filename)] = when
+    with open(_state_file(storage), "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=4)
+
+
+def _prune_tombstones(storage: TaskStorage) -> None:
+    """
+    Forget tombstones recorded before the oldest last sync with any known
+    peer: every peer has been offered them since. The storage keeps those
+    the last incremental export has not picked up yet.
+    """
+    state = _sync_state(storage)
+    if state and storage.prune_tombstones(min(state.values())):
+        storage.save_tombstones()
+
+
+def _archive(storage: TaskStorage) -> TaskArchive:
+    """The archive the app keeps next to a task file."""
+    return TaskArchive(os.path.join(os.path.dirname(os.path.abspath(storage.filename)), "archive"))
+
+
+def _archived_by(holder: _Side, peer: _Side, task_id: str) -> bool:
+    """
+    True if holder archived task_id and the peer has no newer change to it.
+    The peer's live copy then follows it into the peer's archive.
+    """
+    archived_at = holder.archived_at(task_id)
+    if archived_at is None:
+        return False
+    task = peer.by_id.get(task_id)
+    if task is not None:
+        if (task.updated_at or "") > archived_at:
+            return False
+        peer.archive_live(task_id)
+    return True
+
+
+def sync(a: TaskStorage, b: TaskStorage,
+         archive_a: Optional[TaskArchive] = None, archive_b: Optional[TaskArchive] = None) -> SyncReport:
+    """
+    Two-way sync of two task files. Records that differ (found through the
+    hash trees) go to the side that changed them last; deletes travel as
+    tombstones. A record changed on both sides since the last sync of this
+    pair is a conflict: last writer still wins, and it is reported.
+    A task one side has archived is archived on the other side as well
+    instead of coming back as live, unless the peer changed it after it was
+    archived. Archives default to the "archive" directory next to each task
+    file, where the app keeps them.
+    Afterwards each side drops the tombstones all of its peers have been offered.
+    """
+    started = datetime.now().isoformat()
+    side_a = _Side(a, archive_a if archive_a is not None else _archive(a))
+    side_b = _Side(b, archive_b if archive_b is not None else _archive(b))
+    last = _last_sync(a, b)
+    to_a = to_b = 0
+    conflicts = []
+    changed_ids = list(side_a.tree.diff(side_b.tree))
+    for task_id in changed_ids:
+        if _archived_by(side_a, side_b, task_id):
+            to_b += 1
+            continue
+        if _archived_by(side_b, side_a, task_id):
+            to_a += 1
+            continue
+        a_at, b_at = side_a.changed_at(task_id), side_b.changed_at(task_id)
+        if b_at is None or (a_at is not None and (a_at, task_id in side_a.by_id) > (b_at, task_id in side_b.by_id)):
+            winner = "a"
+            side_b.take(task_id, side_a)
+            to_b += 1
+        else:
+            winner = "b"
+            side_a.take(task_id, side_b)
+            to_a += 1
+        if a_at is not None and b_at is not None and (last is None or min(a_at, b_at) > last):
+            task = side_a.by_id.get(task_id) or side_b.by_id.get(task_id)
+            conflicts.append(Conflict(task_id, task.title if task else "", winner, a_at, b_at))
+    side_a.save([t.id for t in side_b.tasks])
+    side_b.save([t.id for t in side_a.tasks])
+    _record_sync(a, b, started)
+    _record_sync(b, a, started)
+    _prune_tombstones(a)
+    _prune_tombstones(b)
+    return SyncReport(len(changed_ids), to_a, to_b, conflicts)
+
+
+def _storage(path: str) -> TaskStorage:
+    return TaskStorage(os.path.join(path, "tasks.json") if os.path.isdir(path) else path)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Two-way sync of two task files (or directories holding tasks.json)")
+    parser.add_argument("a")
+    parser.add_argument("b")
+    args = parser.parse_args(argv)
+
+    report = sync(_storage(args.a), _storage(args.b))
+    print(f"{report.compared} record(s) differed: {report.to_a} copied to {args.a}, {report.to_b} copied to {args.b}")
+    for c in report.conflicts:
+        print(f"conflict: {c.title!r} ({c.task_id}) changed on both sides "
+              f"(a {c.a_changed}, b {c.b_changed}); kept {c.winner}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+from events import TaskAdded, TaskRemoved, TasksReplaced, TaskUpdated
+
+# "#car", "@work": a sigil not glued to a word (so "a@b.com" is no tag), then a word
+_TAG = re.compile(r"(?<![\w#@])([#@]\w[\w-]*)")
+_NO_TAGS: FrozenSet[str] = frozenset()
+OR_WORDS = ("|", "OR")
+
+
+def parse_tags(title: str) -> FrozenSet[str]:
+    """Case-folded tags in a title, sigil included: "Wash #Car @work" -> {"#car", "@work"}."""
+    title = str(title)
+    if "#" not in title and "@" not in title:
+        return _NO_TAGS
+    return frozenset(tag.casefold() for tag in _TAG.findall(title))
+
+
+def parse_query(query: str) -> Tuple[List[str], bool, str]:
+    """
+    Split a search into (tags, match_any, remaining text). Tags are ANDed
+    unless the query contains "|" or "OR": "#car @work" needs both,
+    "#car | #home" either.
+    """
+    tags, words = [], []
+    match_any = False
+    for word in query.split():
+        if word in OR_WORDS:
+            match_any = True
+        elif _TAG.fullmatch(word):
+            tags.append(word.casefold())
+        else:
+            words.append(word)
+    if not tags:
+        # Plain searches stay plain substrings, "|" and "OR" included
+        return [], False, query
+    return tags, match_any, " ".join(words)
+
+
+def tags_match(task_tags: FrozenSet[str], tags: Iterable[str], match_any: bool = False) -> bool:
+    tags = list(tags)
+    if match_any:
+        return any(tag in task_tags for tag in tags)
+    return all(tag in task_tags for tag in tags)
+
+
+class TagIndex:
+    """
+    tag -> ids of the tasks whose title carries it, kept current from the
+    manager's change events. Titles are only parsed when a task is added or
+    its title changes; untagged titles cost two substring checks.
+    """
+
+    def __init__(self, manager) -> None:
+        self.manager = manager
+        self._ids: Dict[str, Set[str]] = {}
+        # Only tagged tasks are listed here
+        self._tags_of: Dict[str, FrozenSet[str]] = {}
+        self.rebuild(manager.get_all_tasks())
+        manager.events.subscribe(self._on_events, (TaskAdded, TaskRemoved, TaskUpdated, TasksReplaced))
+
+    def rebuild(self, tasks: Iterable) -> None:
+        self._ids.clear()
+        self._tags_of.clear()
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task) -> None:
+        tags = parse_tags(task.title)
+        old = self._tags_of.get(task.id, _NO_TAGS)
+        if tags == old:
+            return
+        for tag in old - tags:
+            ids = self._ids[tag]
+            ids.discard(task.id)
+            if not ids:
+                del self._ids[tag]
+        for tag in tags - old:
+            self._ids.setdefault(tag, set()).add(task.id)
+        if tags:
+            self._tags_of[task.id] = tags
+        else:
+            del self._tags_of[task.id]
+
+    def remove(self, task) -> None:
+        for tag in self._tags_of.pop(task.id, _NO_TAGS):
+            ids = self._ids[tag]
+            ids.discard(task.id)
+            if not ids:
+                del self._ids[tag]
+
+    def _on_events(self, events) -> None:
+        if any(isinstance(e, TasksReplaced) for e in events):
+            self.rebuild(self.manager.get_all_tasks())
+            return
+        for e in events:
+            if isinstance(e, TaskRemoved):
+                self.remove(e.task)
+            elif isinstance(e, TaskAdded) or "title" in e.fields:
+                self.add(e.task)
+
+    # Queries
+    def tags_of(self, task_id: str) -> FrozenSet[str]:
+        return self._tags_of.get(task_id, _NO_TAGS)
+
+    def ids(self, tags: Iterable[str], match_any: bool = False) -> Set[str]:
+        """Ids of the tasks with all (or, with match_any, any) of the tags."""
+        sets = [self._ids.get(tag.casefold(), set()) for tag in tags]
+        if not sets:
+            return set()
+        if match_any:
+            return set().union(*sets)
+        # Intersect starting from the smallest set
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def filter(self, tasks: Iterable, tags: Iterable[str], match_any: bool = False) -> List:
+        """The tasks matching the tags, in their original order."""
+        ids = self.ids(tags, match_any)
+        return [t for t in tasks if t.id in ids] if ids else []
+
+    def counts(self) -> Dict[str, int]:
+        """Tasks per tag, most used first."""
+        return dict(sorted(((tag, len(ids)) for tag, ids in self._ids.items()), key=lambda kv: (-kv[1], kv[0])))
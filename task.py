@@ -1,8 +1,18 @@
 from datetime import datetime
+import itertools
 import uuid
 
+from recurrence import Occurrence, RecurrenceRule, parse_date
+
+# Attributes that end up in to_dict(); assigning any of them marks the task dirty
+_SERIALIZED_FIELDS = frozenset(("title", "category", "completed", "created_at", "done_at", "due_date", "recurrence",
+                                "updated_at"))
+# Process-wide so a rev value is never reused across tasks or copies
+_revisions = itertools.count(1)
+
 class Task:
-    def __init__(self, title, category="Personal", completed=False, created_at=None, done_at=None, task_id=None, due_date=None):
+    def __init__(self, title, category="Personal", completed=False, created_at=None, done_at=None, task_id=None, due_date=None,
+                 recurrence=None, completed_occurrences=None, updated_at=None):
         self.id = task_id or str(uuid.uuid4())
         self.title = title
         self.category = category
@@ -11,21 +21,89 @@ class Task:
         self.done_at = done_at
         # due_date: YYYY-MM-DD or None
         self.due_date = due_date
+        # recurrence: RecurrenceRule or None; completed_occurrences: YYYY-MM-DD of finished instances
+        self.recurrence = recurrence
+        self.completed_occurrences = set(completed_occurrences or ())
+        # updated_at: ISO time of the last change to a stored field; sync resolves conflicts by it
+        self.updated_at = updated_at or self.created_at
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if name in _SERIALIZED_FIELDS:
+            self.mark_dirty()
+            if name != "updated_at" and "updated_at" in self.__dict__:
+                object.__setattr__(self, "updated_at", datetime.now().isoformat())
+
+    def mark_dirty(self):
+        # rev changes on every mutation; storage compares it with the rev it last encoded
+        object.__setattr__(self, "rev", next(_revisions))
+
+    def get_state(self):
+        """Copy of the task's fields, for comparing two versions of it."""
+        state = dict(self.__dict__)
+        state["completed_occurrences"] = set(self.completed_occurrences)
+        return state
+
+    def copy(self):
+        """A separate Task with the same id and fields (and rev, until the copy is changed)."""
+        clone = object.__new__(Task)
+        clone.__dict__.update(self.__dict__)
+        clone.__dict__["completed_occurrences"] = set(self.completed_occurrences)
+        return clone
 
     def mark_done(self):
         self.completed = True
         self.done_at = datetime.now().isoformat()
 
+    def mark_undone(self):
+        self.completed = False
+        self.done_at = None
+
+    def update(self, **fields):
+        """Set several fields at once; returns the names that actually changed."""
+        changed = []
+        for name, value in fields.items():
+            if name not in _SERIALIZED_FIELDS:
+                raise AttributeError(f"Task has no editable field '{name}'")
+            if getattr(self, name) != value:
+                setattr(self, name, value)
+                changed.append(name)
+        return changed
+
+    # Recurrence
+    @property
+    def is_recurring(self):
+        return self.recurrence is not None
+
+    def series_start(self):
+        return self.due_date or self.created_at.split("T")[0]
+
+    def occurrences(self, window_start, window_end):
+        """Generate the occurrences of a recurring task inside the window (inclusive)."""
+        if self.recurrence is None:
+            return
+        for day in self.recurrence.occurrences(self.series_start(), window_start, window_end):
+            yield Occurrence(self, day)
+
+    def complete_occurrence(self, day):
+        self.completed_occurrences.add(parse_date(day).isoformat())
+        self.updated_at = datetime.now().isoformat()
+
     def to_dict(self):
-        return {
+        data = {
             "id": self.id,
             "title": self.title,
             "category": self.category,
             "completed": self.completed,
             "created_at": self.created_at,
             "done_at": self.done_at,
-            "due_date": self.due_date
+            "due_date": self.due_date,
+            "updated_at": self.updated_at
         }
+        if self.recurrence is not None:
+            data["recurrence"] = self.recurrence.to_dict()
+            data["completed_occurrences"] = sorted(self.completed_occurrences)
+        return data
 
     @staticmethod
     def from_dict(data):
@@ -36,5 +114,9 @@ class Task:
             created_at=data.get("created_at"),
             done_at=data.get("done_at"),
             task_id=data.get("id"),
-            due_date=data.get("due_date")
+            due_date=data.get("due_date"),
+            recurrence=RecurrenceRule.from_dict(data.get("recurrence")),
+            completed_occurrences=data.get("completed_occurrences"),
+            # Files written before updated_at existed: the last known change is completion or creation
+            updated_at=data.get("updated_at") or data.get("done_at")
         )
@@ -1,6 +1,121 @@
 import csv
+import json
+import os
+from datetime import datetime
 from tkinter import filedialog, messagebox
 
+CSV_HEADER = ["ID", "Title", "Category", "Completed", "Created At", "Done At"]
+# Incremental exports add what happened to the row and the export it belongs to
+CHANGES_HEADER = CSV_HEADER + ["Change", "Export Seq"]
+
+def _csv_row(task):
+    return [task.id, task.title, task.category, task.completed, task.created_at, task.done_at]
+
+def write_tasks_csv(path, tasks):
+    """Write tasks to `path` in the app's CSV layout (no dialogs, usable headless)."""
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for task in tasks:
+            writer.writerow(_csv_row(task))
+
+class IncrementalExporter:
+    """
+    Exports only the tasks added, modified, completed or deleted since the
+    previous export; deletes are written as tombstone rows (ID and Change only).
+
+    The high-water mark in `state_path` is the storage's local change number
+    at the last export (see TaskStorage.change_seq), plus the export's own
+    sequence number and time. Every record the storage stores or deletes,
+    including ones that arrive through sync with an older updated_at, gets a
+    higher change number, so nothing slips under the mark. Tasks past the
+    mark are exported, and their created_at and done_at tell added and
+    completed from modified. Deletes are the storage's tombstones past the
+    mark, so a task that was archived rather than deleted does not show up
+    as one. compact() writes a full baseline in the plain CSV layout and
+    moves the mark to it.
+    """
+
+    def __init__(self, storage, state_path="export_state.json"):
+        self.storage = storage
+        self.state_path = state_path
+
+    def _load(self):
+        if not os.path.exists(self.state_path):
+            return None
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, seq, now):
+        change = self.storage.mark_exported()
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"seq": seq, "change": change, "exported_at": now.isoformat()}, f)
+        os.replace(tmp, self.state_path)
+
+    def mark(self):
+        """(export seq, exported at) of the last export, or None before the first one."""
+        state = self._load()
+        return None if state is None else (state["seq"], state["exported_at"])
+
+    def compact(self, tasks, path=None, now=None):
+        """Write a full baseline and reset the mark to it; returns the file written."""
+        now = now or datetime.now()
+        state = self._load()
+        path = path or f"tasks_{now.strftime('%Y%m%d_%H%M%S')}.csv"
+        write_tasks_csv(path, tasks)
+        self.storage.note_changes(tasks)
+        self._save((state or {}).get("seq", 0) + 1, now)
+        return path
+
+    def export(self, tasks, path=None, now=None):
+        """
+        Write the changes since the last export; returns (file written or None
+        if nothing changed, {change: count}). Without a mark yet (or with one
+        from before change numbers were kept), writes a baseline.
+        """
+        now = now or datetime.now()
+        state = self._load()
+        if state is None or "change" not in state:
+            return self.compact(tasks, path, now), {"added": len(tasks)}
+        seq = state["seq"] + 1
+        since, exported_at = state["change"], state["exported_at"]
+        # Edits not saved yet get their change numbers now
+        self.storage.note_changes(tasks)
+        rows = []
+        counts = {}
+        live = set()
+        for task in tasks:
+            live.add(task.id)
+            if self.storage.change_seq(task.id) <= since:
+                continue
+            if task.created_at > exported_at:
+                change = "added"
+            elif task.completed and task.done_at and task.done_at > exported_at:
+                change = "completed"
+            else:
+                change = "modified"
+            rows.append(_csv_row(task) + [change, seq])
+            counts[change] = counts.get(change, 0) + 1
+        deleted = [task_id for task_id in self.storage.deleted_since(since) if task_id not in live]
+        for task_id in deleted:
+            rows.append([task_id, "", "", "", "", "", "deleted", seq])
+        if deleted:
+            counts["deleted"] = len(deleted)
+        if not rows:
+            return None, counts
+        path = path or f"changes_{now.strftime('%Y%m%d_%H%M%S')}.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(CHANGES_HEADER)
+            writer.writerows(rows)
+        self._save(seq, now)
+        return path, counts
+
+
 class TaskExporter:
     def __init__(self):
         pass
@@ -25,7 +140,7 @@ class TaskExporter:
         try:
             with open(file_path, mode="w", newline="", encoding="utf-8") as file:
                 writer = csv.writer(file)
-                writer.writerow(["ID", "Title", "Category", "Completed", "Created At", "Done At"])
+                writer.writerow(CSV_HEADER)
                 for task in tasks:
                     writer.writerow([
                         task.id,
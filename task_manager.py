@@ -1,9 +1,111 @@
+import threading
+from datetime import datetime
+
+from events import TASK_EVENTS, EventBus, TaskAdded, TaskRemoved, TaskUpdated, TasksReplaced
+from persistent import PersistentMap
+from tags import TagIndex, parse_query, parse_tags, tags_match
 from task import Task
 
 
+def filter_tasks(tasks, date_filter=None, category_filter=None, search_term=""):
+    """
+    Apply the list view filters.
+    date_filter is "today", a YYYY-MM-DD string or None (all dates);
+    category_filter "All" or None disables the category filter.
+    For a date, recurring tasks are replaced by their occurrence on that day.
+    """
+    if date_filter == "today":
+        date_filter = datetime.now().strftime("%Y-%m-%d")
+    if isinstance(date_filter, str):
+        matched = []
+        for t in tasks:
+            if getattr(t, "recurrence", None) is not None:
+                matched.extend(t.occurrences(date_filter, date_filter))
+            elif t.created_at.split("T")[0] == date_filter:
+                matched.append(t)
+        tasks = matched
+
+    if category_filter and category_filter != "All":
+        tasks = [t for t in tasks if t.category == category_filter]
+
+    if search_term.strip():
+        # "#tag" / "@tag" words filter by tag (all of them, or any with "|" / "OR"); the rest is a substring
+        tags, match_any, text = parse_query(search_term)
+        if tags:
+            tasks = [t for t in tasks if tags_match(parse_tags(t.title), tags, match_any)]
+        if text:
+            term = text.lower()
+            tasks = [t for t in tasks if term in t.title.lower()]
+
+    return list(tasks)
+
+
+def _mark_done(task):
+    task.mark_done()
+    return ("completed", "done_at")
+
+
 class TaskManager:
-    def __init__(self):
-        self.tasks = []
+    """
+    Holds the task list as an immutable snapshot: a PersistentMap from slot
+    (position in insertion order) to task.
+
+    Readers get the current snapshot without copying or locking; it never
+    changes under them, and neither do the tasks in it. Writers are
+    serialized by a lock; an edit copies the task, changes the copy and
+    publishes a new map holding it (copy-on-write), which copies only the
+    path to that slot, and bumps `version` each time. Change events carry
+    the new task objects. get_all_tasks() returns the snapshot as a tuple,
+    built on first read and kept until the next write.
+
+    Every change is announced on `events` (an EventBus) once the lock is
+    released, so views, storage and indexes can update incrementally.
+    """
+
+    def __init__(self, events=None):
+        self._lock = threading.RLock()
+        self._entries = PersistentMap()
+        # task id -> slot, and the next free slot; only touched with the lock held
+        self._slot_of = {}
+        self._next_slot = 0
+        # (entries, tuple of their values) for the last snapshot read
+        self._view = (self._entries, ())
+        self.version = 0
+        self.events = events if events is not None else EventBus()
+        # Subscribed first, so the index is current when other handlers of the same batch run
+        self.tags = TagIndex(self)
+
+    @property
+    def tasks(self):
+        return self.get_all_tasks()
+
+    @tasks.setter
+    def tasks(self, value):
+        value = tuple(value)
+        with self._lock:
+            self._slot_of = {t.id: slot for slot, t in enumerate(value)}
+            # Slots are never handed out twice, so older versions (undo) can still be restored
+            self._next_slot = max(self._next_slot, len(value))
+            self._publish(PersistentMap.from_sequence(value))
+        self.events.emit(TasksReplaced())
+
+    @property
+    def lock(self):
+        """The writer lock; hold it to make several writes atomic for other threads."""
+        return self._lock
+
+    @property
+    def entries(self):
+        """The current snapshot as a PersistentMap of slot -> task."""
+        return self._entries
+
+    def _publish(self, entries):
+        self._entries = entries
+        self.version += 1
+
+    def _find(self, task_id):
+        slot = self._slot_of.get(task_id)
+        return None if slot is None else self._entries.get(slot)
 
     def add_task(self, title_or_task, category="Personal"):
         """
@@ -24,27 +126,204 @@ class TaskManager:
             except Exception:
                 pass
 
-        self.tasks.append(task)
+        with self._lock:
+            slot = self._next_slot
+            self._next_slot += 1
+            self._slot_of[task.id] = slot
+            self._publish(self._entries.set(slot, task))
+        self.events.emit(TaskAdded(task))
         return task
 
     def delete_task(self, task_id):
-        self.tasks = [t for t in self.tasks if getattr(t, "id", None) != task_id]
+        with self._lock:
+            task = self._find(task_id)
+            if task is None:
+                return
+            self._publish(self._entries.delete(self._slot_of.pop(task_id)))
+        self.events.emit(TaskRemoved(task))
+
+    def delete_tasks(self, task_ids):
+        """Remove several tasks in one publish; returns the removed tasks."""
+        with self._lock:
+            slots = self._slots(task_ids)
+            if not slots:
+                return []
+            entries = self._entries
+            removed = []
+            for slot in slots:
+                removed.append(entries.get(slot))
+                entries = entries.delete(slot)
+            for task in removed:
+                del self._slot_of[task.id]
+            self._publish(entries)
+        for task in removed:
+            self.events.emit(TaskRemoved(task))
+        return removed
+
+    def _slots(self, task_ids):
+        """Slots of the given ids that are in the list, in list order."""
+        slot_of = self._slot_of
+        return sorted({slot_of[task_id] for task_id in task_ids if task_id in slot_of})
+
+    def _edit(self, task_ids, change):
+        """
+        Copy-on-write edit of the given tasks: `change(copy)` runs on a copy of
+        each and returns the names it changed; changed copies replace the
+        originals in a new snapshot. Call with the lock held.
+        Returns (copy, names) pairs in list order.
+        """
+        entries = self._entries
+        changes = []
+        for slot in self._slots(task_ids):
+            copy = entries.get(slot).copy()
+            names = change(copy)
+            if names:
+                entries = entries.set(slot, copy)
+                changes.append((copy, names))
+        if changes:
+            self._publish(entries)
+        return changes
+
+    def _emit_updates(self, changes):
+        for task, names in changes:
+            self.events.emit(TaskUpdated(task, names))
 
     def mark_task_done(self, task_id):
-        for t in self.tasks:
-            if getattr(t, "id", None) == task_id:
-                if hasattr(t, "mark_done"):
-                    t.mark_done()
+        with self._lock:
+            changes = self._edit((task_id,), _mark_done)
+        self._emit_updates(changes)
+
+    def mark_tasks_done(self, task_ids):
+        """Complete several tasks in one pass; returns the tasks that changed."""
+        with self._lock:
+            changes = self._edit(task_ids, lambda t: () if t.completed else _mark_done(t))
+        self._emit_updates(changes)
+        return [t for t, _ in changes]
+
+    def complete_occurrences(self, items):
+        """Complete several occurrences, given as (task_id, day) pairs, in one pass."""
+        days = {}
+        for task_id, day in items:
+            days.setdefault(task_id, []).append(day)
+
+        def complete(task):
+            for day in days[task.id]:
+                task.complete_occurrence(day)
+            return ("completed_occurrences",)
+
+        with self._lock:
+            changes = self._edit(days, complete)
+        self._emit_updates(changes)
+        return [t for t, _ in changes]
+
+    def update_tasks(self, task_ids, **fields):
+        """Set the same fields on several tasks in one pass; returns the tasks that changed."""
+        with self._lock:
+            changes = self._edit(task_ids, lambda t: t.update(**fields))
+        self._emit_updates(changes)
+        return [t for t, _ in changes]
+
+    def complete_occurrence(self, task_id, day):
+        """Record one occurrence of a recurring task as done; the series stays open."""
+        self.complete_occurrences([(task_id, day)])
+
+    def update_task(self, task_id, **fields):
+        """Change several fields of one task; returns the names that changed."""
+        with self._lock:
+            changes = self._edit((task_id,), lambda t: t.update(**fields))
+        self._emit_updates(changes)
+        return changes[0][1] if changes else []
+
+    def restore(self, changes, events=()):
+        """
+        Put tasks back into given slots (undo/redo) and announce the given
+        change events. `changes` holds (slot, task) pairs; a None task
+        empties the slot. Only those slots are touched.
+        """
+        with self._lock:
+            entries = self._entries
+            slot_of = self._slot_of
+            for slot, task in changes:
+                old = entries.get(slot)
+                if old is not None and slot_of.get(old.id) == slot:
+                    del slot_of[old.id]
+                if task is None:
+                    entries = entries.delete(slot)
                 else:
-                    setattr(t, "done", True)
-                break
+                    entries = entries.set(slot, task)
+                    slot_of[task.id] = slot
+                    self._next_slot = max(self._next_slot, slot + 1)
+            self._publish(entries)
+        for event in events:
+            self.events.emit(event)
+
+    def snapshot(self):
+        """The current immutable task tuple."""
+        return self.get_all_tasks()
 
     def get_all_tasks(self):
-        return list(self.tasks)
+        entries, view = self._view
+        current = self._entries
+        if entries is not current:
+            # One pair, so a reader racing a writer never pairs a map with another map's tuple
+            view = tuple(current.values())
+            self._view = (current, view)
+        return view
 
     def clear_all_tasks(self):
-        self.tasks = []
+        with self._lock:
+            self._slot_of = {}
+            self._publish(PersistentMap())
+        self.events.emit(TasksReplaced())
 
     # Compatibility helper used by tests
     def get_tasks(self):
-        return list(self.tasks)
+        return self.get_all_tasks()
+
+
+class TaskCounts:
+    """
+    Total/completed/pending counts kept current from change events,
+    so the status bar and stats dialog do not rescan every task.
+    """
+
+    def __init__(self, manager):
+        self.manager = manager
+        self._ids = set()
+        self._completed = set()
+        self.reset()
+        manager.events.subscribe(self._on_events, TASK_EVENTS)
+
+    def reset(self):
+        tasks = self.manager.get_all_tasks()
+        self._ids = {t.id for t in tasks}
+        self._completed = {t.id for t in tasks if getattr(t, "completed", False)}
+
+    @property
+    def total(self):
+        return len(self._ids)
+
+    @property
+    def completed(self):
+        return len(self._completed)
+
+    @property
+    def pending(self):
+        return self.total - self.completed
+
+    def _on_events(self, events):
+        # Set membership keeps this idempotent if an event overlaps a reset
+        for e in events:
+            if isinstance(e, TasksReplaced):
+                self.reset()
+                continue
+            task = e.task
+            if isinstance(e, TaskRemoved):
+                self._ids.discard(task.id)
+                self._completed.discard(task.id)
+                continue
+            self._ids.add(task.id)
+            if getattr(task, "completed", False):
+                self._completed.add(task.id)
+            else:
+                self._completed.discard(task.id)
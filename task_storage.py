@@ -1,19 +1,237 @@
+import hashlib
 import json
 import os
+from datetime import datetime
 from task import Task
+from profiling import timed
+
+
+class StorageLocked(Exception):
+    """Another process (the app or the API server) is already writing this task file."""
+
 
 class TaskStorage:
     def __init__(self, filename="tasks.json"):
         self.filename = filename
+        # task id -> (task, rev, encoded bytes) of the last time the task was written
+        self._encoded = {}
+        self._tombstones = None
+        # task id -> ISO time this file learned of the delete (locally or through sync)
+        self._recorded = {}
+        self._tombstones_dirty = False
+        # Local change sequence: task id -> [seq, digest of its encoded record ("" once deleted)]
+        self._changes = None
+        self._seq = 0
+        self._exported = None
+        self._changes_dirty = False
+        self._lock_handle = None
+
+    @property
+    def lock_file(self):
+        return self.filename + ".lock"
+
+    def acquire_lock(self):
+        """
+        Claim the task file for this process, so the app and the API server
+        never write it at the same time. The OS lock goes away with the
+        process, so a crash leaves nothing stale behind. Raises StorageLocked
+        if another process holds it.
+        """
+        if self._lock_handle is not None:
+            return
+        handle = open(self.lock_file, "a+")
+        try:
+            if os.name == "nt":
+                import msvcrt
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            raise StorageLocked(f"{self.filename} is in use by another process (the app or the API server)")
+        self._lock_handle = handle
+
+    def release_lock(self):
+        if self._lock_handle is not None:
+            self._lock_handle.close()
+            self._lock_handle = None
+
+    @property
+    def changes_file(self):
+        return os.path.splitext(self.filename)[0] + ".changes.json"
+
+    def _load_changes(self):
+        if self._changes is None:
+            self._changes = {}
+            if os.path.exists(self.changes_file):
+                with open(self.changes_file, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self._changes = data.get("tasks", {})
+                self._seq = data.get("seq", 0)
+                self._exported = data.get("exported")
+        return self._changes
+
+    def _stamp(self, task_id, digest):
+        """Give task_id the next local change number if its record differs from the last one stamped."""
+        changes = self._load_changes()
+        entry = changes.get(task_id)
+        if entry is None or entry[1] != digest:
+            self._seq += 1
+            changes[task_id] = [self._seq, digest]
+            self._changes_dirty = True
+
+    def change_seq(self, task_id=None):
+        """
+        Local change number of a task (0 if never stamped), or with no id the
+        latest one handed out. Every record this file stores or deletes, here
+        or through sync, gets a higher number than anything before it, so
+        unlike updated_at it orders changes by when they reached this file.
+        """
+        changes = self._load_changes()
+        if task_id is None:
+            return self._seq
+        entry = changes.get(task_id)
+        return entry[0] if entry else 0
+
+    def note_changes(self, tasks):
+        """Stamp tasks that changed since they were last stamped, without writing the task file."""
+        for task in tasks:
+            self._encode(task)
+
+    def mark_exported(self):
+        """
+        Record that everything up to the current change number has been
+        exported and return that number; tombstones past it are kept until
+        the next export picks them up.
+        """
+        self._load_changes()
+        self._exported = self._seq
+        self._changes_dirty = True
+        self.save_changes()
+        return self._seq
+
+    def save_changes(self):
+        if not self._changes_dirty:
+            return
+        tmp = self.changes_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"seq": self._seq, "exported": self._exported, "tasks": self._changes}, f)
+        os.replace(tmp, self.changes_file)
+        self._changes_dirty = False
+
+    @property
+    def tombstones_file(self):
+        return os.path.splitext(self.filename)[0] + ".tombstones.json"
+
+    @property
+    def tombstones(self):
+        """task id -> ISO time the task was deleted, so sync can tell deleted from never seen."""
+        if self._tombstones is None:
+            self._tombstones = {}
+            if os.path.exists(self.tombstones_file):
+                with open(self.tombstones_file, "r", encoding="utf-8") as f:
+                    for task_id, value in json.load(f).items():
+                        # Older files stored only the delete time
+                        deleted_at, recorded_at = (value, value) if isinstance(value, str) else value
+                        self._tombstones[task_id] = deleted_at
+                        self._recorded[task_id] = recorded_at
+        return self._tombstones
+
+    def add_tombstone(self, task_id, deleted_at, recorded_at=None):
+        """Record a delete (made here or received through sync); written with the next save."""
+        self.tombstones[task_id] = deleted_at
+        self._recorded[task_id] = recorded_at or datetime.now().isoformat()
+        self._tombstones_dirty = True
+        self._stamp(task_id, "")
+
+    def deleted_since(self, seq):
+        """task id -> delete time for tombstones stamped after change number `seq` (None for all)."""
+        return {task_id: deleted_at for task_id, deleted_at in self.tombstones.items()
+                if seq is None or self.change_seq(task_id) > seq}
+
+    def prune_tombstones(self, before):
+        """
+        Forget tombstones recorded before `before` (ISO time), except those
+        the last export has not picked up yet; returns how many were dropped.
+        """
+        self._load_changes()
+        old = [task_id for task_id, deleted_at in self.tombstones.items()
+               if self._recorded.get(task_id, deleted_at) < before
+               and (self._exported is None or self.change_seq(task_id) <= self._exported)]
+        for task_id in old:
+            del self._tombstones[task_id]
+            self._recorded.pop(task_id, None)
+            self._changes.pop(task_id, None)
+        if old:
+            self._tombstones_dirty = True
+            self._changes_dirty = True
+        return len(old)
+
+    def save_tombstones(self):
+        """Write the tombstone file if it changed since it was last written."""
+        if not self._tombstones_dirty:
+            return
+        data = {task_id: [deleted_at, self._recorded.get(task_id, deleted_at)]
+                for task_id, deleted_at in self.tombstones.items()}
+        tmp = self.tombstones_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.tombstones_file)
+        self._tombstones_dirty = False
+        self.save_changes()
+
+    def _encode(self, task):
+        entry = self._encoded.get(task.id)
+        rev = getattr(task, "rev", None)
+        if entry is not None and entry[0] is task and entry[1] == rev and rev is not None:
+            return entry[2]
+        # Same layout json.dump(list, indent=4) produces for a list item
+        text = json.dumps(task.to_dict(), indent=4)
+        encoded = ("    " + text.replace("\n", "\n    ")).encode("utf-8")
+        self._encoded[task.id] = (task, rev, encoded)
+        self._stamp(task.id, hashlib.blake2b(encoded, digest_size=8).hexdigest())
+        return encoded
 
+    @timed("save_tasks")
     def save_tasks(self, tasks):
-        data = [task.to_dict() for task in tasks]
-        with open(self.filename, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        """
+        Write all tasks, re-encoding only those changed since the last save;
+        the cached bytes of unchanged tasks are spliced in as they are.
+        Re-encoded tasks whose record differs from the last one stamped get
+        a new local change number. Tombstones of tasks that are live again
+        are dropped, and pending tombstones and change numbers are written
+        alongside.
+        """
+        chunks = [self._encode(task) for task in tasks]
+        ids = {task.id for task in tasks}
+        if len(self._encoded) > len(chunks):
+            self._encoded = {k: v for k, v in self._encoded.items() if k in ids}
+        data = b"[\n" + b",\n".join(chunks) + b"\n]" if chunks else b"[]"
+        tmp = self.filename + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self.filename)
+        tombstones = self.tombstones
+        if tombstones:
+            revived = [task_id for task_id in tombstones if task_id in ids]
+            for task_id in revived:
+                del tombstones[task_id]
+                self._recorded.pop(task_id, None)
+            self._tombstones_dirty = self._tombstones_dirty or bool(revived)
+        changes = self._load_changes()
+        if len(changes) > len(ids) + len(tombstones):
+            # Forget ids that are neither live nor tombstoned (archived, or dropped without a delete)
+            self._changes = {k: v for k, v in changes.items() if k in ids or k in tombstones}
+            self._changes_dirty = True
+        self.save_tombstones()
 
+    @timed("load_tasks")
     def load_tasks(self):
         if not os.path.exists(self.filename):
             return []
         with open(self.filename, "r", encoding="utf-8") as f:
             data = json.load(f)
-            return [Task.from_dict(item) for item in data]
+            tasks = [Task.from_dict(item) for item in data]
+        return tasks
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, List
+
+from category_manager import CategoryManager
+from events import TASK_EVENTS, ChangeEvent, TaskRemoved
+from task_manager import TaskManager
+from task_storage import TaskStorage
+
+
+class TaskStore:
+    """
+    Ties TaskManager, TaskStorage and CategoryManager together so changes to
+    tasks and categories can be committed as one unit:
+
+        with store.transaction():
+            category_manager.rename_category(old, new, manager)
+            store.save()
+
+    Inside the block nothing is written. On success each changed file is
+    written once (atomically, via a temp file and rename); on an exception
+    tasks and categories are rolled back and nothing is written. Starting a
+    transaction only keeps a reference to the current task snapshot, so its
+    cost does not grow with the number of tasks.
+    Nested transactions join the outermost one. Change events emitted inside
+    the block are held until commit and dropped on rollback.
+
+    With autosave, the store subscribes to the manager's events and writes the
+    task file once per delivered batch, unless that batch was already saved.
+
+    Every delivered TaskRemoved is recorded as a tombstone in the storage, so
+    sync can carry the delete to other copies. Tasks that moved to `archive`
+    were not deleted and get none.
+    """
+
+    def __init__(self, manager: TaskManager, storage: TaskStorage, category_manager: CategoryManager,
+                 autosave: bool = False, archive=None) -> None:
+        self.manager = manager
+        self.storage = storage
+        self.category_manager = category_manager
+        self.events = manager.events
+        self._depth = 0
+        self._tasks_pending = False
+        # seq of the newest event already covered by a write
+        self._saved_seq = 0
+        self.archive = archive
+        # Subscribed before autosave, so a batch's tombstones go out with its write
+        self.events.subscribe(self._on_removed, (TaskRemoved,))
+        if autosave:
+            self.events.subscribe(self._on_task_events, TASK_EVENTS)
+
+    @property
+    def in_transaction(self) -> bool:
+        return self._depth > 0
+
+    def save(self) -> None:
+        """Write the task file now, or at commit when inside a transaction."""
+        if self._depth:
+            self._tasks_pending = True
+            return
+        self._write_tasks()
+
+    def _write_tasks(self) -> None:
+        self._saved_seq = self.events.last_seq
+        self.storage.save_tasks(self.manager.get_all_tasks())
+
+    def _on_removed(self, events: List[ChangeEvent]) -> None:
+        deleted_at = datetime.now().isoformat()
+        for e in events:
+            if self.archive is None or not self.archive.is_archived(e.task.id):
+                self.storage.add_tombstone(e.task.id, deleted_at)
+
+    def _on_task_events(self, events: List[ChangeEvent]) -> None:
+        if max(e.seq for e in events) > self._saved_seq:
+            self.save()
+
+    @contextmanager
+    def transaction(self) -> Iterator["TaskStore"]:
+        if self._depth:
+            self._depth += 1
+            try:
+                yield self
+            finally:
+                self._depth -= 1
+            return
+
+        with self.manager.lock:
+            snapshot = self.manager.snapshot()
+            version = self.manager.version
+            categories = self.category_manager.get_state()
+            defer_before = self.category_manager.defer_saves
+            self.category_manager.defer_saves = True
+            self.category_manager.save_pending = False
+            self._tasks_pending = False
+            self._depth = 1
+            self.events.hold()
+            try:
+                yield self
+            except BaseException:
+                self._rollback(snapshot, categories)
+                self.events.release(discard=True)
+                raise
+            finally:
+                self._depth = 0
+                self.category_manager.defer_saves = defer_before
+            try:
+                self._commit(version)
+            finally:
+                self.events.release()
+
+    def _commit(self, version: int) -> None:
+        if self._tasks_pending or self.manager.version != version:
+            self._write_tasks()
+        self._tasks_pending = False
+        if self.category_manager.save_pending:
+            self.category_manager.save()
+
+    def _rollback(self, snapshot, categories) -> None:
+        # Task edits are copy-on-write, so the snapshot taken at the start still
+        # holds the tasks as they were; putting it back undoes every task change
+        if self.manager.snapshot() is not snapshot:
+            self.manager.tasks = snapshot
+        self.category_manager.restore_state(categories)
+        self.category_manager.save_pending = False
+        self._tasks_pending = False
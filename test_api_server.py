@@ -0,0 +1,155 @@
+import unittest
+import sys
+import os
+import json
+import asyncio
+import tempfile
+import threading
+from unittest import mock
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from api_server import TaskApiServer
+from category_manager import CategoryManager
+from events import TaskAdded, TaskUpdated
+from loadtest_api import HttpClient
+from task_manager import TaskManager
+from task_storage import TaskStorage
+
+
+class TestTaskApiServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = TaskStorage(os.path.join(self.tmp.name, "tasks.json"))
+        self.manager = TaskManager()
+        for i in range(25):
+            self.manager.add_task(f"task {i}", "Work")
+        self.categories = CategoryManager(os.path.join(self.tmp.name, "categories.json"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _run(self, scenario):
+        async def main():
+            server = TaskApiServer(self.manager, self.storage, self.categories, port=0)
+            await server.start()
+            client = HttpClient(server.host, server.port)
+            await client.connect()
+            try:
+                return await scenario(client)
+            finally:
+                await client.close()
+                await server.close()
+        return asyncio.run(main())
+
+    def test_pagination_and_etag(self):
+        async def scenario(client):
+            status, headers, body = await client.request("GET", "/tasks?offset=20&limit=10")
+            page = json.loads(body)
+            self.assertEqual(status, 200)
+            self.assertEqual(len(page["items"]), 5)
+            self.assertEqual(page["total"], 25)
+            self.assertIsNone(page["next_offset"])
+            status, _, body = await client.request("GET", "/tasks?offset=20&limit=10",
+                                                   headers={"If-None-Match": headers["etag"]})
+            self.assertEqual(status, 304)
+            self.assertEqual(body, b"")
+        self._run(scenario)
+
+    def test_batch_mutations_save_once_and_change_etag(self):
+        async def scenario(client):
+            _, headers, _ = await client.request("GET", "/tasks")
+            first = self.manager.get_all_tasks()[0]
+            ops = [{"op": "add", "title": "new one"}, {"op": "done", "id": first.id},
+                   {"op": "delete", "id": "missing"}]
+            status, _, body = await client.request("POST", "/batch", {"ops": ops})
+            results = json.loads(body)["results"]
+            self.assertEqual(status, 200)
+            self.assertEqual([r["ok"] for r in results], [True, True, False])
+            status, _, _ = await client.request("GET", "/tasks", headers={"If-None-Match": headers["etag"]})
+            self.assertEqual(status, 200)
+        self._run(scenario)
+        saved = self.storage.load_tasks()
+        self.assertEqual(len(saved), 26)
+        self.assertTrue(saved[0].completed)
+
+    def test_add_and_update_go_through_manager_events(self):
+        batches = []
+        self.manager.events.subscribe(batches.append)
+
+        async def scenario(client):
+            ops = [{"op": "add", "title": "water", "due_date": "2025-03-01", "recurrence": {"freq": "weekly"}}]
+            _, _, body = await client.request("POST", "/batch", {"ops": ops})
+            new_id = json.loads(body)["results"][0]["id"]
+            self.manager.events.flush()
+            added = [e for batch in batches for e in batch if isinstance(e, TaskAdded)]
+            self.assertEqual(len(added), 1)
+            self.assertEqual((added[0].task.due_date, added[0].task.recurrence.freq), ("2025-03-01", "weekly"))
+
+            first = self.manager.get_all_tasks()[0]
+            ops = [{"op": "update", "id": new_id, "fields": {"category": "Home"}},
+                   {"op": "update", "id": first.id, "fields": {"title": ""}}]
+            _, _, body = await client.request("POST", "/batch", {"ops": ops})
+            self.assertEqual([r["ok"] for r in json.loads(body)["results"]], [True, False])
+            self.manager.events.flush()
+            updated = [e for batch in batches for e in batch if isinstance(e, TaskUpdated)]
+            self.assertEqual([(e.task.id, e.fields) for e in updated], [(new_id, {"category"})])
+            self.assertEqual(first.title, "task 0")
+        self._run(scenario)
+
+    def test_rename_through_api_updates_tag_index(self):
+        task = self.manager.get_all_tasks()[3]
+
+        async def scenario(client):
+            ops = [{"op": "update", "id": task.id, "fields": {"title": "wash #car @weekend"}}]
+            await client.request("POST", "/batch", {"ops": ops})
+            self.manager.events.flush()
+            self.assertEqual(self.manager.tags.ids(["#car", "@weekend"]), {task.id})
+            _, _, body = await client.request("GET", "/tasks?q=%23car")
+            self.assertEqual([t["id"] for t in json.loads(body)["items"]], [task.id])
+
+            ops = [{"op": "update", "id": task.id, "fields": {"title": "wash #bike"}}]
+            await client.request("POST", "/batch", {"ops": ops})
+            self.manager.events.flush()
+            self.assertEqual(self.manager.tags.ids(["#car"]), set())
+            self.assertEqual(self.manager.tags.ids(["#bike"]), {task.id})
+        self._run(scenario)
+
+    def test_category_saves_run_off_the_event_loop(self):
+        threads = []
+        write = CategoryManager.write
+
+        def record(manager, categories):
+            threads.append(threading.current_thread())
+            return write(manager, categories)
+
+        async def scenario(client):
+            with mock.patch.object(CategoryManager, "write", record):
+                ops = [{"op": "rename_category", "old": "Work", "new": "Office"}]
+                status, _, body = await client.request("POST", "/batch", {"ops": ops})
+            self.assertEqual(json.loads(body)["results"], [{"ok": True}])
+            return threading.current_thread()
+        loop_thread = self._run(scenario)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], loop_thread)
+        self.assertIn("Office", CategoryManager(self.categories.filename).get_categories())
+        self.assertEqual({t.category for t in self.storage.load_tasks()}, {"Office"})
+
+    def test_malformed_content_length_is_rejected(self):
+        async def scenario(client):
+            status, _, body = await client.request("POST", "/batch", headers={"Content-Length": "ten"})
+            self.assertEqual(status, 400)
+            self.assertIn(b"Content-Length", body)
+        self._run(scenario)
+
+    def test_etag_differs_between_server_starts(self):
+        async def scenario(client):
+            _, headers, _ = await client.request("GET", "/tasks")
+            return headers["etag"]
+        self.assertNotEqual(self._run(scenario), self._run(scenario))
+
+
+if __name__ == "__main__":
+    unittest.main()
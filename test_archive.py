@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from archive import TaskArchive
+from task import Task
+
+
+class TestTaskArchive(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.directory = os.path.join(self.tmp.name, "archive")
+        self.now = datetime(2025, 12, 1)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _tasks(self):
+        old = Task("old", "Work", completed=True, created_at="2025-03-01T10:00:00",
+                   done_at="2025-03-02T10:00:00")
+        recent = Task("recent", completed=True, created_at="2025-11-20T10:00:00",
+                      done_at="2025-11-21T10:00:00")
+        pending = Task("pending", created_at="2025-01-01T10:00:00")
+        return [old, recent, pending]
+
+    def test_moves_only_old_completed_tasks(self):
+        archive = TaskArchive(self.directory, max_age_days=90)
+        live = archive.archive_completed(self._tasks(), now=self.now)
+        self.assertEqual([t.title for t in live], ["recent", "pending"])
+        self.assertEqual(archive.count(), 1)
+        self.assertEqual(archive.category_counts(), {"Work": 1})
+
+    def test_segments_load_lazily_by_range(self):
+        TaskArchive(self.directory, max_age_days=90).archive_completed(self._tasks(), now=self.now)
+        archive = TaskArchive(self.directory, max_age_days=90)
+        self.assertEqual(archive.count(), 1)
+        self.assertEqual(archive.load_range("2025-06-01", "2025-06-30"), [])
+        self.assertFalse(archive._loaded)
+        found = archive.load_range("2025-03-01", "2025-03-01")
+        self.assertEqual([t.title for t in found], ["old"])
+        self.assertTrue(archive.is_archived(found[0].id))
+
+    def test_is_archived_without_reading_segments(self):
+        tasks = self._tasks()
+        TaskArchive(self.directory, max_age_days=90).archive_completed(tasks, now=self.now)
+        archive = TaskArchive(self.directory, max_age_days=90)
+        self.assertTrue(archive.is_archived(tasks[0].id))
+        self.assertFalse(archive.is_archived(tasks[1].id))
+        self.assertFalse(archive._loaded)
+
+    def test_id_list_rebuilt_for_older_archives(self):
+        tasks = self._tasks()
+        TaskArchive(self.directory, max_age_days=90).archive_completed(tasks, now=self.now)
+        os.remove(os.path.join(self.directory, TaskArchive.IDS_NAME))
+        self.assertTrue(TaskArchive(self.directory, max_age_days=90).is_archived(tasks[0].id))
+        self.assertTrue(os.path.exists(os.path.join(self.directory, TaskArchive.IDS_NAME)))
+
+    def test_disabled_when_age_is_zero(self):
+        tasks = self._tasks()
+        archive = TaskArchive(self.directory, max_age_days=0)
+        self.assertIs(archive.archive_completed(tasks, now=self.now), tasks)
+        self.assertFalse(os.path.exists(self.directory))
+
+
+if __name__ == "__main__":
+    unittest.main()
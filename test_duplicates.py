@@ -0,0 +1,147 @@
+import unittest
+import sys
+import os
+import random
+import threading
+from unittest import mock
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from duplicates import DuplicateIndex, jaccard, merge_duplicates, normalize_title, shingles
+from task import Task
+from task_manager import TaskManager
+
+
+class TestDuplicateIndex(unittest.TestCase):
+    def setUp(self):
+        self.manager = TaskManager()
+        self.food = self.manager.add_task(Task("buy food", created_at="2025-01-01T08:00:00"))
+        self.manager.add_task(Task("call the dentist", created_at="2025-01-02T08:00:00"))
+        self.index = DuplicateIndex(self.manager)
+
+    def test_normalize_title(self):
+        self.assertEqual(normalize_title("  Buy   FOOD! "), "buy food")
+        self.assertGreater(jaccard(shingles("buy food"), shingles("buy foods")), 0.6)
+
+    def test_exact_and_near_matches(self):
+        exact, near = self.index.find("Buy food ")
+        self.assertEqual(exact, [self.food])
+        exact, near = self.index.find("buy foods")
+        self.assertEqual(exact, [])
+        self.assertEqual([t for _, t in near], [self.food])
+        self.assertEqual(self.index.find("walk the dog"), ([], []))
+
+    def test_index_follows_events(self):
+        task = self.manager.add_task("Buy Food")
+        self.assertEqual(len(self.index.find("buy food")[0]), 2)
+        self.manager.mark_task_done(self.food.id)
+        self.assertEqual(self.index.find("buy food")[0], [task])
+        self.manager.update_task(task.id, title="water plants")
+        self.assertEqual(self.index.find("buy food")[0], [])
+        self.manager.delete_task(task.id)
+        self.assertEqual(self.index.find("water plants")[0], [])
+        self.manager.tasks = [Task("buy food"), Task("buy food")]
+        self.assertEqual(len(self.index.find("buy food")[0]), 2)
+
+    def test_groups_and_merge(self):
+        self.manager.add_task(Task("Buy food!", created_at="2025-01-03T08:00:00", due_date="2025-01-05"))
+        self.manager.add_task(Task("buy foods", created_at="2025-01-04T08:00:00", due_date="2025-01-04"))
+        self.manager.add_task(Task("call the dentist", created_at="2025-01-05T08:00:00"))
+        groups = sorted(self.index.groups(), key=len)
+        self.assertEqual([len(g) for g in groups], [2, 3])
+        self.assertIs(groups[1][0], self.food)
+
+        kept = merge_duplicates(self.manager, groups)
+        titles = sorted(t.title for t in self.manager.get_all_tasks())
+        self.assertEqual(titles, ["buy food", "call the dentist"])
+        self.assertIn(self.food.id, [t.id for t in kept])
+        # The merged task is a new object; the one the groups listed is left as it was
+        merged = next(t for t in self.manager.get_all_tasks() if t.id == self.food.id)
+        self.assertEqual(merged.due_date, "2025-01-04")
+        self.assertIsNone(self.food.due_date)
+        self.assertEqual(self.index.groups(), [])
+
+    def test_many_distinct_titles_do_not_group(self):
+        self.manager.tasks = [Task(f"project {i} milestone {i * 7919 % 1000}") for i in range(2000)]
+        for group in self.index.groups():
+            sets = [shingles(normalize_title(t.title)) for t in group]
+            for i, own in enumerate(sets):
+                # Every member is similar enough to at least one other
+                self.assertTrue(any(jaccard(own, other) >= self.index.threshold
+                                    for j, other in enumerate(sets) if j != i))
+        self.assertEqual(len(self.index), 2000)
+
+    def test_groups_find_nearly_every_similar_pair(self):
+        rng = random.Random(7)
+        words = ["book", "boss", "friday", "call", "mom", "report", "send", "invoice",
+                 "fix", "bike", "buy", "milk", "plan", "trip", "review", "draft"]
+        titles = []
+        for _ in range(150):
+            base = " ".join(rng.sample(words, 3))
+            titles.append(base)
+            for _ in range(2):
+                i = rng.randrange(len(base))
+                titles.append(base[:i] + rng.choice("abcdefs") + base[i:])
+        self.manager.tasks = [Task(title) for title in titles]
+        group_of = {}
+        for n, group in enumerate(self.index.groups()):
+            for task in group:
+                group_of[normalize_title(task.title)] = n
+        # Brute force: every pair of distinct titles at or above the threshold
+        norms = sorted({normalize_title(title) for title in titles})
+        pairs = [(a, b) for i, a in enumerate(norms) for b in norms[i + 1:]
+                 if jaccard(shingles(a), shingles(b)) >= self.index.threshold]
+        found = sum(1 for a, b in pairs if a in group_of and group_of[a] == group_of.get(b))
+        self.assertGreater(len(pairs), 100)
+        self.assertGreaterEqual(found / len(pairs), 0.95)
+
+    def test_groups_reports_progress_and_can_be_cancelled(self):
+        self.manager.tasks = [Task(f"errand {i}") for i in range(2500)]
+        seen = []
+        self.assertIsNotNone(self.index.groups(progress=lambda done, total: seen.append((done, total))))
+        self.assertEqual(seen, [(1000, 2500), (2000, 2500)])
+        self.assertIsNone(self.index.groups(cancelled=lambda: True))
+        # A cancelled scan leaves the index following events
+        task = self.manager.add_task("errand 1")
+        self.assertIn(task, self.index.find("errand 1")[0])
+
+
+class TestBackgroundBuild(unittest.TestCase):
+    def test_events_during_build_are_applied_after_it(self):
+        manager = TaskManager()
+        food = manager.add_task(Task("buy food", created_at="2025-01-01T08:00:00"))
+        manager.add_task(Task("walk the dog", created_at="2025-01-02T08:00:00"))
+        gate = threading.Event()
+        build = DuplicateIndex.rebuild
+
+        def held_build(index, tasks):
+            gate.wait(5)
+            build(index, tasks)
+
+        with mock.patch.object(DuplicateIndex, "rebuild", held_build):
+            index = DuplicateIndex(manager, background=True)
+            self.assertEqual(index.find("buy food"), ([], []))
+            twin = manager.add_task(Task("Buy food!", created_at="2025-01-03T08:00:00"))
+            manager.update_task(food.id, category="Work")
+            renamed = manager.update_tasks([t.id for t in manager.get_all_tasks()[1:2]], title="walk the cat")[0]
+            gate.set()
+            self.assertTrue(index.wait_ready(5))
+        groups = index.groups()
+        self.assertEqual([[t.id for t in g] for g in groups], [[food.id, twin.id]])
+        self.assertEqual(groups[0][0].category, "Work")
+        self.assertEqual(index.find("walk the cat")[0], [renamed])
+        self.assertEqual(index.find("walk the dog")[0], [])
+
+    def test_replaced_list_is_rebuilt_in_background(self):
+        manager = TaskManager()
+        index = DuplicateIndex(manager, background=True)
+        self.assertTrue(index.wait_ready(5))
+        manager.tasks = [Task("pay rent"), Task("pay  rent")]
+        self.assertTrue(index.wait_ready(5))
+        self.assertEqual(len(index.find("pay rent")[0]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
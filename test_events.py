@@ -0,0 +1,146 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from category_manager import CategoryManager
+from events import (ALL_FIELDS, CategoryRenamed, EventBus, TaskAdded, TaskRemoved, TasksReplaced,
+                    TaskUpdated, coalesce)
+from task import Task
+from task_manager import TaskCounts, TaskManager
+from task_storage import TaskStorage
+from task_store import TaskStore
+
+
+class TestCoalesce(unittest.TestCase):
+    def setUp(self):
+        self.a = Task("a")
+        self.b = Task("b")
+
+    def test_add_then_update_is_add(self):
+        out = coalesce([TaskAdded(self.a), TaskUpdated(self.a, ["title"])])
+        self.assertEqual(len(out), 1)
+        self.assertIsInstance(out[0], TaskAdded)
+
+    def test_add_then_remove_cancels(self):
+        out = coalesce([TaskAdded(self.a), TaskUpdated(self.a, ["title"]), TaskRemoved(self.a),
+                        TaskAdded(self.b)])
+        self.assertEqual([type(e) for e in out], [TaskAdded])
+        self.assertIs(out[0].task, self.b)
+
+    def test_updates_merge_fields(self):
+        out = coalesce([TaskUpdated(self.a, ["title"]), TaskUpdated(self.a, ["completed", "done_at"])])
+        self.assertEqual(len(out), 1)
+        self.assertEqual(out[0].fields, {"title", "completed", "done_at"})
+
+    def test_remove_then_add_is_full_update(self):
+        out = coalesce([TaskRemoved(self.a), TaskAdded(self.a)])
+        self.assertIsInstance(out[0], TaskUpdated)
+        self.assertEqual(out[0].fields, ALL_FIELDS)
+
+    def test_replace_drops_earlier_task_events(self):
+        out = coalesce([TaskAdded(self.a), CategoryRenamed("x", "y"), TasksReplaced(), TaskAdded(self.b)])
+        self.assertEqual([type(e) for e in out], [CategoryRenamed, TasksReplaced, TaskAdded])
+
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.queue = []
+        self.bus = EventBus(scheduler=self.queue.append)
+        self.batches = []
+        self.bus.subscribe(self.batches.append)
+
+    def test_emits_are_batched_until_scheduler_runs(self):
+        manager = TaskManager(self.bus)
+        task = manager.add_task("a")
+        manager.mark_task_done(task.id)
+        self.assertEqual(self.batches, [])
+        self.assertEqual(len(self.queue), 1)
+        self.queue.pop()()
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual([type(e) for e in self.batches[0]], [TaskAdded])
+
+    def test_kinds_filter_and_unsubscribe(self):
+        removed = []
+        unsubscribe = self.bus.subscribe(removed.append, [TaskRemoved])
+        self.bus.emit(TaskAdded(Task("a")))
+        self.queue.pop()()
+        self.assertEqual(removed, [])
+        unsubscribe()
+        self.bus.emit(TaskRemoved(Task("b")))
+        self.queue.pop()()
+        self.assertEqual(removed, [])
+        self.assertEqual(len(self.batches), 2)
+
+    def test_discarded_hold_delivers_nothing(self):
+        self.bus.hold()
+        self.bus.emit(TaskAdded(Task("a")))
+        self.bus.release(discard=True)
+        self.assertEqual(self.queue, [])
+        self.assertEqual(self.batches, [])
+
+    def test_failing_handler_does_not_stop_delivery(self):
+        def broken(events):
+            raise ValueError("boom")
+        later = []
+        self.bus.subscribe(broken)
+        self.bus.subscribe(later.append)
+        with self.assertLogs("events", level="ERROR"):
+            self.bus.emit(TaskAdded(Task("a")))
+            self.queue.pop()()
+        self.assertEqual(len(self.batches), 1)
+        self.assertEqual(len(later), 1)
+
+
+class TestEventSubscribers(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = TaskStorage(os.path.join(self.tmp.name, "tasks.json"))
+        self.categories = CategoryManager(os.path.join(self.tmp.name, "categories.json"))
+        self.manager = TaskManager()
+        self.categories.events = self.manager.events
+        self.store = TaskStore(self.manager, self.storage, self.categories, autosave=True)
+        self.counts = TaskCounts(self.manager)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_autosave_writes_once_per_change(self):
+        with mock.patch.object(self.storage, "save_tasks", wraps=self.storage.save_tasks) as save_tasks:
+            task = self.manager.add_task("a", "Work")
+            self.manager.mark_task_done(task.id)
+            self.assertEqual(save_tasks.call_count, 2)
+            with self.store.transaction():
+                self.manager.add_task("b", "Work")
+                self.manager.add_task("c", "Work")
+            self.assertEqual(save_tasks.call_count, 3)
+        self.assertEqual(len(self.storage.load_tasks()), 3)
+
+    def test_counts_follow_events(self):
+        a = self.manager.add_task("a", "Work")
+        self.manager.add_task("b", "Work")
+        self.manager.mark_task_done(a.id)
+        self.assertEqual((self.counts.total, self.counts.completed, self.counts.pending), (2, 1, 1))
+        self.manager.delete_task(a.id)
+        self.assertEqual((self.counts.total, self.counts.completed), (1, 0))
+        self.manager.clear_all_tasks()
+        self.assertEqual(self.counts.total, 0)
+
+    def test_rename_category_reports_retagged_tasks(self):
+        batches = []
+        self.manager.events.subscribe(batches.append)
+        task = self.manager.add_task("a", "Work")
+        self.categories.rename_category("Work", "Office", self.manager)
+        updated = [e for batch in batches for e in batch if isinstance(e, TaskUpdated)]
+        self.assertEqual([(e.task.id, e.fields) for e in updated], [(task.id, {"category"})])
+        self.assertIs(updated[0].task, self.manager.get_all_tasks()[0])
+        self.assertEqual(task.category, "Work")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,181 @@
+import unittest
+import sys
+import os
+import random
+import tempfile
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from category_manager import CategoryManager
+from events import EventBus, TaskUpdated
+from history import TaskHistory
+from persistent import PersistentMap
+from sync import sync
+from task import Task
+from task_manager import TaskManager
+from task_storage import TaskStorage
+from task_store import TaskStore
+
+
+class TestPersistentMap(unittest.TestCase):
+    def test_matches_dict_across_versions(self):
+        rng = random.Random(3)
+        model, current = {}, PersistentMap()
+        versions = [(dict(model), current)]
+        for _ in range(3000):
+            key = rng.randrange(5000)
+            if rng.random() < 0.3:
+                model.pop(key, None)
+                current = current.delete(key)
+            else:
+                model[key] = rng.random()
+                current = current.set(key, model[key])
+            versions.append((dict(model), current))
+        for expected, pmap in versions[::250]:
+            self.assertEqual(dict(pmap.items()), expected)
+            self.assertEqual(list(pmap), sorted(expected))
+            self.assertEqual(len(pmap), len(expected))
+
+    def test_set_shares_untouched_nodes(self):
+        base = PersistentMap.from_items((i, i) for i in range(2000))
+        changed = base.set(5, "x")
+        self.assertEqual(base.get(5), 5)
+        self.assertEqual(changed.get(5), "x")
+        self.assertIs(base._root[1], changed._root[1])
+
+    def test_diff_reports_only_changes(self):
+        base = PersistentMap.from_items((i, i) for i in range(1000))
+        other = base.set(3, "x").delete(500).set(40000, "new")
+        self.assertEqual(sorted(base.diff(other)), [(3, 3, "x"), (500, 500, None), (40000, None, "new")])
+        self.assertEqual(list(base.diff(base)), [])
+
+    def test_from_sequence_matches_set(self):
+        for n in (0, 1, 32, 33, 1025, 40000):
+            values = [object() for _ in range(n)]
+            built = PersistentMap.from_sequence(values)
+            self.assertEqual(list(built.items()), list(PersistentMap.from_items(enumerate(values)).items()))
+            self.assertEqual(len(built), n)
+            self.assertEqual(built.set(n, "x").get(n), "x")
+
+    def test_none_values_rejected(self):
+        with self.assertRaises(ValueError):
+            PersistentMap().set(1, None)
+
+
+class TestTaskHistory(unittest.TestCase):
+    def setUp(self):
+        self.events = EventBus()
+        self.manager = TaskManager(self.events)
+        self.categories = CategoryManager(None, events=self.events)
+        self.history = TaskHistory(self.manager, self.categories, depth=3)
+
+    def titles(self):
+        return [t.title for t in self.manager.get_all_tasks()]
+
+    def test_undo_redo_add_delete_edit(self):
+        a = self.manager.add_task("a")
+        b = self.manager.add_task("b")
+        self.manager.update_task(a.id, title="a2")
+        self.manager.delete_task(b.id)
+        self.assertEqual(self.titles(), ["a2"])
+
+        self.history.undo()
+        self.assertEqual(self.titles(), ["a2", "b"])
+        self.history.undo()
+        self.assertEqual(self.titles(), ["a", "b"])
+        self.history.redo()
+        self.history.redo()
+        self.assertEqual(self.titles(), ["a2"])
+        self.assertFalse(self.history.can_redo())
+
+    def test_undo_emits_events_but_is_not_recorded(self):
+        seen = []
+        self.events.subscribe(seen.extend)
+        task = self.manager.add_task("a")
+        self.manager.update_task(task.id, category="Work")
+        before = len(self.history.versions())
+        seen.clear()
+        self.history.undo()
+        self.assertEqual(len(self.history.versions()), before - 1)
+        self.assertEqual(len(seen), 1)
+        self.assertIsInstance(seen[0], TaskUpdated)
+        self.assertIn("category", seen[0].fields)
+
+    def test_new_change_clears_redo(self):
+        self.manager.add_task("a")
+        self.history.undo()
+        self.manager.add_task("b")
+        self.assertFalse(self.history.can_redo())
+        self.assertEqual(self.history.redo(), None)
+
+    def test_depth_bounds_undo(self):
+        for i in range(6):
+            self.manager.add_task(str(i))
+        undone = 0
+        while self.history.undo():
+            undone += 1
+        self.assertEqual(undone, 3)
+        self.assertEqual(self.titles(), ["0", "1", "2"])
+
+    def test_tasks_at_version(self):
+        task = self.manager.add_task("a")
+        number = self.manager.version
+        self.manager.update_task(task.id, title="b")
+        self.manager.add_task("c")
+        old = self.history.tasks_at(number)
+        self.assertEqual([t.title for t in old], ["a"])
+        self.assertIsNot(old[0], task)
+        self.assertEqual(old[0].id, task.id)
+        self.assertEqual(self.titles(), ["b", "c"])
+
+    def test_undone_edit_wins_the_next_sync(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = TaskStorage(os.path.join(tmp, "a.json"))
+            peer = TaskStorage(os.path.join(tmp, "b.json"))
+            TaskStore(self.manager, storage, self.categories, autosave=True)
+            task = self.manager.add_task("a")
+            sync(storage, peer)
+            self.manager.update_task(task.id, title="a2")
+            sync(storage, peer)
+            self.assertEqual([t.title for t in peer.load_tasks()], ["a2"])
+            self.history.undo()
+            self.assertGreater(self.manager.get_all_tasks()[0].updated_at, task.updated_at)
+            report = sync(storage, peer)
+            self.assertEqual(report.to_b, 1)
+            self.assertEqual([t.title for t in peer.load_tasks()], ["a"])
+            self.assertEqual(self.titles(), ["a"])
+            # Redo is a change like any other
+            self.history.redo()
+            sync(storage, peer)
+            self.assertEqual([t.title for t in peer.load_tasks()], ["a2"])
+
+    def test_undo_puts_back_only_what_changed(self):
+        manager = TaskManager(EventBus())
+        manager.tasks = [Task(str(i)) for i in range(2000)]
+        history = TaskHistory(manager, depth=3)
+        # Versions hold the manager's own snapshot, not a copy of it
+        self.assertIs(history.versions()[0].entries, manager.entries)
+        before = manager.get_all_tasks()
+        manager.update_task(before[7].id, title="x")
+        history.undo()
+        after = manager.get_all_tasks()
+        self.assertEqual(after[7].title, "7")
+        self.assertEqual([i for i in range(2000) if after[i] is not before[i]], [7])
+        self.assertEqual(len(list(manager.entries.diff(history.versions()[0].entries))), 0)
+
+    def test_replaced_list_and_categories(self):
+        self.manager.add_task("a")
+        self.manager.tasks = [Task("x"), Task("y")]
+        self.categories.add_category("Errands")
+        self.history.undo()
+        self.assertNotIn("Errands", self.categories.get_categories())
+        self.history.undo()
+        self.assertEqual(self.titles(), ["a"])
+        self.history.redo()
+        self.assertEqual(self.titles(), ["x", "y"])
+
+
+if __name__ == "__main__":
+    unittest.main()
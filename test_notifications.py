@@ -0,0 +1,58 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from notifications import NotificationCenter
+from recurrence import RecurrenceRule
+from task import Task
+
+
+class TestNotificationCenter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "notifications.json")
+        self.now = datetime(2025, 9, 10, 9, 0)
+        self.tasks = [Task(f"due {i}", due_date="2025-09-09") for i in range(3000)]
+        self.tasks.append(Task("later", due_date="2025-09-20"))
+        self.tasks.append(Task("daily", due_date="2025-09-08", recurrence=RecurrenceRule("daily")))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_groups_due_tasks_and_remembers_announcements(self):
+        center = NotificationCenter(self.path)
+        items = center.pending(self.tasks, self.now)
+        # 3000 plain tasks plus three daily occurrences (8th to 10th)
+        self.assertEqual(len(items), 3003)
+        center.mark_announced(k for k, _ in items)
+
+        restarted = NotificationCenter(self.path)
+        items = restarted.pending(self.tasks, self.now)
+        self.assertEqual(restarted.unannounced(items), [])
+
+    def test_dismiss_and_snooze(self):
+        center = NotificationCenter(self.path)
+        items = center.pending(self.tasks, self.now)
+        center.mark_announced(k for k, _ in items)
+        center.dismiss([items[0][0]])
+        center.snooze([items[1][0]], minutes=30, now=self.now)
+        self.assertEqual(len(center.pending(self.tasks, self.now)), len(items) - 2)
+        later = center.pending(self.tasks, datetime(2025, 9, 10, 10, 0))
+        self.assertEqual([k for k, _ in center.unannounced(later)], [items[1][0]])
+
+    def test_rate_limit(self):
+        center = NotificationCenter(None, min_interval=60)
+        self.assertTrue(center.may_announce(1000.0))
+        center.mark_announced([], now=1000.0)
+        self.assertFalse(center.may_announce(1030.0))
+        self.assertTrue(center.may_announce(1061.0))
+
+
+if __name__ == "__main__":
+    unittest.main()
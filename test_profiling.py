@@ -0,0 +1,39 @@
+import unittest
+import sys
+import os
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from profiling import Profiler, percentile
+
+
+class TestProfiler(unittest.TestCase):
+    def test_disabled_records_nothing(self):
+        prof = Profiler()
+        work = prof.timed("work")(lambda x: x * 2)
+        self.assertEqual(work(2), 4)
+        self.assertEqual(prof.report(), {})
+
+    def test_enabled_records_percentiles(self):
+        prof = Profiler(enabled=True)
+        for ms in range(1, 101):
+            prof.record("save_tasks", ms / 1000.0)
+        stats = prof.report()["save_tasks"]
+        self.assertEqual(stats["count"], 100)
+        self.assertAlmostEqual(stats["p50_ms"], 51.0)
+        self.assertAlmostEqual(stats["p99_ms"], 99.0)
+        self.assertEqual(percentile([], 50), 0.0)
+
+    def test_profile_action_runs_cprofile(self):
+        prof = Profiler(enabled=True)
+        prof.profile_action = "work"
+        work = prof.timed("work")(lambda: sum(range(100)))
+        work()
+        self.assertIsNotNone(prof._cprofile)
+        self.assertEqual(prof.report()["work"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+from datetime import date
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from recurrence import Occurrence, RecurrenceRule
+from task import Task
+from task_manager import TaskManager, filter_tasks
+
+
+class TestRecurrence(unittest.TestCase):
+    def test_weekly_on_weekdays_within_window(self):
+        rule = RecurrenceRule("weekly", weekdays=[0, 2])
+        days = list(rule.occurrences("2025-09-01", "2025-09-08", "2025-09-14"))
+        self.assertEqual(days, [date(2025, 9, 8), date(2025, 9, 10)])
+
+    def test_count_and_until_bound_the_series(self):
+        self.assertEqual(len(list(RecurrenceRule("daily", count=3).occurrences(
+            "2025-01-01", "2024-01-01", "2026-01-01"))), 3)
+        self.assertEqual(list(RecurrenceRule("daily", until="2025-01-02").occurrences(
+            "2025-01-01", "2025-01-02", "2025-12-31")), [date(2025, 1, 2)])
+
+    def test_monthly_skips_short_months(self):
+        days = list(RecurrenceRule("monthly").occurrences("2025-01-31", "2025-01-01", "2025-05-31"))
+        self.assertEqual([d.month for d in days], [1, 3, 5])
+
+    def test_far_window_does_not_walk_from_start(self):
+        rule = RecurrenceRule("daily")
+        gen = rule._iter(date(2000, 1, 1), date(2100, 1, 1))
+        self.assertEqual(next(gen), date(2100, 1, 1))
+
+    def test_completing_occurrence_records_exception_only(self):
+        manager = TaskManager()
+        task = manager.add_task(Task("water plants", due_date="2025-09-01",
+                                     recurrence=RecurrenceRule("daily")))
+        manager.complete_occurrence(task.id, "2025-09-03")
+        task = manager.get_all_tasks()[0]
+        shown = filter_tasks(manager.get_all_tasks(), "2025-09-03")
+        self.assertIsInstance(shown[0], Occurrence)
+        self.assertTrue(shown[0].completed)
+        self.assertFalse(task.completed)
+        self.assertFalse(filter_tasks(manager.get_all_tasks(), "2025-09-04")[0].completed)
+
+        restored = Task.from_dict(task.to_dict())
+        self.assertEqual(restored.completed_occurrences, {"2025-09-03"})
+        self.assertEqual(restored.recurrence.freq, "daily")
+        self.assertNotIn("recurrence", Task("plain").to_dict())
+
+
+if __name__ == "__main__":
+    unittest.main()
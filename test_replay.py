@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import tempfile
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from replay import Replayer, parse_log, replay, seed_tasks
+
+TRACE = """\
+[2025-08-17 20:33:49] Task Added: buy food
+[2025-08-17 20:34:06] Task Added: car wash
+[2025-08-17 20:34:15] Task Deleted: car wash
+[2025-08-17 20:34:23] Filter: Today
+[2025-08-17 20:34:29] Task Completed: buy food
+[2025-08-17 20:35:01] Task Edited: buy more food
+[2025-08-17 20:35:10] Search: food
+[2025-08-17 20:35:20] Category Renamed: Work -> Office
+[2025-08-17 20:35:30] Tasks Exported: tasks_20250817_203530.csv
+not a log line
+"""
+
+
+class TestReplay(unittest.TestCase):
+    def test_parse_log(self):
+        entries, skipped = parse_log(TRACE.splitlines())
+        self.assertEqual(len(entries), 9)
+        self.assertEqual(skipped, 1)
+        self.assertEqual(entries[7].action, "Category Renamed")
+        self.assertEqual(entries[7].arg, "Work -> Office")
+        self.assertEqual(entries[0].timestamp.hour, 20)
+
+    def test_replay_applies_trace(self):
+        entries, _ = parse_log(TRACE.splitlines())
+        with tempfile.TemporaryDirectory() as tmp:
+            replayer = Replayer(tmp)
+            report = replayer.run(entries)
+            titles = {t.title: t for t in replayer.manager.get_all_tasks()}
+            self.assertEqual(set(titles), {"buy more food"})
+            self.assertTrue(titles["buy more food"].completed)
+            self.assertIn("Office", replayer.category_manager.get_categories())
+            # "Today" is the day of the entry; the search keeps matching the edited task
+            self.assertEqual([row.title for row in replayer.rows], ["buy more food"])
+            self.assertTrue(os.path.exists(os.path.join(tmp, "export.csv")))
+            self.assertEqual(len(replayer.storage.load_tasks()), 1)
+        self.assertEqual(report["Task Added"]["count"], 2)
+        self.assertEqual(report["Filter"]["count"], 1)
+
+    def test_tag_search_looks_at_every_date(self):
+        trace = [
+            "[2025-08-16 09:00:00] Task Added: wash #car",
+            "[2025-08-17 09:00:00] Task Added: car keys",
+            "[2025-08-17 09:00:10] Search: #car",
+        ]
+        entries, _ = parse_log(trace)
+        with tempfile.TemporaryDirectory() as tmp:
+            replayer = Replayer(tmp)
+            replayer.run(entries)
+            self.assertEqual(replayer.view[0], None)
+            self.assertEqual([row.title for row in replayer.rows], ["wash #car"])
+
+    def test_batched_entries(self):
+        trace = TRACE.splitlines()[:2] + [
+            '[2025-08-17 20:36:00] Tasks Recategorized: {"category": "Errands", "titles": ["buy food", "car wash"]}',
+            '[2025-08-17 20:36:10] Tasks Completed: {"titles": ["buy food", "car wash"]}',
+            '[2025-08-17 20:36:20] Tasks Deleted: {"titles": ["car wash"]}',
+        ]
+        entries, _ = parse_log(trace)
+        with tempfile.TemporaryDirectory() as tmp:
+            replayer = Replayer(tmp)
+            report = replayer.run(entries)
+            tasks = replayer.manager.get_all_tasks()
+            self.assertEqual([(t.title, t.category, t.completed) for t in tasks], [("buy food", "Errands", True)])
+        self.assertEqual(report["Tasks Completed"]["count"], 1)
+
+    def test_seeded_replay_reports_every_action(self):
+        entries, _ = parse_log(TRACE.splitlines())
+        report = replay(entries, tasks=200, repeat=2)
+        self.assertEqual(report["Task Added"]["count"], 4)
+        self.assertEqual(len(report), 8)
+
+    def test_seed_tasks_covers_trace_categories(self):
+        entries, _ = parse_log(TRACE.splitlines())
+        with tempfile.TemporaryDirectory() as tmp:
+            replayer = Replayer(tmp)
+            seed_tasks(replayer.manager, 300, entries)
+            self.assertEqual(len(replayer.manager.get_all_tasks()), 300)
+            self.assertIn("Office", {t.category for t in replayer.manager.get_all_tasks()})
+
+
+if __name__ == '__main__':
+    unittest.main()
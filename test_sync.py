@@ -0,0 +1,143 @@
+import unittest
+import sys
+import os
+import tempfile
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from archive import TaskArchive
+from category_manager import CategoryManager
+from sync import HashTree, sync
+from task import Task
+from task_manager import TaskManager
+from task_storage import TaskStorage
+from task_store import TaskStore
+
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.a = self.storage("a")
+        self.b = self.storage("b")
+        self.tasks = [Task(f"t{i}", created_at=f"2025-01-01T00:00:{i:02d}") for i in range(40)]
+        self.a.save_tasks(self.tasks)
+        sync(self.a, self.b)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def storage(self, name):
+        """A task file in its own directory, the way the app lays one out."""
+        os.makedirs(os.path.join(self.tmp.name, name))
+        return TaskStorage(os.path.join(self.tmp.name, name, "tasks.json"))
+
+    def titles(self, storage):
+        return sorted(t.title for t in TaskStorage(storage.filename).load_tasks())
+
+    def edit(self, storage, index, when, **fields):
+        tasks = storage.load_tasks()
+        tasks[index].update(**fields)
+        tasks[index].updated_at = when
+        storage.save_tasks(tasks)
+
+    def test_first_sync_copies_everything(self):
+        self.assertEqual(self.titles(self.b), self.titles(self.a))
+        report = sync(self.a, self.b)
+        self.assertEqual(report.compared, 0)
+
+    def test_only_changed_records_are_compared(self):
+        self.edit(self.a, 3, "2025-02-01T00:00:00", title="renamed")
+        report = sync(self.a, self.b)
+        self.assertEqual((report.compared, report.to_a, report.to_b), (1, 0, 1))
+        self.assertIn("renamed", self.titles(self.b))
+        self.assertEqual(report.conflicts, [])
+
+    def delete(self, storage, index, archive=None):
+        """Delete a task the way the app does: TaskRemoved through a TaskStore."""
+        manager = TaskManager()
+        manager.tasks = storage.load_tasks()
+        TaskStore(manager, storage, CategoryManager(None), autosave=True, archive=archive)
+        task = manager.get_all_tasks()[index]
+        manager.delete_task(task.id)
+        manager.events.flush()
+        return task
+
+    def test_delete_travels_as_tombstone(self):
+        task = self.delete(self.a, 0)
+        self.assertIn(task.id, self.a.tombstones)
+        sync(self.a, self.b)
+        self.assertNotIn("t0", self.titles(self.b))
+        # Syncing again must not bring it back
+        sync(self.b, self.a)
+        self.assertNotIn("t0", self.titles(self.a))
+
+    def test_only_real_deletes_leave_tombstones(self):
+        archive = TaskArchive(os.path.join(self.tmp.name, "a", "archive"), max_age_days=1)
+        tasks = self.a.load_tasks()
+        tasks[1].mark_done()
+        tasks[1].done_at = "2025-01-02T00:00:00"
+        archive.archive_completed(tasks)
+        self.delete(self.a, 1, archive)
+        # Dropped from the file without a delete (e.g. archived at start-up)
+        self.a.save_tasks(self.a.load_tasks()[1:])
+        self.assertEqual(TaskStorage(self.a.filename).tombstones, {})
+        sync(self.a, self.b)
+        self.assertEqual(TaskStorage(self.b.filename).tombstones, {})
+        # The archived task stays out of both live files, and b archives its own copy
+        for storage in (self.a, self.b):
+            self.assertNotIn("t1", self.titles(storage))
+        self.assertEqual(TaskArchive(archive.directory).count(), 1)
+        self.assertTrue(TaskArchive(os.path.join(self.tmp.name, "b", "archive")).is_archived(tasks[1].id))
+        sync(self.b, self.a)
+        self.assertNotIn("t1", self.titles(self.a))
+        self.assertEqual(TaskArchive(archive.directory).count(), 1)
+
+    def test_tombstones_pruned_once_every_peer_was_synced(self):
+        c = self.storage("c")
+        sync(self.a, c)
+        task = self.delete(self.a, 0)
+        sync(self.a, self.b)
+        # c has not been offered the delete yet
+        self.assertIn(task.id, TaskStorage(self.a.filename).tombstones)
+        sync(self.a, c)
+        self.assertNotIn("t0", self.titles(c))
+        self.assertNotIn(task.id, TaskStorage(self.a.filename).tombstones)
+        # b and c still hold it until they have synced with their own peers again
+        sync(self.b, self.a)
+        sync(c, self.a)
+        for storage in (self.a, self.b, c):
+            self.assertEqual(TaskStorage(storage.filename).tombstones, {})
+            self.assertNotIn("t0", self.titles(storage))
+
+    def test_last_writer_wins_and_conflict_is_reported(self):
+        self.edit(self.a, 5, "2999-01-01T00:00:00", title="from a")
+        self.edit(self.b, 5, "2999-01-02T00:00:00", title="from b")
+        report = sync(self.a, self.b)
+        self.assertEqual(len(report.conflicts), 1)
+        self.assertEqual(report.conflicts[0].winner, "b")
+        self.assertIn("from b", self.titles(self.a))
+        self.assertNotIn("from a", self.titles(self.b))
+
+
+class TestHashTree(unittest.TestCase):
+    def test_diff_finds_changed_missing_and_extra(self):
+        records = {f"id{i}": bytes([i % 256]) * 20 for i in range(1000)}
+        other = dict(records, id5=b"x" * 20, extra=b"y" * 20)
+        del other["id9"]
+        self.assertEqual(sorted(HashTree(records).diff(HashTree(other))), ["extra", "id5", "id9"])
+        self.assertEqual(HashTree(records).root, HashTree(dict(records)).root)
+
+
+class TestUpdatedAt(unittest.TestCase):
+    def test_changes_bump_updated_at(self):
+        task = Task("a", created_at="2025-01-01T00:00:00")
+        self.assertEqual(task.updated_at, "2025-01-01T00:00:00")
+        task.update(title="b")
+        self.assertGreater(task.updated_at, "2025-01-01T00:00:00")
+        self.assertEqual(Task.from_dict(task.to_dict()).updated_at, task.updated_at)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import unittest
+import sys
+import os
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from events import EventBus
+from tags import parse_query, parse_tags
+from task import Task
+from task_manager import TaskManager, filter_tasks
+
+
+class TestParsing(unittest.TestCase):
+    def test_parse_tags(self):
+        self.assertEqual(parse_tags("#Car wash"), {"#car"})
+        self.assertEqual(parse_tags("report @work, #q3-review"), {"@work", "#q3-review"})
+        self.assertEqual(parse_tags("mail bob@example.com"), set())
+        self.assertEqual(parse_tags("no tags here"), set())
+
+    def test_parse_query(self):
+        self.assertEqual(parse_query("#car @Work oil"), (["#car", "@work"], False, "oil"))
+        self.assertEqual(parse_query("#car | #home"), (["#car", "#home"], True, ""))
+        self.assertEqual(parse_query("cats OR dogs"), ([], False, "cats OR dogs"))
+
+
+class TestTagIndex(unittest.TestCase):
+    def setUp(self):
+        self.manager = TaskManager(EventBus())
+        self.car = self.manager.add_task("#car wash @weekend")
+        self.report = self.manager.add_task("report @work")
+        self.plain = self.manager.add_task("plain")
+        self.index = self.manager.tags
+
+    def test_and_or_queries(self):
+        self.assertEqual(self.index.ids(["#car", "@weekend"]), {self.car.id})
+        self.assertEqual(self.index.ids(["#car", "@work"]), set())
+        self.assertEqual(self.index.ids(["#car", "@work"], match_any=True), {self.car.id, self.report.id})
+        self.assertEqual(self.index.filter(self.manager.get_all_tasks(), ["@work", "#car"], True),
+                         [self.car, self.report])
+
+    def test_follows_edits_and_deletes(self):
+        self.manager.update_task(self.plain.id, title="now #car too")
+        self.manager.update_task(self.car.id, title="car wash")
+        self.assertEqual(self.index.ids(["#car"]), {self.plain.id})
+        self.manager.delete_task(self.report.id)
+        self.assertEqual(self.index.counts(), {"#car": 1})
+        self.manager.tasks = [Task("#a"), Task("#a #b")]
+        self.assertEqual(self.index.counts(), {"#a": 2, "#b": 1})
+
+    def test_filter_tasks_understands_tags(self):
+        tasks = self.manager.get_all_tasks()
+        self.assertEqual(filter_tasks(tasks, search_term="#car @weekend"), [self.car])
+        self.assertEqual(filter_tasks(tasks, search_term="@work | #car wash"), [self.car])
+        self.assertEqual(filter_tasks(tasks, search_term="plain"), [self.plain])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+import sys
+import os
+import csv
+import tempfile
+from datetime import datetime
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from sync import sync
+from task import Task
+from task_exporter import CHANGES_HEADER, CSV_HEADER, IncrementalExporter
+from task_storage import TaskStorage
+
+
+class TestIncrementalExporter(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = TaskStorage(self.path("tasks.json"))
+        self.exporter = IncrementalExporter(self.storage, self.path("state.json"))
+        self.tasks = [Task(f"t{i}", created_at="2025-01-01T00:00:00") for i in range(10)]
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def read(self, path):
+        with open(path, newline="", encoding="utf-8") as f:
+            return list(csv.reader(f))
+
+    def test_first_export_is_a_baseline(self):
+        path, counts = self.exporter.export(self.tasks, self.path("a.csv"))
+        rows = self.read(path)
+        self.assertEqual(rows[0], CSV_HEADER)
+        self.assertEqual(len(rows), 11)
+        self.assertEqual(counts, {"added": 10})
+        self.assertEqual(self.exporter.mark()[0], 1)
+
+    def test_only_changes_are_written(self):
+        self.exporter.compact(self.tasks, self.path("base.csv"))
+        self.tasks[1].update(title="renamed")
+        self.tasks[2].mark_done()
+        added = Task("new")
+        tasks = [t for t in self.tasks if t is not self.tasks[3]] + [added]
+        self.storage.add_tombstone(self.tasks[3].id, datetime.now().isoformat())
+        path, counts = self.exporter.export(tasks, self.path("delta.csv"))
+        rows = self.read(path)
+        self.assertEqual(rows[0], CHANGES_HEADER)
+        changes = {row[0]: row[6] for row in rows[1:]}
+        self.assertEqual(changes, {self.tasks[1].id: "modified", self.tasks[2].id: "completed",
+                                   self.tasks[3].id: "deleted", added.id: "added"})
+        self.assertEqual(counts, {"modified": 1, "completed": 1, "deleted": 1, "added": 1})
+        self.assertTrue(all(row[7] == "2" for row in rows[1:]))
+
+        # Nothing changed since: nothing written, mark unchanged
+        self.assertEqual(self.exporter.export(tasks, self.path("again.csv")), (None, {}))
+        self.assertFalse(os.path.exists(self.path("again.csv")))
+        self.assertEqual(self.exporter.mark()[0], 2)
+
+    def test_compaction_resets_the_mark(self):
+        self.exporter.compact(self.tasks, self.path("base.csv"), now=datetime(2025, 5, 1))
+        self.assertEqual(self.exporter.mark(), (1, "2025-05-01T00:00:00"))
+        self.tasks[0].update(title="changed")
+        self.storage.add_tombstone(self.tasks[1].id, datetime.now().isoformat())
+        self.exporter.compact(self.tasks[2:], self.path("base2.csv"))
+        self.assertEqual(self.exporter.mark()[0], 2)
+        self.assertEqual(self.exporter.export(self.tasks[2:], self.path("delta.csv"))[0], None)
+
+    def test_archived_tasks_are_not_deletes(self):
+        self.exporter.compact(self.tasks, self.path("base.csv"))
+        # Archiving drops tasks from the list without a tombstone
+        self.assertEqual(self.exporter.export(self.tasks[5:], self.path("delta.csv")), (None, {}))
+
+    def peer(self):
+        """A second task file in its own directory, synced with the exported one."""
+        os.makedirs(self.path("peer"))
+        peer = TaskStorage(os.path.join(self.tmp.name, "peer", "tasks.json"))
+        sync(self.storage, peer)
+        return peer
+
+    def test_synced_edit_with_older_timestamp_is_exported(self):
+        self.storage.save_tasks(self.tasks)
+        peer = self.peer()
+        tasks = peer.load_tasks()
+        tasks[4].update(title="edited elsewhere")
+        tasks[4].updated_at = "2025-02-01T00:00:00"
+        peer.save_tasks(tasks)
+        # Exported after the peer's edit, but before it arrives here
+        self.exporter.compact(self.tasks, self.path("base.csv"), now=datetime(2025, 3, 1))
+        sync(self.storage, peer)
+        path, counts = self.exporter.export(self.storage.load_tasks(), self.path("delta.csv"))
+        self.assertEqual(counts, {"modified": 1})
+        self.assertEqual(self.read(path)[1][:2], [self.tasks[4].id, "edited elsewhere"])
+
+    def test_delete_then_sync_is_exported(self):
+        self.storage.save_tasks(self.tasks)
+        peer = self.peer()
+        self.exporter.compact(self.tasks, self.path("base.csv"))
+        tasks = self.storage.load_tasks()
+        self.storage.add_tombstone(tasks[2].id, datetime.now().isoformat())
+        self.storage.save_tasks(tasks[:2] + tasks[3:])
+        # Every peer has now been offered the delete, but the export has not picked it up yet
+        sync(self.storage, peer)
+        self.assertIn(tasks[2].id, TaskStorage(self.storage.filename).tombstones)
+        path, counts = self.exporter.export(self.storage.load_tasks(), self.path("delta.csv"))
+        self.assertEqual(counts, {"deleted": 1})
+        self.assertEqual(self.read(path)[1][0], tasks[2].id)
+        # Exported: the next sync may forget it
+        sync(self.storage, peer)
+        self.assertEqual(TaskStorage(self.storage.filename).tombstones, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,8 @@
 import unittest
 import sys
 import os
+import threading
+import time
 
 # Ensure project root is on sys.path for imports
 project_root = os.path.dirname(os.path.abspath(__file__))
@@ -44,6 +46,37 @@ class TestTaskManager(unittest.TestCase):
         tasks = self.task_manager.get_tasks()
         self.assertEqual(len(tasks), 0)
 
+    def test_bulk_operations_emit_one_batch(self):
+        tasks = [self.task_manager.add_task(f"task {i}", "Work") for i in range(5)]
+        batches = []
+        self.task_manager.events.subscribe(batches.append)
+        version = self.task_manager.version
+
+        self.task_manager.events.hold()
+        done = self.task_manager.mark_tasks_done([t.id for t in tasks[:3]])
+        moved = self.task_manager.update_tasks([t.id for t in tasks[1:]], category="Home", due_date="2025-02-01")
+        removed = self.task_manager.delete_tasks([tasks[0].id, tasks[4].id, "missing"])
+        self.task_manager.events.release()
+
+        self.assertEqual(len(done), 3)
+        self.assertEqual(len(moved), 4)
+        self.assertEqual([t.id for t in removed], [tasks[0].id, tasks[4].id])
+        self.assertEqual(self.task_manager.version, version + 3)
+        self.assertEqual(len(batches), 1)
+        self.assertEqual(len(batches[0]), 5)
+        self.assertEqual([t.category for t in self.task_manager.get_tasks()], ["Home"] * 3)
+        # Already completed tasks are left alone
+        self.assertEqual(self.task_manager.mark_tasks_done([tasks[1].id]), [])
+
+    def test_complete_occurrences(self):
+        from recurrence import RecurrenceRule
+        task = self.task_manager.add_task(Task("water", due_date="2025-01-01", recurrence=RecurrenceRule("daily")))
+        changed = self.task_manager.complete_occurrences([(task.id, "2025-01-02"), (task.id, "2025-01-03")])
+        self.assertEqual(changed[0].completed_occurrences, {"2025-01-02", "2025-01-03"})
+        self.assertFalse(changed[0].completed)
+        self.assertEqual(task.completed_occurrences, set())
+        self.assertIs(self.task_manager.get_tasks()[0], changed[0])
+
     def test_category_management(self):
         added = self.category_manager.add_category("Work")
         categories = self.category_manager.get_categories()
@@ -51,5 +84,67 @@ class TestTaskManager(unittest.TestCase):
         self.assertIn("Work", categories)
 
 
+class TestTaskManagerConcurrency(unittest.TestCase):
+    def test_concurrent_readers_and_writers(self):
+        manager = TaskManager()
+        writers, per_writer = 4, 300
+        errors = []
+        done = threading.Event()
+
+        def write(n):
+            try:
+                for i in range(per_writer):
+                    task = manager.add_task(f"w{n}-{i}")
+                    if i % 2:
+                        manager.delete_task(task.id)
+                    else:
+                        manager.mark_task_done(task.id)
+            except Exception as e:
+                errors.append(e)
+
+        def read():
+            try:
+                last_version = -1
+                while not done.is_set():
+                    version = manager.version
+                    snapshot = manager.get_all_tasks()
+                    ids = [t.id for t in snapshot]
+                    fields = [(t.rev, t.completed, t.done_at) for t in snapshot]
+                    if len(ids) != len(set(ids)) or len(ids) != len(snapshot):
+                        errors.append(AssertionError("inconsistent snapshot"))
+                    time.sleep(0)
+                    # Writers copy a task before changing it, so what a reader holds stays as it was
+                    if [(t.rev, t.completed, t.done_at) for t in snapshot] != fields:
+                        errors.append(AssertionError("task changed under a reader"))
+                    if version < last_version:
+                        errors.append(AssertionError("version went backwards"))
+                    last_version = version
+            except Exception as e:
+                errors.append(e)
+
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        writer_threads = [threading.Thread(target=write, args=(n,)) for n in range(writers)]
+        for t in readers + writer_threads:
+            t.start()
+        for t in writer_threads:
+            t.join()
+        done.set()
+        for t in readers:
+            t.join()
+
+        self.assertEqual(errors, [])
+        tasks = manager.get_all_tasks()
+        self.assertEqual(len(tasks), writers * per_writer // 2)
+        self.assertTrue(all(t.completed for t in tasks))
+
+    def test_snapshot_is_not_affected_by_later_writes(self):
+        manager = TaskManager()
+        manager.add_task("a")
+        snapshot = manager.get_all_tasks()
+        manager.add_task("b")
+        manager.clear_all_tasks()
+        self.assertEqual([t.title for t in snapshot], ["a"])
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
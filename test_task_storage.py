@@ -0,0 +1,66 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from unittest import mock
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from recurrence import RecurrenceRule
+from task import Task
+from task_storage import StorageLocked, TaskStorage
+
+
+class TestTaskStorage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "tasks.json")
+        self.storage = TaskStorage(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_output_matches_plain_json_dump(self):
+        tasks = [Task("a"), Task("ü", due_date="2025-09-01", recurrence=RecurrenceRule("weekly", weekdays=[1, 3]))]
+        self.storage.save_tasks(tasks)
+        with open(self.path, encoding="utf-8") as f:
+            written = f.read()
+        self.assertEqual(written, json.dumps([t.to_dict() for t in tasks], indent=4))
+        self.storage.save_tasks([])
+        with open(self.path, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "[]")
+
+    def test_only_dirty_tasks_are_reencoded(self):
+        tasks = [Task(f"t{i}") for i in range(50)]
+        self.storage.save_tasks(tasks)
+        tasks[3].mark_done()
+        tasks[7].update(title="renamed")
+        with mock.patch.object(Task, "to_dict", autospec=True, side_effect=Task.to_dict) as to_dict:
+            self.storage.save_tasks(tasks)
+        self.assertEqual(to_dict.call_count, 2)
+        titles = [t.title for t in self.storage.load_tasks()]
+        self.assertEqual(titles[7], "renamed")
+
+    def test_reloaded_objects_are_not_served_from_stale_cache(self):
+        task = Task("old title")
+        self.storage.save_tasks([task])
+        fresh = Task.from_dict(dict(task.to_dict(), title="new title"))
+        self.storage.save_tasks([fresh])
+        self.assertEqual(self.storage.load_tasks()[0].title, "new title")
+
+
+    def test_lock_keeps_a_second_writer_out(self):
+        self.storage.acquire_lock()
+        other = TaskStorage(self.path)
+        with self.assertRaises(StorageLocked):
+            other.acquire_lock()
+        self.storage.release_lock()
+        other.acquire_lock()
+        other.release_lock()
+
+
+if __name__ == "__main__":
+    unittest.main()
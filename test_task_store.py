@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest import mock
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from category_manager import CategoryManager
+from task import Task
+from task_manager import TaskManager
+from task_storage import TaskStorage
+from task_store import TaskStore
+
+
+class TestTaskStoreTransaction(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.storage = TaskStorage(os.path.join(self.tmp.name, "tasks.json"))
+        self.categories = CategoryManager(os.path.join(self.tmp.name, "categories.json"))
+        self.manager = TaskManager()
+        self.manager.add_task("report", "Work")
+        self.manager.add_task("gym", "Personal")
+        self.store = TaskStore(self.manager, self.storage, self.categories)
+        self.store.save()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_commit_writes_each_file_once(self):
+        with mock.patch.object(self.storage, "save_tasks", wraps=self.storage.save_tasks) as save_tasks, \
+                mock.patch("category_manager.json.dump", wraps=__import__("json").dump) as dump_categories:
+            with self.store.transaction():
+                self.categories.rename_category("Work", "Office", self.manager)
+                self.store.save()
+                with self.store.transaction():
+                    self.manager.add_task("new", "Office")
+                    self.store.save()
+                self.assertEqual(save_tasks.call_count, 0)
+        self.assertEqual(save_tasks.call_count, 1)
+        self.assertEqual(dump_categories.call_count, 1)
+        self.assertEqual([t.category for t in self.storage.load_tasks()], ["Office", "Personal", "Office"])
+        self.assertIn("Office", CategoryManager(self.categories.filename).get_categories())
+
+    def test_exception_rolls_everything_back(self):
+        before = open(self.storage.filename, encoding="utf-8").read()
+        gym = self.manager.get_all_tasks()[1]
+        with self.assertRaises(RuntimeError):
+            with self.store.transaction():
+                self.categories.rename_category("Work", "Office", self.manager)
+                self.manager.mark_task_done(gym.id)
+                self.manager.delete_task(self.manager.get_all_tasks()[0].id)
+                self.store.save()
+                raise RuntimeError("boom")
+        self.assertEqual([t.category for t in self.manager.get_all_tasks()], ["Work", "Personal"])
+        self.assertIs(self.manager.get_all_tasks()[1], gym)
+        self.assertFalse(gym.completed)
+        self.assertIn("Work", self.categories.get_categories())
+        self.assertNotIn("Office", CategoryManager(self.categories.filename).get_categories())
+        self.assertEqual(open(self.storage.filename, encoding="utf-8").read(), before)
+
+    def test_one_task_transaction_leaves_other_tasks_alone(self):
+        self.manager.tasks = [Task(f"t{i}") for i in range(1000)]
+        target = self.manager.get_all_tasks()[500]
+        with mock.patch.object(Task, "get_state", autospec=True, side_effect=Task.get_state) as get_state, \
+                mock.patch.object(Task, "copy", autospec=True, side_effect=Task.copy) as copy:
+            with self.store.transaction():
+                self.manager.update_task(target.id, title="changed")
+            with self.assertRaises(RuntimeError):
+                with self.store.transaction():
+                    self.manager.update_task(target.id, title="lost")
+                    raise RuntimeError("boom")
+        self.assertEqual(get_state.call_count, 0)
+        self.assertEqual([c.args[0].id for c in copy.call_args_list], [target.id, target.id])
+        self.assertEqual(self.manager.get_all_tasks()[500].title, "changed")
+
+
+if __name__ == "__main__":
+    unittest.main()
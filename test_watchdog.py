@@ -0,0 +1,67 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import time
+
+project_root = os.path.dirname(os.path.abspath(__file__))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from watchdog import Watchdog
+
+
+def slow_handler():
+    time.sleep(0.25)
+
+
+class TestWatchdog(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output = os.path.join(self.tmp.name, "stalls.jsonl")
+        self.scheduled = []
+        self.dog = Watchdog(threshold=0.1, interval=0.02, sample_interval=0.005, output=self.output)
+
+    def tearDown(self):
+        self.dog.stop()
+        self.tmp.cleanup()
+
+    def schedule(self, ms, callback):
+        self.scheduled.append(callback)
+
+    def beat(self):
+        self.scheduled.pop()()
+
+    def test_disabled_does_nothing(self):
+        self.dog.start(self.schedule)
+        self.assertEqual(self.scheduled, [])
+        self.assertIsNone(self.dog._thread)
+
+    def test_stall_is_reported_with_handler(self):
+        self.dog.enable()
+        self.dog.start(self.schedule)
+        time.sleep(0.02)
+        self.beat()
+        slow_handler()
+        self.beat()
+        self.assertEqual(len(self.dog.stalls), 1)
+        stall = self.dog.stalls[0]
+        self.assertGreaterEqual(stall["stall_ms"], 100)
+        self.assertIn("slow_handler", stall["handler"])
+        self.assertTrue(any("slow_handler" in line for line in stall["stack"]))
+        with open(self.output, encoding="utf-8") as f:
+            self.assertEqual(json.loads(f.readline())["handler"], stall["handler"])
+
+    def test_short_gaps_are_not_stalls(self):
+        self.dog.enable()
+        self.dog.start(self.schedule)
+        for _ in range(3):
+            time.sleep(0.02)
+            self.beat()
+        self.assertEqual(len(self.dog.stalls), 0)
+        self.assertFalse(os.path.exists(self.output))
+
+
+if __name__ == "__main__":
+    unittest.main()
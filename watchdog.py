@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional
+
+from profiling import profiler
+
+ENV_FLAG = "TODO_WATCHDOG"  # "1" for the default threshold, or the threshold in ms
+ENV_OUTPUT = "TODO_WATCHDOG_OUT"
+DEFAULT_OUTPUT = "stalls.jsonl"
+DEFAULT_THRESHOLD_MS = 200
+
+
+def _describe(frame) -> str:
+    code = frame.f_code
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{os.path.basename(code.co_filename)}:{frame.f_lineno} {name}"
+
+
+class Watchdog:
+    """
+    Opt-in detector for main-loop stalls.
+
+    A heartbeat scheduled with Tk's after() measures how late the event loop
+    runs it. A helper thread watches the heartbeat; once it is overdue it
+    samples the main thread's stack every `sample_interval` seconds. When
+    the late beat finally runs and was later than `threshold`, the stall is
+    written to the report (one JSON object per line) with the handler that
+    was running and its most common stack.
+
+    When disabled nothing is scheduled and no thread runs.
+    """
+
+    def __init__(self, threshold: float = DEFAULT_THRESHOLD_MS / 1000.0, interval: float = 0.05,
+                 sample_interval: float = 0.01, output: Optional[str] = None, max_stalls: int = 100) -> None:
+        self.enabled = False
+        self.threshold = threshold
+        self.interval = interval
+        self.sample_interval = sample_interval
+        self.output = output
+        self.stalls: Deque[Dict] = deque(maxlen=max_stalls)
+        self._schedule: Optional[Callable] = None
+        self._main_id = threading.main_thread().ident
+        self._last_beat = 0.0
+        self._samples: List[tuple] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._tk_dir: Optional[str] = None
+
+    # Configuration
+    def enable(self, threshold_ms: Optional[float] = None, output: Optional[str] = None) -> None:
+        self.enabled = True
+        if threshold_ms:
+            self.threshold = threshold_ms / 1000.0
+        if output:
+            self.output = output
+
+    def start(self, schedule: Callable[[int, Callable[[], None]], object]) -> None:
+        """Start watching the loop that `schedule(ms, callback)` (e.g. window.after) runs on."""
+        if not self.enabled or self._thread is not None:
+            return
+        self._schedule = schedule
+        self._main_id = threading.get_ident()
+        tkinter = sys.modules.get("tkinter")
+        self._tk_dir = os.path.dirname(tkinter.__file__) if tkinter is not None else None
+        self._last_beat = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="main-loop-watchdog", daemon=True)
+        self._thread.start()
+        self._schedule(int(self.interval * 1000), self._beat)
+        atexit.register(self.stop)
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread = None
+
+    # Main thread
+    def _beat(self) -> None:
+        now = time.perf_counter()
+        late = now - self._last_beat - self.interval
+        self._last_beat = now
+        with self._lock:
+            samples, self._samples = self._samples, []
+        if profiler.enabled:
+            profiler.record("main_loop_latency", max(0.0, late))
+        if late >= self.threshold:
+            self._report(late, samples)
+        if not self._stop.is_set():
+            self._schedule(int(self.interval * 1000), self._beat)
+
+    def _report(self, late: float, samples: List[tuple]) -> None:
+        stacks = Counter(stack for _, stack in samples)
+        handlers = Counter(handler for handler, _ in samples)
+        stall = {
+            "at": datetime.now().isoformat(timespec="milliseconds"),
+            "stall_ms": round(late * 1000.0, 1),
+            "handler": handlers.most_common(1)[0][0] if handlers else None,
+            "samples": len(samples),
+            "stack": list(stacks.most_common(1)[0][0]) if stacks else [],
+        }
+        self.stalls.append(stall)
+        path = self.output or DEFAULT_OUTPUT
+        try:
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(stall, ensure_ascii=False) + "\n")
+        except Exception:
+            pass
+
+    # Helper thread
+    def _watch(self) -> None:
+        overdue = self.interval * 2
+        while not self._stop.wait(self.sample_interval):
+            if time.perf_counter() - self._last_beat < overdue:
+                continue
+            sample = self._sample()
+            if sample is not None:
+                with self._lock:
+                    self._samples.append(sample)
+
+    def _sample(self) -> Optional[tuple]:
+        """(handler, stack) of the main thread, outermost frame first."""
+        frame = sys._current_frames().get(self._main_id)
+        if frame is None:
+            return None
+        frames = []
+        while frame is not None:
+            frames.append(frame)
+            frame = frame.f_back
+        frames.reverse()
+        # The handler is the first frame below the innermost Tk callback dispatch
+        handler = frames[-1]
+        if self._tk_dir:
+            in_tk = [os.path.dirname(f.f_code.co_filename) == self._tk_dir for f in frames]
+            for i in range(1, len(frames)):
+                if in_tk[i - 1] and not in_tk[i]:
+                    handler = frames[i]
+        return _describe(handler), tuple(_describe(f) for f in frames)
+
+
+watchdog = Watchdog()
+_value = os.environ.get(ENV_FLAG, "")
+if _value not in ("", "0"):
+    try:
+        _threshold_ms = float(_value)
+    except ValueError:
+        _threshold_ms = 0.0
+    watchdog.enable(_threshold_ms if _threshold_ms > 1 else None, os.environ.get(ENV_OUTPUT))